@@ -0,0 +1,141 @@
+import argparse
+import os
+
+import pandas as pd
+
+from schema import MESES, TRANSFORMADO, read_csv
+
+
+# Dimensões com tabela agregada e colunas somadas em cada uma (as mesmas usadas pelo
+# dashboard em value_counts e nas comparações groupby(x).sum())
+DIMENSOES = ['ano_referencia', 'unidade', 'secao', 'metrica']
+COLUNAS_SOMA = ['ano_anterior', *MESES, 'total']
+
+
+def aggregates_path(caminho_csv):
+    '''Arquivo das tabelas agregadas, ao lado do arquivo transformado'''
+    return f"{os.path.splitext(caminho_csv)[0]}.agregados.pkl"
+
+def _file_version(caminho):
+    info = os.stat(caminho)
+    return (info.st_mtime_ns, info.st_size)
+
+def aggregate(dados, dimensoes=DIMENSOES):
+    '''
+    Tabelas agregadas do zero: {dimensão: DataFrame indexado pelos valores da dimensão,
+    com a contagem de linhas e a soma de cada coluna de valor (int64)}.
+    '''
+    colunas = [coluna for coluna in COLUNAS_SOMA if coluna in dados.columns]
+    tabelas = {}
+    for dimensao in dimensoes:
+        if dimensao not in dados.columns:
+            continue
+        grupos = dados.groupby(dimensao, observed=True, sort=True)
+        tabela = grupos[colunas].sum().astype('int64')
+        tabela.insert(0, 'contagem', grupos.size().astype('int64'))
+        # Índice sem categorias e ordenado pelos valores: tabelas de lotes diferentes se alinham
+        # pelos valores, e a ordem não depende das categorias (ex.: ordem dos IDs do dicionário)
+        tabela.index = pd.Index(tabela.index.astype(object), name=dimensao)
+        tabelas[dimensao] = tabela.sort_index()
+    return tabelas
+
+def apply_delta(tabelas, removidos, novos):
+    '''
+    Atualiza as tabelas sem reprocessar o conjunto inteiro: subtrai a contribuição das
+    linhas removidas (versão antiga da unidade/ano) e soma a das novas. O custo depende
+    só do tamanho da mudança e do número de valores distintos de cada dimensão.
+    '''
+    antigos = aggregate(removidos, list(tabelas))
+    atuais = aggregate(novos, list(tabelas))
+    resultado = {}
+    for dimensao, tabela in tabelas.items():
+        atualizada = tabela
+        if dimensao in atuais:
+            atualizada = atualizada.add(atuais[dimensao], fill_value=0)
+        if dimensao in antigos:
+            atualizada = atualizada.sub(antigos[dimensao], fill_value=0)
+        atualizada = atualizada[tabela.columns]
+        # Valores que deixaram de existir (contagem zerada) saem da tabela
+        resultado[dimensao] = atualizada[atualizada['contagem'] != 0].astype('int64').sort_index()
+    return resultado
+
+def verify(tabelas, dados):
+    '''Verificação de consistência: dimensões cujas tabelas diferem do recálculo completo'''
+    completas = aggregate(dados, list(tabelas))
+    return [
+        dimensao for dimensao, tabela in completas.items()
+        if dimensao not in tabelas or not tabela.equals(tabelas[dimensao])
+    ]
+
+def save_aggregates(tabelas, caminho_csv):
+    '''Grava as tabelas (troca atômica) marcadas com a versão atual do arquivo transformado'''
+    caminho = aggregates_path(caminho_csv)
+    temporario = f"{caminho}.tmp"
+    pd.to_pickle({'versao': _file_version(caminho_csv), 'tabelas': tabelas}, temporario)
+    os.replace(temporario, caminho)
+
+def _load_saved(caminho_csv):
+    try:
+        return pd.read_pickle(aggregates_path(caminho_csv))
+    except (FileNotFoundError, EOFError):
+        return None
+
+def load_aggregates(caminho_csv):
+    '''Tabelas gravadas, ou None se ausentes ou de outra versão do arquivo transformado'''
+    salvo = _load_saved(caminho_csv)
+    if salvo is None or not os.path.exists(caminho_csv) or salvo['versao'] != _file_version(caminho_csv):
+        return None
+    return salvo['tabelas']
+
+def update_aggregates(caminho_csv, versao_anterior, removidos, novos, dados, verificar=False):
+    '''
+    Chamado após a troca do arquivo transformado (transform.publish):
+    1. Se as tabelas gravadas correspondem à versão anterior do arquivo, aplica só o delta.
+    2. Senão (ausentes ou desatualizadas), recalcula a partir de "dados".
+    3. Com "verificar", compara com o recálculo completo e o usa em caso de divergência.
+    '''
+    salvo = _load_saved(caminho_csv)
+    if salvo is not None and versao_anterior is not None and salvo['versao'] == versao_anterior:
+        tabelas = apply_delta(salvo['tabelas'], removidos, novos)
+    else:
+        print("Tabelas agregadas ausentes ou desatualizadas: recalculando.")
+        tabelas = aggregate(dados)
+
+    if verificar:
+        divergentes = verify(tabelas, dados)
+        if divergentes:
+            print(f"Tabelas agregadas inconsistentes em {divergentes}: recalculando.")
+            tabelas = aggregate(dados)
+
+    save_aggregates(tabelas, caminho_csv)
+    return tabelas
+
+def value_counts_from(tabelas, dimensao):
+    '''Contagem por valor da dimensão, no formato de Series.value_counts (maiores primeiro)'''
+    contagem = tabelas[dimensao]['contagem'].sort_values(ascending=False, kind='stable')
+    return contagem.rename('count')
+
+def group_sums(tabelas, por, coluna):
+    '''Soma de "coluna" por valor de "por" (equivale a groupby(por)[coluna].sum()), ou None'''
+    if por not in tabelas or coluna not in tabelas[por].columns:
+        return None
+    return tabelas[por][coluna]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tabelas agregadas do arquivo transformado.")
+    parser.add_argument("--entrada", default="dados_transformados_PPCAAM.csv")
+    parser.add_argument("--reconstruir", action="store_true", help="Recalcula e grava as tabelas do zero")
+    args = parser.parse_args()
+
+    dados = read_csv(args.entrada, TRANSFORMADO)
+    tabelas = None if args.reconstruir else load_aggregates(args.entrada)
+    if tabelas is None:
+        save_aggregates(aggregate(dados), args.entrada)
+        print(f"Tabelas agregadas gravadas em '{aggregates_path(args.entrada)}'.")
+    else:
+        divergentes = verify(tabelas, dados)
+        if divergentes:
+            print(f"Tabelas agregadas inconsistentes em {divergentes}.")
+            raise SystemExit(1)
+        print("Tabelas agregadas consistentes com o recálculo completo.")
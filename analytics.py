@@ -0,0 +1,357 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Cálculos por trás dos gráficos do dashboard, sem Streamlit: usados também pelo report.py,
+# por benchmarks e em notebooks. Os problemas viram mensagens no resultado, e quem chama
+# decide como exibi-las (st.warning no dashboard, print em lote).
+
+# Acima deste número de células (rótulos de x × rótulos de y), as contagens não usam um vetor
+# denso de contadores: só os pares que ocorrem são contados (np.unique)
+MAX_DENSE_CELLS = 1_000_000
+
+
+class ColumnTypes(NamedTuple):
+    '''Colunas por tipo detectado (desempacotável como a tupla de três listas)'''
+    categorical_cols: list
+    numerical_cols: list
+    datetime_cols: list
+
+
+class CategoricalData(NamedTuple):
+    '''Contagem por valor de uma coluna: colunas [coluna, count, value, label]; None com "message"'''
+    table: Optional[pd.DataFrame]
+    message: Optional[str] = None
+
+
+class NumericalData(NamedTuple):
+    '''Valores não nulos de uma coluna numérica (em percentual do total, se pedido)'''
+    values: Optional[pd.Series]
+    message: Optional[str] = None
+
+
+class ComparisonData(NamedTuple):
+    '''Tabela e eixos do gráfico de comparação entre duas colunas'''
+    kind: str  # 'bar', 'grouped_bar' ou 'scatter'
+    table: pd.DataFrame
+    x: str
+    y: str
+    color: Optional[str]
+    title: str
+    x_title: str
+    y_title: str
+    percentage: bool
+    show_legend: bool
+    category_orders: Optional[dict] = None
+
+
+class CrossTab(NamedTuple):
+    '''
+    Tabela cruzada em formato longo, só com os pares que ocorrem: colunas [x, y, count,
+    row_pct, col_pct, total_pct], com os percentuais do total da linha (valor de x), da
+    coluna (valor de y) e do total geral. "x_labels"/"y_labels": rótulos presentes, em ordem.
+    '''
+    table: pd.DataFrame
+    x_labels: list
+    y_labels: list
+    total: int
+
+
+class CorrelationData(NamedTuple):
+    '''Matriz de correlação (arredondada) e os pares acima do limiar'''
+    matrix: pd.DataFrame
+    strong: list
+
+
+def detect_column_types(df):
+    '''Detecta automaticamente tipos de colunas'''
+    categorical_cols = []
+    numerical_cols = []
+    datetime_cols = []
+
+    for col in df.columns:
+        try:
+            # Verifica se é datetime
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                datetime_cols.append(col)
+            # Verifica se é numérico
+            elif pd.api.types.is_numeric_dtype(df[col]):
+                numerical_cols.append(col)
+            # Para colunas de texto, verifica se tem poucos valores únicos
+            elif df[col].dtype == 'object' or df[col].nunique() <= 30:
+                categorical_cols.append(col)
+            else:
+                # Por padrão, considera como categórica
+                categorical_cols.append(col)
+        except Exception:
+            # Em caso de erro, considera como categórica
+            categorical_cols.append(col)
+
+    return ColumnTypes(categorical_cols, numerical_cols, datetime_cols)
+
+def _codes(series):
+    '''Códigos inteiros (-1 nos nulos) e rótulos de uma coluna: os da categoria ou, nas
+    demais colunas, os da fatoração ordenada (a mesma ordem de pd.crosstab)'''
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series, sort=True)
+
+def _count_codes(codes, size):
+    '''Contagem dos códigos (0..size-1) que ocorrem: (códigos presentes em ordem, contagens)'''
+    if size <= MAX_DENSE_CELLS:
+        counts = np.bincount(codes, minlength=size)
+        present = np.flatnonzero(counts)
+        return present, counts[present]
+    return np.unique(codes, return_counts=True)
+
+def code_value_counts(series):
+    '''
+    Series.value_counts sobre os códigos inteiros da coluna (sem nulos nem categorias sem
+    ocorrência): maiores primeiro, empates na ordem dos rótulos.
+    '''
+    codes, labels = _codes(series)
+    present, counts = _count_codes(codes[codes >= 0], len(labels))
+    order = np.argsort(-counts, kind='stable')
+    return pd.Series(counts[order], index=pd.Index(labels.take(present[order]), name=series.name), name='count')
+
+def code_crosstab(x, y):
+    '''
+    Tabela cruzada de duas colunas em uma passada sobre códigos inteiros, no lugar de
+    pd.crosstab + div + melt:
+    1. cada coluna vira códigos (_codes); pares com nulo ficam de fora;
+    2. cada par vira um código só (y * rótulos de x + x), contado por np.bincount, ou por
+       np.unique quando a tabela densa passaria de MAX_DENSE_CELLS células;
+    3. os totais por linha e por coluna saem das próprias contagens, e com eles os percentuais.
+    Como no pd.crosstab, entram só os rótulos que ocorrem em algum par. Até MAX_DENSE_CELLS
+    combinações, a tabela é densa (todos os pares, com zero nos que não ocorrem), na ordem
+    (y, x) do melt; acima disso, só os pares que ocorrem, na mesma ordem.
+    '''
+    x_codes, x_labels = _codes(x)
+    y_codes, y_labels = _codes(y)
+    valid = (x_codes >= 0) & (y_codes >= 0)
+    n_x = len(x_labels)
+    pairs, counts = _count_codes(y_codes[valid].astype(np.int64) * n_x + x_codes[valid], n_x * len(y_labels))
+    x_present, x_index = np.unique(pairs % n_x, return_inverse=True)
+    y_present, y_index = np.unique(pairs // n_x, return_inverse=True)
+
+    if len(x_present) * len(y_present) <= MAX_DENSE_CELLS:
+        # Grade completa dos rótulos presentes: pares sem ocorrência com contagem zero
+        dense = np.zeros(len(x_present) * len(y_present), dtype=counts.dtype)
+        dense[y_index * len(x_present) + x_index] = counts
+        x_index = np.tile(np.arange(len(x_present)), len(y_present))
+        y_index = np.repeat(np.arange(len(y_present)), len(x_present))
+        counts = dense
+
+    row_totals = np.bincount(x_index, weights=counts, minlength=len(x_present))
+    col_totals = np.bincount(y_index, weights=counts, minlength=len(y_present))
+    total = int(counts.sum())
+    x_names, y_names = x_labels.take(x_present), y_labels.take(y_present)
+    table = pd.DataFrame({
+        x.name: x_names.take(x_index),
+        y.name: y_names.take(y_index),
+        'count': counts,
+        'row_pct': (counts / row_totals[x_index] * 100).round(2),
+        'col_pct': (counts / col_totals[y_index] * 100).round(2),
+        'total_pct': (counts / total * 100).round(2) if total else np.zeros(len(counts)),
+    })
+    return CrossTab(table, list(x_names), list(y_names), total)
+
+def prepare_categorical_data(df, column_name, show_percentage=False, counts=None):
+    '''
+    Prepara dados para gráficos categóricos.
+    "counts" recebe uma contagem já calculada (ex.: aggregates.value_counts_from),
+    dispensando o value_counts sobre o dataframe.
+    '''
+    if column_name not in df.columns:
+        return CategoricalData(None, f"Coluna '{column_name}' não encontrada no dataset.")
+
+    try:
+        if counts is None:
+            # Sem nulos nem categorias sem ocorrência (ex.: eliminadas por filtros)
+            counts = code_value_counts(df[column_name])
+
+        if len(counts) == 0:
+            return CategoricalData(None, f"Coluna '{column_name}' não tem dados válidos.")
+
+        value_counts = counts.reset_index()
+        value_counts.columns = [column_name, 'count']
+
+        total = value_counts['count'].sum()
+        if show_percentage and total > 0:
+            value_counts['value'] = (value_counts['count'] / total * 100).round(2)
+            value_counts['label'] = value_counts['value'].astype(str) + '%'
+        else:
+            value_counts['value'] = value_counts['count']
+            value_counts['label'] = value_counts['value'].astype(str)
+
+        return CategoricalData(value_counts)
+    except Exception as e:
+        return CategoricalData(None, f"Erro ao preparar dados categóricos: {e}")
+
+def prepare_numerical_data(df, column_name, show_percentage=False):
+    '''Prepara dados para gráficos numéricos'''
+    if column_name not in df.columns:
+        return NumericalData(None, f"Coluna '{column_name}' não encontrada no dataset.")
+
+    try:
+        clean_series = df[column_name].dropna()
+
+        if show_percentage and len(clean_series) > 0:
+            total = clean_series.sum()
+            if total != 0:
+                return NumericalData((clean_series / total * 100).round(2))
+        return NumericalData(clean_series)
+    except Exception as e:
+        return NumericalData(df[column_name], f"Erro ao preparar dados numéricos: {e}")
+
+def group_sum(df, by, column, sums=None):
+    '''groupby(by)[column].sum() como tabela, ou a partir de somas já calculadas (aggregates.group_sums)'''
+    if sums is not None:
+        return sums.rename(column).rename_axis(by).reset_index()
+    return df.groupby(by, observed=True)[column].sum().reset_index()
+
+def _bar_by_category(df, category, numeric, show_percentage, sums):
+    '''Soma da coluna numérica por categoria, com percentual do total se pedido'''
+    grouped = group_sum(df, category, numeric, sums)
+    if show_percentage:
+        total = grouped[numeric].sum()
+        if total > 0:
+            grouped['percentage'] = (grouped[numeric] / total * 100).round(2)
+            return grouped, 'percentage', 'Percentual (%)'
+    return grouped, numeric, numeric
+
+def comparison_data(df, x_column, y_column, categorical_cols, show_percentage=False, sums=None):
+    '''
+    Dados do gráfico de comparação entre duas colunas, escolhido conforme os tipos:
+    - categórico × numérico (em qualquer ordem): soma por categoria (barras);
+    - numérico × numérico: as duas colunas (dispersão);
+    - categórico × categórico: tabela cruzada (code_crosstab), em percentual por linha se
+      pedido (barras agrupadas), densa como a do pd.crosstab até MAX_DENSE_CELLS combinações,
+      com a ordem dos eixos em category_orders.
+    "sums" recebe a soma da coluna numérica por valor da categórica já calculada
+    (ex.: aggregates.group_sums), usada no lugar do groupby.
+    '''
+    x_is_categorical = x_column in categorical_cols
+    y_is_categorical = y_column in categorical_cols
+
+    if x_is_categorical != y_is_categorical:
+        # Numérico × categórico inverte os eixos: a categoria fica sempre no eixo X
+        category, numeric = (x_column, y_column) if x_is_categorical else (y_column, x_column)
+        grouped, y_data, y_title = _bar_by_category(df, category, numeric, show_percentage, sums)
+        percentage = y_data == 'percentage'
+        return ComparisonData(
+            kind='bar', table=grouped, x=category, y=y_data, color=category,
+            title=f"{numeric} por {category} {'(Percentual)' if percentage else ''}",
+            x_title=category, y_title=y_title, percentage=percentage,
+            show_legend=not x_is_categorical
+        )
+
+    if not x_is_categorical:
+        return ComparisonData(
+            kind='scatter', table=df[[x_column, y_column]], x=x_column, y=y_column, color=None,
+            title=f"Relação entre {x_column} e {y_column}",
+            x_title=x_column, y_title=y_column, percentage=False, show_legend=False
+        )
+
+    cross_tab = code_crosstab(df[x_column], df[y_column])
+    if show_percentage:
+        # Percentuais por linha
+        y_data, y_title = 'percentage', 'Percentual (%)'
+        table = cross_tab.table[[x_column, y_column, 'row_pct']].rename(columns={'row_pct': y_data})
+    else:
+        y_data, y_title = 'count', 'Contagem'
+        table = cross_tab.table[[x_column, y_column, 'count']]
+    return ComparisonData(
+        kind='grouped_bar', table=table, x=x_column, y=y_data, color=y_column,
+        title=f"{y_column} por {x_column} {'(Percentual)' if show_percentage else ''}",
+        x_title=x_column, y_title=y_title, percentage=show_percentage, show_legend=True,
+        category_orders={x_column: cross_tab.x_labels, y_column: cross_tab.y_labels}
+    )
+
+def strong_correlations(corr_matrix, threshold=0.7):
+    '''Lista os pares de variáveis com |r| acima do limiar'''
+    strong = []
+    for i in range(len(corr_matrix.columns)):
+        for j in range(i+1, len(corr_matrix.columns)):
+            corr_value = corr_matrix.iloc[i, j]
+            if abs(corr_value) > threshold:
+                strong.append({
+                    'Variável 1': corr_matrix.columns[i],
+                    'Variável 2': corr_matrix.columns[j],
+                    'Correlação': corr_value
+                })
+    return strong
+
+def correlation_data(df, columns, threshold=0.7):
+    '''Matriz de correlação das colunas e os pares com |r| acima do limiar'''
+    corr_matrix = df[list(columns)].corr().round(2)
+    return CorrelationData(corr_matrix, strong_correlations(corr_matrix, threshold))
+
+
+class LRUCache:
+    '''
+    Cache LRU limitado a "max_entries" resultados, compartilhado entre threads (sessões do
+    Streamlit). A chave é (versão dos dados, função, parâmetros): a versão identifica o
+    dataframe, que não é examinado; uma nova versão simplesmente deixa de achar as
+    entradas antigas, que saem pela política LRU.
+    '''
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        # Calcula fora do lock: sessões com chaves diferentes não esperam umas pelas outras
+        result = compute()
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+_cache = LRUCache()
+
+def _key_part(value):
+    '''Parâmetro como parte da chave: listas viram tuplas; objetos pandas são identificados pela versão'''
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return type(value).__name__
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(v) for v in value)
+    return value
+
+def cached(version, function, df, *args, **kwargs):
+    '''
+    function(df, *args, **kwargs) pelo cache LRU do módulo, com a chave (version, função, parâmetros).
+    "version" deve mudar sempre que o conteúdo de df mudar (arquivo e filtros);
+    com version None o cálculo é feito sem cache.
+    O resultado é compartilhado entre chamadas e não deve ser alterado.
+    '''
+    if version is None:
+        return function(df, *args, **kwargs)
+    key = (version, function.__qualname__, _key_part(args), tuple(sorted((k, _key_part(v)) for k, v in kwargs.items())))
+    return _cache.get_or_compute(key, lambda: function(df, *args, **kwargs))
+
+def cache_info():
+    '''Acertos, faltas e entradas do cache do módulo'''
+    return {'hits': _cache.hits, 'misses': _cache.misses, 'entries': len(_cache.entries),
+            'max_entries': _cache.max_entries}
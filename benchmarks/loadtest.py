@@ -0,0 +1,267 @@
+import argparse
+import importlib
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from schema import MESES, TRANSFORMADO
+from sections import SECOES
+from transform import load_sections, write_csv_atomic
+
+
+ENTRADA = os.path.join(RAIZ, "ppcaam_visualization.py")
+ORCAMENTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budget.json")
+
+UNIDADES = ['AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+            'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO']
+METRICAS_POR_SECAO = 8
+
+
+def generate_data(linhas, semente=0):
+    '''
+    Arquivo transformado sintético com "linhas" linhas: anos × unidades × seções (do
+    secao.json) × métricas, com valores mensais de Poisson e o total como soma dos meses.
+    '''
+    rng = np.random.default_rng(semente)
+    secoes = load_sections()
+    por_ano = len(UNIDADES) * len(secoes) * METRICAS_POR_SECAO
+    anos = range(2025 - math.ceil(linhas / por_ano) + 1, 2026)
+    chaves = list(itertools.islice(
+        itertools.product(anos, UNIDADES, secoes, [f"Métrica {i + 1}" for i in range(METRICAS_POR_SECAO)]),
+        linhas
+    ))
+
+    dados = pd.DataFrame(chaves, columns=['ano_referencia', 'unidade', 'secao', 'metrica'])
+    dados['ano_anterior'] = rng.poisson(50, len(dados))
+    intensidade = rng.gamma(2.0, 3.0, len(dados))
+    for mes in MESES:
+        dados[mes] = rng.poisson(intensidade)
+    dados['total'] = dados[MESES].sum(axis=1)
+    dados['planilha'] = 'Ficha'
+    return dados
+
+def _widget(widgets, rotulo):
+    return next(w for w in widgets if w.label == rotulo)
+
+def change_filter(app, rng):
+    '''Troca a coluna do filtro categórico da barra lateral'''
+    filtro = _widget(app.sidebar.selectbox, "Filtrar por categoria:")
+    filtro.set_value(rng.choice(filtro.options))
+
+def switch_distribution(app, rng):
+    '''Troca a coluna da análise de distribuição (dist_column)'''
+    coluna = app.selectbox(key="dist_col")
+    coluna.set_value(rng.choice(coluna.options))
+
+def toggle_percentage(app, rng):
+    '''Alterna entre valores absolutos e percentuais (show_percentage)'''
+    percentual = _widget(app.sidebar.toggle, "Mostrar Percentuais (%)")
+    percentual.set_value(not percentual.value)
+
+def pick_correlation(app, rng):
+    '''Escolhe de 2 a 6 colunas para a matriz de correlação'''
+    colunas = _widget(app.multiselect, "Selecione as colunas numéricas para análise de correlação:")
+    colunas.set_value(rng.sample(colunas.options, rng.randint(2, min(6, len(colunas.options)))))
+
+ACOES = {
+    'filtro': change_filter,
+    'distribuicao': switch_distribution,
+    'percentual': toggle_percentage,
+    'correlacao': pick_correlation,
+}
+
+
+def _instrument(medidas, memoria=False):
+    '''
+    Envolve o render de cada seção para medir o tempo e, com "memoria", o pico de memória
+    alocada (tracemalloc) durante o desenho. Retorna uma função que desfaz a instrumentação.
+    '''
+    originais = {}
+    for nome in SECOES:
+        modulo = importlib.import_module(f"sections.{nome}")
+        originais[nome] = modulo.render
+
+        def render(ctx, _nome=nome, _original=modulo.render):
+            if memoria:
+                antes = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+            inicio = time.perf_counter()
+            try:
+                return _original(ctx)
+            finally:
+                medidas.setdefault(_nome, {'tempo': [], 'memoria': []})
+                medidas[_nome]['tempo'].append(time.perf_counter() - inicio)
+                if memoria:
+                    medidas[_nome]['memoria'].append(tracemalloc.get_traced_memory()[1] - antes)
+
+        modulo.render = render
+
+    def restaurar():
+        for nome, original in originais.items():
+            importlib.import_module(f"sections.{nome}").render = original
+    return restaurar
+
+def _rerun(app, latencias, erros, acao):
+    inicio = time.perf_counter()
+    app.run()
+    latencias.setdefault(acao, []).append(time.perf_counter() - inicio)
+    for elemento in list(app.exception) + list(app.error):
+        erros.append(f"{acao}: {elemento.value}")
+
+def run_sessions(sessoes, passos, semente=0, timeout=300):
+    '''
+    Simula "sessoes" analistas, cada um com seu próprio estado de widgets, executando
+    "passos" interações aleatórias (filtro, distribuição, percentual, correlação).
+    As sessões são intercaladas (uma interação de cada por vez), compartilhando o
+    st.cache_data do processo como no servidor. Retorna (latências por ação, erros).
+    '''
+    from streamlit.testing.v1 import AppTest
+
+    latencias, erros = {}, []
+    apps, rngs = [], []
+    for i in range(sessoes):
+        app = AppTest.from_file(ENTRADA, default_timeout=timeout)
+        _rerun(app, latencias, erros, 'carga')
+        apps.append(app)
+        rngs.append(random.Random(semente + i))
+
+    for _ in range(passos):
+        for app, rng in zip(apps, rngs):
+            acao = rng.choice(list(ACOES))
+            try:
+                ACOES[acao](app, rng)
+            except (StopIteration, KeyError, ValueError) as e:
+                erros.append(f"{acao}: widget indisponível ({e!r})")
+                continue
+            _rerun(app, latencias, erros, acao)
+    return latencias, erros
+
+def _percentiles(valores):
+    return float(np.percentile(valores, 50)), float(np.percentile(valores, 95))
+
+def run_loadtest(linhas=20000, sessoes=4, passos=10, semente=0):
+    '''
+    1. Gera os dados sintéticos em uma pasta temporária.
+    2. Passo de latência: as sessões simuladas, sem tracemalloc (que distorce os tempos).
+    3. Passo de memória: uma sessão com a mesma sequência, com tracemalloc por seção.
+    Retorna o resumo com p50/p95 das reexecuções (geral e por ação) e, por seção,
+    p50/p95 do tempo e o pico de memória em MB.
+    '''
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta:
+        write_csv_atomic(generate_data(linhas, semente), os.path.join(pasta, "dados_transformados_PPCAAM.csv"), TRANSFORMADO)
+        os.chdir(pasta)
+        try:
+            medidas = {}
+            restaurar = _instrument(medidas)
+            try:
+                latencias, erros = run_sessions(sessoes, passos, semente)
+            finally:
+                restaurar()
+
+            memoria = {}
+            tracemalloc.start()
+            restaurar = _instrument(memoria, memoria=True)
+            try:
+                run_sessions(1, passos, semente)
+            finally:
+                restaurar()
+                tracemalloc.stop()
+        finally:
+            os.chdir(diretorio_original)
+
+    reexecucoes = [t for acao, tempos in latencias.items() if acao != 'carga' for t in tempos]
+    p50, p95 = _percentiles(reexecucoes)
+    return {
+        'linhas': linhas,
+        'sessoes': sessoes,
+        'reexecucoes': len(reexecucoes),
+        'p50_s': p50,
+        'p95_s': p95,
+        'acoes': {acao: dict(zip(('p50_s', 'p95_s'), _percentiles(tempos))) for acao, tempos in latencias.items()},
+        'secoes': {
+            nome: {
+                'p50_s': _percentiles(medidas[nome]['tempo'])[0],
+                'p95_s': _percentiles(medidas[nome]['tempo'])[1],
+                'memoria_mb': max(memoria[nome]['memoria']) / 1024 / 1024,
+            }
+            for nome in SECOES if nome in medidas and nome in memoria
+        },
+        'erros': erros,
+    }
+
+def check_budget(resumo, orcamento):
+    '''Lista as medidas acima do orçamento (budget.json); vazia se tudo couber'''
+    excedidos = []
+    for medida in ('p50_s', 'p95_s'):
+        if medida in orcamento and resumo[medida] > orcamento[medida]:
+            excedidos.append(f"{medida}: {resumo[medida]:.3f} > {orcamento[medida]}")
+    limites = orcamento.get('memoria_mb', {})
+    for nome, limite in limites.items():
+        usado = resumo['secoes'].get(nome, {}).get('memoria_mb')
+        if usado is not None and usado > limite:
+            excedidos.append(f"memória de {nome}: {usado:.1f} MB > {limite} MB")
+    # Toda seção medida precisa de um limite: uma seção nova não passa sem orçamento
+    for nome in resumo['secoes']:
+        if nome not in limites:
+            excedidos.append(f"memória de {nome}: sem limite em memoria_mb")
+    if resumo['erros']:
+        excedidos.append(f"{len(resumo['erros'])} erros durante as interações")
+    return excedidos
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do dashboard PPCAAM (AppTest, sem navegador).")
+    parser.add_argument("--linhas", type=int, help="Tamanho dos dados sintéticos (padrão: o do orçamento)")
+    parser.add_argument("--sessoes", type=int, help="Sessões simuladas (padrão: o do orçamento)")
+    parser.add_argument("--passos", type=int, help="Interações por sessão (padrão: o do orçamento)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--orcamento", default=ORCAMENTO, help="Arquivo JSON com os limites")
+    parser.add_argument("--json", help="Grava o resumo neste arquivo")
+    args = parser.parse_args()
+
+    # O orçamento vale para a escala registrada nele, usada quando não for informada outra
+    with open(args.orcamento, 'r', encoding='utf-8') as f:
+        orcamento = json.load(f)
+    linhas = args.linhas or orcamento.get('linhas', 20000)
+    sessoes = args.sessoes or orcamento.get('sessoes', 4)
+    passos = args.passos or orcamento.get('passos', 10)
+
+    # Avisos do modo sem servidor (ScriptRunContext, conversões para Arrow) poluem a saída
+    logging.disable(logging.WARNING)
+    resumo = run_loadtest(linhas, sessoes, passos, args.semente)
+
+    print(f"{resumo['reexecucoes']} reexecuções, {resumo['sessoes']} sessões, {resumo['linhas']} linhas")
+    print(f"Reexecução: p50 {resumo['p50_s']:.3f}s | p95 {resumo['p95_s']:.3f}s")
+    for acao, tempos in resumo['acoes'].items():
+        print(f"  {acao:<14} p50 {tempos['p50_s']:.3f}s | p95 {tempos['p95_s']:.3f}s")
+    print("Seções:")
+    for nome, secao in resumo['secoes'].items():
+        print(f"  {nome:<14} p50 {secao['p50_s']:.3f}s | p95 {secao['p95_s']:.3f}s | pico {secao['memoria_mb']:.1f} MB")
+    for erro in resumo['erros'][:10]:
+        print(f"Erro: {erro}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resumo, f, ensure_ascii=False, indent=2)
+
+    excedidos = check_budget(resumo, orcamento)
+    if excedidos:
+        print("Orçamento excedido:")
+        for item in excedidos:
+            print(f"  {item}")
+        sys.exit(1)
+    print("Dentro do orçamento.")
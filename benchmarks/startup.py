@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRADA = os.path.join(RAIZ, "ppcaam_visualization.py")
+
+# Módulos cujo tempo de importação é medido isoladamente (interpretador novo para cada um)
+MODULOS = ["streamlit", "pandas", "analytics", "charts", "sections.data", "plotly.express", "statsmodels.api"]
+
+# Primeira pintura: o que o dashboard executa antes do primeiro gráfico
+# (carga dos dados, controles e visão geral), com os mesmos módulos da entrada
+SCRIPT_PRIMEIRA_PINTURA = """
+from sections.data import load_context, sidebar_controls
+from sections import overview
+ctx = load_context()
+sidebar_controls(ctx)
+overview.render(ctx)
+"""
+
+
+def _import_time(modulo):
+    '''Segundos para importar "modulo" em um interpretador novo; None se não estiver instalado'''
+    codigo = (
+        "import importlib, time\n"
+        "t = time.perf_counter()\n"
+        f"importlib.import_module({modulo!r})\n"
+        "print(time.perf_counter() - t)\n"
+    )
+    resultado = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True)
+    if resultado.returncode != 0:
+        return None
+    return float(resultado.stdout.strip().splitlines()[-1])
+
+def _measure_runs(pasta, medida):
+    '''
+    Executado em um interpretador novo (--interno), via AppTest: tempo até a primeira
+    pintura ou a execução completa a frio do dashboard seguida de uma reexecução a quente.
+    O import do próprio streamlit fica fora (custo do servidor, pago uma vez).
+    '''
+    sys.path.insert(0, RAIZ)
+    os.chdir(pasta)
+    from streamlit.testing.v1 import AppTest
+
+    tempos = {}
+    if medida == 'primeira_pintura':
+        inicio = time.perf_counter()
+        AppTest.from_string(SCRIPT_PRIMEIRA_PINTURA, default_timeout=300).run()
+        tempos['primeira_pintura'] = time.perf_counter() - inicio
+        return tempos
+
+    app = AppTest.from_file(ENTRADA, default_timeout=300)
+    inicio = time.perf_counter()
+    app.run()
+    tempos['execucao_fria'] = time.perf_counter() - inicio
+    if app.exception:
+        raise RuntimeError(f"Erro no dashboard: {app.exception[0].value}")
+
+    inicio = time.perf_counter()
+    app.run()
+    tempos['reexecucao'] = time.perf_counter() - inicio
+    return tempos
+
+def _run_once(pasta, medida):
+    resultado = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--interno", medida, "--pasta", pasta],
+        cwd=RAIZ, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr else "falha na medição")
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+def run_benchmark(pasta=".", repeticoes=3):
+    '''
+    Mede o tempo de importação dos módulos e o tempo de primeira pintura, execução a frio
+    e reexecução do dashboard, repetindo cada medição em processos novos.
+    Retorna {'importacao': {modulo: s}, 'execucao': {medida: s}} com as medianas.
+    '''
+    pasta = os.path.abspath(pasta)
+    importacao = {}
+    for modulo in MODULOS:
+        amostras = [_import_time(modulo) for _ in range(repeticoes)]
+        importacao[modulo] = None if None in amostras else statistics.median(amostras)
+
+    execucoes = [
+        {**_run_once(pasta, 'primeira_pintura'), **_run_once(pasta, 'execucao')}
+        for _ in range(repeticoes)
+    ]
+    execucao = {medida: statistics.median(e[medida] for e in execucoes) for medida in execucoes[0]}
+    return {'importacao': importacao, 'execucao': execucao}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo de início do dashboard PPCAAM.")
+    parser.add_argument("--pasta", default=".", help="Pasta com o dados_transformados_PPCAAM.csv")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--json", help="Grava os resultados neste arquivo")
+    parser.add_argument("--interno", choices=['primeira_pintura', 'execucao'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        print(json.dumps(_measure_runs(args.pasta, args.interno)))
+        sys.exit(0)
+
+    resultados = run_benchmark(args.pasta, args.repeticoes)
+    print("Importação (s):")
+    for modulo, segundos in resultados['importacao'].items():
+        print(f"  {modulo:<20} {'não instalado' if segundos is None else f'{segundos:.3f}'}")
+    print("Dashboard (s):")
+    for medida, segundos in resultados['execucao'].items():
+        print(f"  {medida:<20} {segundos:.3f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+import pandas as pd
+
+
+class ResultCache:
+    '''
+    Cache endereçado por conteúdo para os resultados do transform.
+    A chave é o hash do conteúdo das planilhas de entrada, dos arquivos de regras
+    (ex.: secao.json) e da versão do pipeline; o valor é o resultado transformado de cada
+    arquivo, que passa pelo mesmo caminho de gravação (transform.publish) de uma execução
+    normal. Cada entrada é uma pasta <chave>/; o mtime da pasta marca o último uso e as
+    entradas menos usadas são removidas quando o tamanho total passa de "limite_bytes".
+    O mesmo cache guarda também os dataframes de abas individuais (planilhas/<chave>.pkl),
+    que participam da mesma política de remoção. A remoção (evict) roda uma vez por
+    execução, depois das gravações, e não a cada aba: as abas são gravadas por várias
+    threads de leitura ao mesmo tempo.
+    '''
+
+    def __init__(self, pasta=".cache_ppcaam", limite_bytes=256 * 1024 * 1024):
+        self.pasta = pasta
+        self.limite_bytes = limite_bytes
+        self.pasta_planilhas = os.path.join(self.pasta, "planilhas")
+        os.makedirs(self.pasta_planilhas, exist_ok=True)
+        self._indice_hashes = os.path.join(self.pasta, "hashes.json")
+        self._lock_remocao = threading.Lock()
+
+    def _file_hashes(self, arquivos):
+        '''
+        Hash SHA-256 do conteúdo de cada arquivo. O resultado é memorizado por
+        (caminho, mtime, tamanho), então arquivos que não mudaram não são relidos.
+        '''
+        try:
+            with open(self._indice_hashes, 'r', encoding='utf-8') as f:
+                conhecidos = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            conhecidos = {}
+
+        hashes = {}
+        alterado = False
+        for arquivo in arquivos:
+            info = os.stat(arquivo)
+            assinatura = [info.st_mtime_ns, info.st_size]
+            registro = conhecidos.get(os.path.abspath(arquivo))
+            if registro and registro[:2] == assinatura:
+                hashes[arquivo] = registro[2]
+                continue
+            digest = hashlib.sha256()
+            with open(arquivo, 'rb') as f:
+                for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(bloco)
+            hashes[arquivo] = digest.hexdigest()
+            conhecidos[os.path.abspath(arquivo)] = assinatura + [hashes[arquivo]]
+            alterado = True
+
+        if alterado:
+            temporario = self._indice_hashes + ".tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(conhecidos, f)
+            os.replace(temporario, self._indice_hashes)
+        return hashes
+
+    def key(self, entradas, regras, versao, *extras):
+        '''Chave do cache: entradas (por nome e conteúdo), regras, versão do pipeline e parâmetros'''
+        hashes = self._file_hashes(list(entradas) + list(regras))
+        digest = hashlib.sha256(f"versao={versao}".encode('utf-8'))
+        for extra in extras:
+            digest.update(f"|{extra}".encode('utf-8'))
+        for arquivo in sorted(entradas, key=os.path.basename):
+            digest.update(f"|entrada:{os.path.basename(arquivo)}:{hashes[arquivo]}".encode('utf-8'))
+        for arquivo in regras:
+            digest.update(f"|regra:{os.path.basename(arquivo)}:{hashes[arquivo]}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get_result(self, chave):
+        '''Resultado guardado sob "chave" (ex.: lista de (dados, arquivo) por estado), ou None'''
+        entrada = os.path.join(self.pasta, chave)
+        try:
+            resultado = pd.read_pickle(os.path.join(entrada, "resultado.pkl"))
+            # Marca o uso para a política de remoção (menos usados primeiro)
+            os.utime(entrada)
+        except (FileNotFoundError, EOFError):
+            return None
+        return resultado
+
+    def put_result(self, chave, resultado):
+        '''Guarda o resultado sob "chave" (o limite de tamanho é aplicado por evict)'''
+        entrada = os.path.join(self.pasta, chave)
+        temporaria = f"{entrada}.tmp"
+        shutil.rmtree(temporaria, ignore_errors=True)
+        os.makedirs(temporaria)
+        pd.to_pickle(resultado, os.path.join(temporaria, "resultado.pkl"))
+        shutil.rmtree(entrada, ignore_errors=True)
+        os.replace(temporaria, entrada)
+
+    def get_frame(self, chave):
+        '''Dataframe de uma aba guardado sob "chave", ou None'''
+        caminho = os.path.join(self.pasta_planilhas, f"{chave}.pkl")
+        try:
+            quadro = pd.read_pickle(caminho)
+            os.utime(caminho)
+        except (FileNotFoundError, EOFError):
+            return None
+        return quadro
+
+    def put_frame(self, chave, quadro):
+        '''Guarda o dataframe de uma aba sob "chave" (o limite de tamanho é aplicado por evict)'''
+        caminho = os.path.join(self.pasta_planilhas, f"{chave}.pkl")
+        temporario = f"{caminho}.{threading.get_ident()}.tmp"
+        quadro.to_pickle(temporario)
+        os.replace(temporario, caminho)
+
+    def evict(self):
+        '''
+        Remove as entradas usadas há mais tempo até o total caber em limite_bytes.
+        Uma remoção por vez; arquivos que somem durante a varredura (removidos por outro
+        processo ou substituídos) são ignorados.
+        '''
+        with self._lock_remocao:
+            entradas = []
+            for nome in os.listdir(self.pasta):
+                caminho = os.path.join(self.pasta, nome)
+                if not os.path.isdir(caminho) or nome.endswith('.tmp') or caminho == self.pasta_planilhas:
+                    continue
+                try:
+                    tamanho = sum(_size(os.path.join(caminho, arquivo)) for arquivo in os.listdir(caminho))
+                    entradas.append((os.path.getmtime(caminho), tamanho, caminho))
+                except FileNotFoundError:
+                    continue
+            for nome in os.listdir(self.pasta_planilhas):
+                caminho = os.path.join(self.pasta_planilhas, nome)
+                if nome.endswith('.pkl'):
+                    try:
+                        entradas.append((os.path.getmtime(caminho), os.path.getsize(caminho), caminho))
+                    except FileNotFoundError:
+                        continue
+
+            total = sum(tamanho for _, tamanho, _ in entradas)
+            for _, tamanho, caminho in sorted(entradas):
+                if total <= self.limite_bytes:
+                    break
+                if os.path.isdir(caminho):
+                    shutil.rmtree(caminho, ignore_errors=True)
+                else:
+                    try:
+                        os.remove(caminho)
+                    except FileNotFoundError:
+                        pass
+                total -= tamanho
+
+
+def _size(caminho):
+    '''Tamanho do arquivo, 0 se ele já não existir'''
+    try:
+        return os.path.getsize(caminho)
+    except FileNotFoundError:
+        return 0
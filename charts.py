@@ -0,0 +1,128 @@
+from functools import lru_cache
+from importlib.util import find_spec
+
+
+@lru_cache(maxsize=None)
+def has_statsmodels():
+    """Indica se o statsmodels (linha de tendência OLS) está instalado, sem importá-lo"""
+    return find_spec("statsmodels") is not None
+
+def build_distribution_figure(dist_data, dist_column, show_percentage=False, theme="plotly"):
+    """Gráfico de barras da distribuição de uma coluna categórica"""
+    # plotly é importado só ao montar o primeiro gráfico (início mais rápido do dashboard)
+    import plotly.express as px
+
+    fig = px.bar(
+        dist_data,
+        x=dist_column,
+        y='value',
+        text='label',
+        title=f"Distribuição de {dist_column} {'(Percentual)' if show_percentage else '(Valores Absolutos)'}",
+        color=dist_column,
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+
+    fig.update_layout(
+        template=theme if theme != "none" else None,
+        xaxis_title=dist_column,
+        yaxis_title="Percentual (%)" if show_percentage else "Contagem",
+        showlegend=False,
+        height=500
+    )
+
+    fig.update_traces(textposition='outside')
+    return fig
+
+def build_histogram_figure(df, column, theme="plotly"):
+    """Histograma de uma coluna numérica com a linha de média"""
+    import plotly.express as px
+
+    fig = px.histogram(
+        df,
+        x=column,
+        nbins=30,
+        title=f"Distribuição de {column}",
+        color_discrete_sequence=['#636EFA'],
+        opacity=0.8
+    )
+
+    # Adicionar linha de média
+    mean_val = df[column].mean()
+    fig.add_vline(x=mean_val, line_dash="dash", line_color="red",
+                  annotation_text=f"Média: {mean_val:.2f}")
+
+    fig.update_layout(
+        template=theme if theme != "none" else None,
+        height=500,
+        xaxis_title=column,
+        yaxis_title="Frequência",
+        bargap=0.1
+    )
+    return fig
+
+def build_comparison_figure(data, theme="plotly"):
+    """Gráfico de comparação entre duas colunas a partir de analytics.comparison_data"""
+    import plotly.express as px
+
+    if data.kind == 'scatter':
+        # Gráfico de dispersão: numérico vs numérico
+        fig = px.scatter(
+            data.table,
+            x=data.x,
+            y=data.y,
+            title=data.title,
+            trendline="ols" if len(data.table) > 2 and has_statsmodels() else None,
+            color_discrete_sequence=['#EF553B']
+        )
+    else:
+        # Barras (categórico vs numérico) ou barras agrupadas (categórico vs categórico)
+        fig = px.bar(
+            data.table,
+            x=data.x,
+            y=data.y,
+            color=data.color,
+            barmode='group' if data.kind == 'grouped_bar' else 'relative',
+            title=data.title,
+            text=data.y,
+            category_orders=data.category_orders
+        )
+
+        if data.percentage:
+            fig.update_traces(texttemplate='%{text:.1f}%')
+
+    # Configurações comuns
+    fig.update_layout(
+        template=theme if theme != "none" else None,
+        xaxis_title=data.x_title,
+        yaxis_title=data.y_title,
+        height=500,
+        showlegend=data.show_legend
+    )
+
+    # Rótulos acima das barras (só nos gráficos de barras simples, não na dispersão)
+    if data.kind == 'bar':
+        fig.update_traces(textposition='outside')
+
+    return fig
+
+def build_correlation_figure(corr_matrix, theme="plotly"):
+    """Heatmap da matriz de correlação (analytics.correlation_data)"""
+    import plotly.express as px
+
+    # Criar heatmap
+    fig = px.imshow(
+        corr_matrix,
+        text_auto=True,
+        aspect="auto",
+        color_continuous_scale='RdBu',
+        title="Matriz de Correlação",
+        labels=dict(color="Correlação")
+    )
+
+    fig.update_layout(
+        template=theme if theme != "none" else None,
+        height=500,
+        xaxis_title="Variáveis",
+        yaxis_title="Variáveis"
+    )
+    return fig
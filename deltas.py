@@ -0,0 +1,153 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from schema import MESES, VARIACOES, apply_schema, read_csv
+
+
+# Série comparada: uma métrica de uma seção de uma unidade, ao longo dos anos
+CHAVES_SERIE = ['unidade', 'secao', 'metrica']
+# Períodos da tabela de variações: os doze meses e o ano inteiro (total)
+PERIODO_ANO = 'ano'
+PERIODOS = [*MESES, PERIODO_ANO]
+# Medidas oferecidas no ranking → (coluna da diferença, coluna percentual)
+MEDIDAS = {
+    'Ano a ano (YoY)': ('variacao_anual', 'variacao_anual_pct'),
+    'Mês a mês (MoM)': ('variacao_mensal', 'variacao_mensal_pct'),
+    'Acumulado no ano (YTD)': ('variacao_acumulada', 'variacao_acumulada_pct'),
+}
+
+
+def deltas_path(caminho_csv):
+    '''Arquivo da tabela de variações, na mesma pasta do arquivo transformado'''
+    return os.path.join(os.path.dirname(caminho_csv), "dados_variacoes_PPCAAM.csv")
+
+def _version_path(caminho_csv):
+    '''Versão do arquivo transformado de que a tabela de variações foi calculada'''
+    return f"{os.path.splitext(deltas_path(caminho_csv))[0]}.versao.json"
+
+def _file_version(caminho):
+    info = os.stat(caminho)
+    return [info.st_mtime_ns, info.st_size]
+
+def save_deltas(variacoes, caminho_csv, versao=None):
+    '''
+    Grava a tabela de variações (troca atômica) marcada com a versão do arquivo transformado
+    ("versao", ou a atual). A marca anterior é apagada antes da troca, então um leitor
+    nunca combina a marca antiga com a tabela nova.
+    '''
+    versao = _file_version(caminho_csv) if versao is None else list(versao)
+    marca = _version_path(caminho_csv)
+    if os.path.exists(marca):
+        os.remove(marca)
+    destino = deltas_path(caminho_csv)
+    temporario = f"{destino}.tmp"
+    apply_schema(variacoes, VARIACOES).to_csv(temporario, index=False, encoding='utf-8-sig')
+    os.replace(temporario, destino)
+    with open(f"{marca}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(versao, f)
+    os.replace(f"{marca}.tmp", marca)
+
+def deltas_current(caminho_csv):
+    '''Se a tabela de variações gravada corresponde à versão atual do arquivo transformado'''
+    try:
+        with open(_version_path(caminho_csv), 'r', encoding='utf-8') as f:
+            return json.load(f) == _file_version(caminho_csv) and os.path.exists(deltas_path(caminho_csv))
+    except (FileNotFoundError, ValueError):
+        return False
+
+def load_deltas(caminho_csv):
+    '''Tabela de variações gravada, ou None se ausente ou de outra versão do arquivo transformado'''
+    if not deltas_current(caminho_csv):
+        return None
+    try:
+        variacoes = read_csv(deltas_path(caminho_csv), VARIACOES)
+    except FileNotFoundError:
+        return None
+    # Os períodos seguem a ordem do calendário, como em compute_deltas
+    variacoes['periodo'] = pd.Categorical(variacoes['periodo'].astype(str), categories=PERIODOS, ordered=True)
+    return variacoes
+
+def _percent(diferenca, base):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(base != 0, np.round(diferenca / np.abs(base) * 100, 2), np.nan)
+
+def _masked_cumsum(valores):
+    '''Soma acumulada por linha ignorando nulos, mantendo nulo onde o mês é nulo'''
+    acumulado = np.nancumsum(valores, axis=1)
+    acumulado[np.isnan(valores)] = np.nan
+    return acumulado
+
+def compute_deltas(dados):
+    '''
+    Tabela de variações de todas as séries (unidade, secao, metrica) em todos os anos carregados,
+    calculada de forma vetorizada sobre matrizes séries × meses:
+    - variacao_mensal (MoM): mês menos o mês anterior (janeiro compara com dezembro do ano anterior).
+    - variacao_anual (YoY): mês menos o mesmo mês do ano anterior; no período "ano", o total
+      menos a coluna ano_anterior da própria ficha.
+    - acumulado (YTD) e variacao_acumulada: acumulado até o mês menos o acumulado até o mesmo
+      mês do ano anterior.
+    Cada variação tem a versão percentual (sobre o valor de comparação; nula se ele for zero).
+    Retorna uma linha por (ano_referencia, unidade, secao, metrica, periodo), no esquema VARIACOES.
+    '''
+    chaves = ['ano_referencia', *CHAVES_SERIE]
+    # Linhas repetidas da mesma série (ex.: abas diferentes) são somadas
+    base = dados.groupby(chaves, observed=True, sort=True)[['ano_anterior', *MESES, 'total']].sum(min_count=1)
+
+    valores = base[MESES].to_numpy(dtype=float, na_value=np.nan)
+    indice_anterior = pd.MultiIndex.from_arrays(
+        [base.index.get_level_values(0) - 1, *[base.index.get_level_values(c) for c in CHAVES_SERIE]],
+        names=chaves
+    )
+    anteriores = base[MESES].reindex(indice_anterior).to_numpy(dtype=float, na_value=np.nan)
+
+    # Mês anterior: dezembro do ano anterior seguido de janeiro…novembro do próprio ano
+    mes_anterior = np.column_stack([anteriores[:, -1], valores[:, :-1]])
+    acumulado = _masked_cumsum(valores)
+    acumulado_anterior = _masked_cumsum(anteriores)
+
+    total = base['total'].to_numpy(dtype=float, na_value=np.nan)
+    ano_anterior = base['ano_anterior'].to_numpy(dtype=float, na_value=np.nan)
+    sem_mensal = np.full(len(base), np.nan)
+
+    # Matrizes séries × 13 períodos (12 meses + ano)
+    def periodos(mensal, anual):
+        return np.column_stack([mensal, anual])
+
+    valor = periodos(valores, total)
+    comparacao_mensal = periodos(mes_anterior, sem_mensal)
+    comparacao_anual = periodos(anteriores, ano_anterior)
+    acumulado_total = periodos(acumulado, total)
+    comparacao_acumulada = periodos(acumulado_anterior, ano_anterior)
+
+    # Formato longo: cada série vira 13 linhas; tipos já no esquema, sem reconversão
+    def longo(matriz):
+        return pd.array(matriz.reshape(-1), dtype='Int32')
+
+    variacoes = base.index.to_frame(index=False).take(np.repeat(np.arange(len(base)), len(PERIODOS)))
+    variacoes = variacoes.reset_index(drop=True)
+    variacoes['periodo'] = pd.Categorical.from_codes(np.tile(np.arange(len(PERIODOS)), len(base)),
+                                                     categories=PERIODOS, ordered=True)
+    variacoes['valor'] = longo(valor)
+    variacoes['variacao_mensal'] = longo(valor - comparacao_mensal)
+    variacoes['variacao_anual'] = longo(valor - comparacao_anual)
+    variacoes['acumulado'] = longo(acumulado_total)
+    variacoes['variacao_acumulada'] = longo(acumulado_total - comparacao_acumulada)
+    variacoes['variacao_mensal_pct'] = _percent(valor - comparacao_mensal, comparacao_mensal).reshape(-1)
+    variacoes['variacao_anual_pct'] = _percent(valor - comparacao_anual, comparacao_anual).reshape(-1)
+    variacoes['variacao_acumulada_pct'] = _percent(acumulado_total - comparacao_acumulada, comparacao_acumulada).reshape(-1)
+    return apply_schema(variacoes, VARIACOES)
+
+def rank_movers(variacoes, ano_referencia, periodo, medida, percentual=False, n=10, quedas=False):
+    '''
+    As "n" séries com maior alta (ou queda) da medida no período de um ano.
+    Séries sem valor de comparação (ex.: primeiro ano carregado) ficam de fora.
+    '''
+    coluna_diferenca, coluna_pct = MEDIDAS[medida]
+    coluna = coluna_pct if percentual else coluna_diferenca
+    selecao = variacoes[(variacoes['ano_referencia'] == ano_referencia) & (variacoes['periodo'] == periodo)]
+    selecao = selecao[selecao[coluna].notna()]
+    ordenada = selecao.sort_values(coluna, ascending=quedas, kind='stable')
+    return ordenada.head(n)[[*CHAVES_SERIE, 'valor', coluna_diferenca, coluna_pct]].reset_index(drop=True)
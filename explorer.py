@@ -0,0 +1,57 @@
+import numpy as np
+
+
+# Colunas cobertas pela busca textual do explorador
+COLUNAS_BUSCA = ['secao', 'metrica']
+
+
+def build_search_index(df, colunas=COLUNAS_BUSCA):
+    '''
+    Índice de busca por coluna: os rótulos distintos em minúsculas e o código de cada linha.
+    Uma busca compara o termo só com os rótulos distintos (poucas dezenas) e depois
+    expande o resultado para as linhas pelos códigos, sem percorrer o texto de cada linha.
+    '''
+    indice = {}
+    for coluna in colunas:
+        if coluna not in df.columns:
+            continue
+        categorias = df[coluna].astype('category')
+        rotulos = categorias.cat.categories.astype(str).str.lower().to_numpy()
+        indice[coluna] = (rotulos, categorias.cat.codes.to_numpy())
+    return indice
+
+def search_mask(indice, termo, n_linhas):
+    '''Máscara booleana das linhas cujo secao/metrica contém o termo (sem diferenciar maiúsculas)'''
+    termo = termo.strip().lower()
+    if not termo:
+        return np.ones(n_linhas, dtype=bool)
+    mascara = np.zeros(n_linhas, dtype=bool)
+    for rotulos, codigos in indice.values():
+        encontrados = np.array([termo in rotulo for rotulo in rotulos] + [False])
+        # O código -1 (valor nulo) aponta para o último elemento, sempre False
+        mascara |= encontrados[codigos]
+    return mascara
+
+def sort_order(df, coluna, ascendente=True):
+    '''Posições das linhas de df ordenadas pela coluna (nulos ao final, ordenação estável)'''
+    ordenada = df[coluna].sort_values(ascending=ascendente, na_position='last', kind='stable')
+    return df.index.get_indexer(ordenada.index)
+
+def selected_order(ordem, mascara):
+    '''
+    Posições das linhas selecionadas (filtros + busca), já na ordem pré-calculada.
+    É o único passo linear no tamanho dos dados; calculado uma vez por seleção, deixa
+    cada troca de página como um recorte (page).
+    '''
+    return ordem[mascara[ordem]]
+
+def page(df, selecionadas, pagina, tamanho):
+    '''Fatia de uma página das posições selecionadas, junto com o total de linhas selecionadas'''
+    inicio = pagina * tamanho
+    return df.iloc[selecionadas[inicio:inicio + tamanho]], len(selecionadas)
+
+def positions_mask(df, subconjunto):
+    '''Máscara sobre as linhas de df das linhas presentes em "subconjunto" (ex.: df_filtered)'''
+    mascara = np.zeros(len(df), dtype=bool)
+    mascara[df.index.get_indexer(subconjunto.index)] = True
+    return mascara
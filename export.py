@@ -0,0 +1,161 @@
+import argparse
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from schema import TRANSFORMADO, read_csv
+
+
+FORMATOS = ['xlsx', 'csv']
+# Chave de cada arquivo exportado
+CHAVES_EXPORTACAO = ['unidade', 'ano_referencia']
+# Larguras das colunas da planilha (as demais usam LARGURA_VALOR)
+LARGURAS = {'ano_referencia': 14, 'unidade': 10, 'secao': 40, 'metrica': 50, 'planilha': 16}
+LARGURA_VALOR = 11
+
+
+def export_filename(unidade, ano_referencia, formato='xlsx'):
+    '''Nome do arquivo exportado de uma unidade/ano (chaves nulas viram "sem_unidade"/"sem_ano")'''
+    unidade_segura = 'sem_unidade' if pd.isna(unidade) else re.sub(r'[^0-9A-Za-z_-]+', '_', str(unidade))
+    ano = 'sem_ano' if pd.isna(ano_referencia) else int(ano_referencia)
+    return f"PPCAAM_{unidade_segura}_{ano}.{formato}"
+
+def _rows(grupo):
+    '''Linhas do grupo como tuplas de valores Python (nulos como None), geradas uma a uma'''
+    return grupo.astype(object).where(grupo.notna(), None).itertuples(index=False, name=None)
+
+def write_xlsx(caminho, grupo, titulo="Dados"):
+    '''
+    Grava o grupo em uma planilha formatada (cabeçalho destacado e congelado, largura das
+    colunas) com o modo write_only do openpyxl, que escreve as linhas no arquivo à medida
+    que são acrescentadas, sem montar a planilha em memória. Só o cabeçalho leva estilo:
+    células de dados estilizadas uma a uma deixam a gravação duas vezes mais lenta.
+    '''
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet(title=titulo[:31])
+    planilha.freeze_panes = 'A2'
+    for i, coluna in enumerate(grupo.columns, start=1):
+        planilha.column_dimensions[get_column_letter(i)].width = LARGURAS.get(coluna, LARGURA_VALOR)
+
+    fonte, preenchimento = Font(bold=True, color='FFFFFF'), PatternFill('solid', fgColor='1F4E78')
+    cabecalho = []
+    for coluna in grupo.columns:
+        celula = WriteOnlyCell(planilha, value=coluna)
+        celula.font, celula.fill = fonte, preenchimento
+        celula.alignment = Alignment(horizontal='center')
+        cabecalho.append(celula)
+    planilha.append(cabecalho)
+
+    for linha in _rows(grupo):
+        planilha.append(linha)
+
+    temporario = f"{caminho}.tmp"
+    workbook.save(temporario)
+    os.replace(temporario, caminho)
+    return caminho
+
+def write_csv(caminho, grupo):
+    '''Grava o grupo em CSV (utf-8 com BOM, como os demais arquivos do pipeline)'''
+    temporario = f"{caminho}.tmp"
+    grupo.to_csv(temporario, index=False, encoding='utf-8-sig')
+    os.replace(temporario, caminho)
+    return caminho
+
+def _export_group(grupo, caminho, formato, titulo):
+    '''Executado no pool: grava a fatia de uma unidade/ano'''
+    if formato == 'csv':
+        return write_csv(caminho, grupo)
+    return write_xlsx(caminho, grupo, titulo)
+
+def export_units(dados, output_dir, formato='xlsx', max_workers=None, processos=True):
+    '''
+    Grava um arquivo por (unidade, ano_referencia) em "output_dir", em paralelo.
+    1. Agrupa só as posições das linhas (groupby.indices), sem copiar o dataframe.
+    2. A fatia de cada grupo só é recortada quando há vaga no pool: no máximo duas fatias
+       por worker ficam em voo, então a memória não cresce com o tamanho da exportação.
+    3. Com "processos", o pool é de processos (a escrita do openpyxl é Python puro e não
+       ganha com threads); sem, de threads (ex.: dentro do dashboard).
+    4. Cada arquivo é trocado com os.replace ao final, nunca fica gravado pela metade.
+    5. Linhas sem unidade ou ano também são exportadas (dropna=False), em arquivos
+       "sem_unidade"/"sem_ano", em vez de sumirem da exportação.
+    Retorna a lista de arquivos gravados. Se algum grupo falhar, os demais ainda são
+    gravados e, ao final, RuntimeError lista todas as falhas.
+    '''
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato '{formato}' não suportado: use {FORMATOS}")
+    os.makedirs(output_dir, exist_ok=True)
+    indices = dados.groupby(CHAVES_EXPORTACAO, sort=True, observed=True, dropna=False).indices
+
+    gravados, falhas = [], []
+    pool = ProcessPoolExecutor if processos else ThreadPoolExecutor
+    janela = 2 * (max_workers or os.cpu_count() or 1)
+    with pool(max_workers=max_workers) as executor:
+        futuros = {}
+
+        def coletar(concluidos):
+            for futuro in concluidos:
+                unidade, ano = futuros.pop(futuro)
+                try:
+                    gravados.append(futuro.result())
+                except Exception as e:
+                    falhas.append(f"{unidade}/{ano}: {e}")
+
+        for (unidade, ano), posicoes in indices.items():
+            if len(futuros) >= janela:
+                coletar(wait(futuros, return_when=FIRST_COMPLETED).done)
+            caminho = os.path.join(output_dir, export_filename(unidade, ano, formato))
+            futuro = executor.submit(_export_group, dados.iloc[posicoes], caminho, formato, f"{unidade} {ano}")
+            futuros[futuro] = (unidade, ano)
+        coletar(list(futuros))
+    if falhas:
+        raise RuntimeError(f"{len(falhas)} de {len(indices)} arquivos não foram exportados: " + "; ".join(falhas))
+    return sorted(gravados)
+
+def export_zip(dados, formato='xlsx', max_workers=None, processos=False):
+    '''
+    Exportação por unidade/ano compactada em um zip (ex.: download no dashboard).
+    Os arquivos são gravados em paralelo em uma pasta temporária e então adicionados
+    ao zip um a um, lidos do disco; retorna o conteúdo do zip.
+    '''
+    with tempfile.TemporaryDirectory() as pasta:
+        arquivos = export_units(dados, pasta, formato, max_workers, processos)
+        destino = os.path.join(pasta, "exportacao.zip")
+        with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as pacote:
+            for arquivo in arquivos:
+                pacote.write(arquivo, os.path.basename(arquivo))
+        with open(destino, 'rb') as f:
+            return f.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta um arquivo por unidade e ano de referência.")
+    parser.add_argument("--entrada", default="dados_transformados_PPCAAM.csv")
+    parser.add_argument("--saida", default="exportacao")
+    parser.add_argument("--formato", choices=FORMATOS, default='xlsx')
+    parser.add_argument("--unidade", action="append", help="Exporta só esta unidade (pode repetir)")
+    parser.add_argument("--ano", type=int, action="append", help="Exporta só este ano (pode repetir)")
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    dados = read_csv(args.entrada, TRANSFORMADO)
+    selecao = pd.Series(True, index=dados.index)
+    if args.unidade:
+        selecao &= dados['unidade'].isin(args.unidade)
+    if args.ano:
+        selecao &= dados['ano_referencia'].isin(args.ano)
+    if not selecao.all():
+        dados = dados[selecao]
+    try:
+        arquivos = export_units(dados, args.saida, args.formato, args.processos)
+    except RuntimeError as e:
+        print(f"Erro na exportação: {e}")
+        raise SystemExit(1)
+    print(f"Arquivos exportados com sucesso em '{args.saida}': {len(arquivos)}")
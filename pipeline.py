@@ -0,0 +1,113 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from transform import read_workbooks, clean_frame, transform_frame, state_from_filename
+
+
+# Marca o fim do fluxo entre as etapas
+_FIM = object()
+
+
+@dataclass
+class StateResult:
+    '''Resultado de um estado ao longo do pipeline; "erro" interrompe as etapas seguintes'''
+    arquivo: str
+    estado: str
+    dados: pd.DataFrame = None
+    erro: Exception = None
+    etapa: str = None
+
+
+def _stage(nome, funcao, entrada, saida):
+    '''
+    Consome itens de "entrada", aplica "funcao" aos dados e envia para "saida".
+    A fila de saída é limitada: se a etapa seguinte estiver atrasada, esta etapa
+    bloqueia no put (back-pressure). Um erro fica registrado no item do estado,
+    que segue adiante sem processamento para ser reportado no final.
+    '''
+    while True:
+        item = entrada.get()
+        if item is _FIM:
+            saida.put(_FIM)
+            return
+        if item.erro is None:
+            try:
+                item.dados = funcao(item.dados)
+            except Exception as e:
+                item.erro = e
+                item.etapa = nome
+                item.dados = None
+        saida.put(item)
+
+def _read(arquivos, saida, cache, janela):
+    '''
+    Primeira etapa: lê até "janela" arquivos ao mesmo tempo, com as abas distribuídas
+    em um pool de processos, e só avança quando houver espaço na fila.
+    Um erro fora da leitura de um arquivo (ex.: ao iniciar ou encerrar o pool) vira o erro
+    dos arquivos ainda não enviados, e o fim do fluxo é sempre sinalizado, para que as
+    etapas seguintes e run_pipeline não fiquem esperando para sempre.
+    '''
+    enviados = set()
+    try:
+        with ProcessPoolExecutor() as executor:
+            for arquivo, dados, erro in read_workbooks(arquivos, executor, cache, janela):
+                item = StateResult(arquivo=arquivo, estado=state_from_filename(arquivo), dados=dados)
+                if erro is not None:
+                    item.erro = erro
+                    item.etapa = 'leitura'
+                enviados.add(arquivo)
+                saida.put(item)
+    except Exception as e:
+        for arquivo in arquivos:
+            if arquivo not in enviados:
+                saida.put(StateResult(arquivo=arquivo, estado=state_from_filename(arquivo), erro=e, etapa='leitura'))
+    finally:
+        saida.put(_FIM)
+
+def run_pipeline(arquivos, ano_referencia, tamanho_fila=2, cache=None):
+    '''
+    Executa leitura → limpeza → transformação em threads encadeadas por filas limitadas.
+    Enquanto a planilha do estado B é lida, o estado A já está sendo limpo e transformado;
+    com "tamanho_fila" pequeno, no máximo alguns estados ficam em memória ao mesmo tempo,
+    então o pico de memória acompanha a maior planilha e não o país inteiro.
+    Com "cache" (cache.ResultCache), as abas já lidas em execuções anteriores são reutilizadas.
+    Retorna a lista de StateResult na ordem de conclusão (com dados ou erro por estado).
+    '''
+    lidos = queue.Queue(maxsize=tamanho_fila)
+    limpos = queue.Queue(maxsize=tamanho_fila)
+    transformados = queue.Queue(maxsize=tamanho_fila)
+
+    def limpar(dados):
+        estado = dados['estado'].iloc[0] if len(dados) else None
+        return clean_frame(dados, contexto=f"estado {estado}")
+
+    def transformar(dados):
+        estado = dados['estado'].iloc[0] if len(dados) else None
+        return transform_frame(dados, ano_referencia, contexto=f"estado {estado}")
+
+    threads = [
+        threading.Thread(target=_read, args=(arquivos, lidos, cache, tamanho_fila), daemon=True),
+        threading.Thread(target=_stage, args=('limpeza', limpar, lidos, limpos), daemon=True),
+        threading.Thread(target=_stage, args=('transformação', transformar, limpos, transformados), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    resultados = []
+    while True:
+        item = transformados.get()
+        if item is _FIM:
+            break
+        if item.erro is not None:
+            print(f"Erro no estado {item.estado} ({item.etapa}): {item.erro}")
+        else:
+            print(f"Estado {item.estado} transformado: {len(item.dados)} linhas")
+        resultados.append(item)
+
+    for thread in threads:
+        thread.join()
+    return resultados
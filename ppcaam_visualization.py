@@ -1,173 +1,24 @@
-# Task 1: Analisar o código existente e identificar problemas
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import importlib
 import warnings
-import os
-warnings.filterwarnings('ignore')
-
-st.set_page_config(page_title="Dashboard PPCAAM", page_icon="📊", layout="wide")
-
-todo_list = [
-    {"task": "Analisar o código existente e identificar problemas", "status": "pending"},
-    {"task": "Corrigir problemas de carregamento do CSV", "status": "pending"},
-    {"task": "Verificar e corrigir funções de preparação de dados", "status": "pending"},
-    {"task": "Testar visualizações com dados reais", "status": "pending"},
-    {"task": "Adicionar tratamento de erros robusto", "status": "pending"},
-    {"task": "Otimizar performance e cache", "status": "pending"},
-    {"task": "Adicionar mais opções de visualização", "status": "pending"},
-    {"task": "Testar funcionalidade completa", "status": "pending"}
-]
-
-todo_list[0]["status"] = "in progress"
-
-# Verificar se o arquivo existe
-csv_file = "dados_transformados_PPCAAM.csv"
-if not os.path.exists(csv_file):
-    st.error(f"❌ Arquivo '{csv_file}' não encontrado no diretório atual.")
-    st.info(f"Diretório atual: {os.getcwd()}")
-    st.info("Arquivos disponíveis:")
-    for file in os.listdir('.'):
-        if file.endswith('.csv'):
-            st.write(f"- {file}")
-    
-    # Oferecer opção de upload
-    uploaded_file = st.file_uploader("Ou faça upload do arquivo CSV:", type=['csv'])
-    if uploaded_file is not None:
-        csv_file = uploaded_file
-        st.success("✅ Arquivo carregado com sucesso!")
-    else:
-        st.stop()
-
-todo_list[0]["status"] = "completed"
-todo_list[1]["status"] = "in progress"
-
-# Task 2: Corrigir problemas de carregamento do CSV
-@st.cache_data
-def load_data(file_path):
-    """Carrega dados do CSV com múltiplas tentativas de encoding"""
-    try:
-        if hasattr(file_path, 'read'):  # Se for um arquivo carregado
-            df = pd.read_csv(file_path, encoding='utf-8')
-        else:
-            df = pd.read_csv(file_path, encoding='utf-8')
-        return df
-    except UnicodeDecodeError:
-        try:
-            if hasattr(file_path, 'read'):
-                file_path.seek(0)  # Reset file pointer
-                df = pd.read_csv(file_path, encoding='latin-1')
-            else:
-                df = pd.read_csv(file_path, encoding='latin-1')
-            return df
-        except Exception as e:
-            st.error(f"Erro ao ler o arquivo: {e}")
-            return None
-    except Exception as e:
-        st.error(f"Erro inesperado: {e}")
-        return None
-
-# Carregar dados
-df = load_data(csv_file)
-
-if df is not None:
-    st.success(f"✅ Dados carregados com sucesso! Shape: {df.shape}")
-    todo_list[1]["status"] = "completed"
-    todo_list[2]["status"] = "in progress"
-else:
-    st.error("❌ Falha ao carregar os dados.")
-    st.stop()
 
-# Task 3: Verificar e corrigir funções de preparação de dados
-def prepare_categorical_data(df, column_name, show_percentage=False):
-    """Prepara dados para gráficos categóricos"""
-    if column_name not in df.columns:
-        st.warning(f"Coluna '{column_name}' não encontrada no dataset.")
-        return None
-    
-    try:
-        # Remove valores NaN
-        clean_series = df[column_name].dropna()
-        
-        if len(clean_series) == 0:
-            st.warning(f"Coluna '{column_name}' não tem dados válidos.")
-            return None
-            
-        value_counts = clean_series.value_counts().reset_index()
-        value_counts.columns = [column_name, 'count']
-        
-        if show_percentage:
-            total = value_counts['count'].sum()
-            if total > 0:
-                value_counts['value'] = (value_counts['count'] / total * 100).round(2)
-                value_counts['label'] = value_counts['value'].astype(str) + '%'
-            else:
-                value_counts['value'] = value_counts['count']
-                value_counts['label'] = value_counts['value'].astype(str)
-        else:
-            value_counts['value'] = value_counts['count']
-            value_counts['label'] = value_counts['value'].astype(str)
-        
-        return value_counts
-    except Exception as e:
-        st.error(f"Erro ao preparar dados categóricos: {e}")
-        return None
-
-def prepare_numerical_data(df, column_name, show_percentage=False):
-    """Prepara dados para gráficos numéricos"""
-    if column_name not in df.columns:
-        return None
-    
-    try:
-        clean_series = df[column_name].dropna()
-        
-        if show_percentage and len(clean_series) > 0:
-            total = clean_series.sum()
-            if total != 0:
-                normalized = (clean_series / total * 100).round(2)
-                return normalized
-        return clean_series
-    except Exception as e:
-        st.error(f"Erro ao preparar dados numéricos: {e}")
-        return df[column_name]
+import streamlit as st
 
-def detect_column_types(df):
-    """Detecta automaticamente tipos de colunas"""
-    categorical_cols = []
-    numerical_cols = []
-    datetime_cols = []
-    
-    for col in df.columns:
-        try:
-            # Verifica se é datetime
-            if pd.api.types.is_datetime64_any_dtype(df[col]):
-                datetime_cols.append(col)
-            # Verifica se é numérico
-            elif pd.api.types.is_numeric_dtype(df[col]):
-                numerical_cols.append(col)
-            # Para colunas de texto, verifica se tem poucos valores únicos
-            elif df[col].dtype == 'object' or df[col].nunique() <= 30:
-                categorical_cols.append(col)
-            else:
-                # Por padrão, considera como categórica
-                categorical_cols.append(col)
-        except:
-            # Em caso de erro, considera como categórica
-            categorical_cols.append(col)
-    
-    return categorical_cols, numerical_cols, datetime_cols
+from sections import SECOES, diagnostics, upload
+from sections.data import load_context, sidebar_controls
+warnings.filterwarnings('ignore')
 
-# Detectar tipos de colunas
-categorical_cols, numerical_cols, datetime_cols = detect_column_types(df)
+st.set_page_config(page_title="Dashboard PPCAAM", page_icon="📊", layout="wide")
 
-st.sidebar.success(f"📊 {len(categorical_cols)} categóricas | {len(numerical_cols)} numéricas | {len(datetime_cols)} datas")
+# Cada módulo de sections/ só é importado quando vai ser desenhado: a carga dos dados e a
+# visão geral aparecem antes de o plotly ser importado, e a página de testes/dicas só é
+# carregada quando escolhida.
+PAGINAS = {"📊 Dashboard": SECOES, "✅ Testes e Dicas": ["help"]}
 
-todo_list[2]["status"] = "completed"
-todo_list[3]["status"] = "in progress"
+# Carregar dados (com o painel de diagnóstico ligado, a execução inteira é medida)
+diagnostics.start_run()
+with diagnostics.section("data"):
+    ctx = load_context()
 
-# Task 4: Testar visualizações com dados reais
 # Configuração principal do dashboard
 st.title("📊 Dashboard Analítico - Dados PPCAAM")
 st.markdown("""
@@ -175,772 +26,14 @@ Dashboard interativo para análise dos dados transformados do PPCAAM.
 Use os controles na barra lateral para personalizar as visualizações.
 """)
 
-# Display basic dataset info
-with st.expander("📋 Informações do Dataset", expanded=True):
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total de Registros", len(df))
-    with col2:
-        st.metric("Total de Colunas", len(df.columns))
-    with col3:
-        missing = df.isnull().sum().sum()
-        st.metric("Dados Faltantes", missing)
-    with col4:
-        st.metric("Memória Usada", f"{df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
-    
-    st.write("**Amostra dos dados (primeiras 10 linhas):**")
-    st.dataframe(df.head(10), use_container_width=True, height=300)
-    
-    tab1, tab2 = st.tabs(["📈 Estatísticas", "🔍 Detalhes das Colunas"])
-    
-    with tab1:
-        st.write("**Estatísticas descritivas:**")
-        st.dataframe(df.describe(include='all').T, use_container_width=True)
-    
-    with tab2:
-        st.write("**Informações das colunas:**")
-        col_info = []
-        for col in df.columns:
-            col_info.append({
-                'Coluna': col,
-                'Tipo': str(df[col].dtype),
-                'Valores Únicos': df[col].nunique(),
-                'Valores Nulos': df[col].isnull().sum(),
-                'Exemplo': str(df[col].iloc[0]) if len(df) > 0 else ''
-            })
-        st.dataframe(pd.DataFrame(col_info), use_container_width=True)
-
-todo_list[3]["status"] = "completed"
-todo_list[4]["status"] = "in progress"
-
-# Task 5: Adicionar tratamento de erros robusto
-# Sidebar controls
-st.sidebar.header("⚙️ Controles do Dashboard")
-
-# Toggle para porcentagem/valores
-show_percentage = st.sidebar.toggle("Mostrar Percentuais (%)", value=False, 
-                                   help="Alterna entre mostrar valores absolutos e percentuais")
-
-# Seletor de temas
-theme = st.sidebar.selectbox("Tema do Gráfico", 
-                            ["plotly", "plotly_white", "plotly_dark", "ggplot2", "seaborn", "none"])
-
-# Filtros dinâmicos
-st.sidebar.header("🔍 Filtros de Dados")
-
-# Criar cópia para filtros
-df_filtered = df.copy()
-
-# Filtros para colunas categóricas
-if categorical_cols:
-    selected_cat_filter = st.sidebar.selectbox("Filtrar por categoria:", 
-                                              ["Nenhum"] + categorical_cols[:10])
-    
-    if selected_cat_filter != "Nenhum":
-        try:
-            unique_values = df_filtered[selected_cat_filter].dropna().unique()
-            if len(unique_values) > 0:
-                selected_values = st.sidebar.multiselect(
-                    f"Valores de {selected_cat_filter}:",
-                    options=list(unique_values),
-                    default=list(unique_values[:min(5, len(unique_values))])
-                )
-                if selected_values:
-                    df_filtered = df_filtered[df_filtered[selected_cat_filter].isin(selected_values)].copy()
-                    st.sidebar.info(f"Filtrado: {len(df_filtered)} registros")
-            else:
-                st.sidebar.warning(f"Coluna '{selected_cat_filter}' não tem valores válidos")
-        except Exception as e:
-            st.sidebar.error(f"Erro ao filtrar: {e}")
-
-# Filtro para colunas numéricas
-if numerical_cols:
-    selected_num_filter = st.sidebar.selectbox("Filtrar por valor numérico:", 
-                                              ["Nenhum"] + numerical_cols[:10])
-    
-    if selected_num_filter != "Nenhum":
-        try:
-            min_val = float(df_filtered[selected_num_filter].min())
-            max_val = float(df_filtered[selected_num_filter].max())
-            
-            if min_val != max_val:
-                value_range = st.sidebar.slider(
-                    f"Intervalo de {selected_num_filter}:",
-                    min_val, max_val, (min_val, max_val)
-                )
-                df_filtered = df_filtered[
-                    (df_filtered[selected_num_filter] >= value_range[0]) & 
-                    (df_filtered[selected_num_filter] <= value_range[1])
-                ].copy()
-                st.sidebar.info(f"Filtrado: {len(df_filtered)} registros")
-            else:
-                st.sidebar.warning(f"Coluna '{selected_num_filter}' tem apenas um valor: {min_val}")
-        except Exception as e:
-            st.sidebar.error(f"Erro ao filtrar numérico: {e}")
-
-# Mostrar estatísticas dos filtros
-st.sidebar.header("📊 Estatísticas do Filtro")
-st.sidebar.metric("Registros Originais", len(df))
-st.sidebar.metric("Registros Filtrados", len(df_filtered))
-st.sidebar.metric("Redução", f"{((len(df) - len(df_filtered)) / len(df) * 100):.1f}%" if len(df) > 0 else "0%")
-
-todo_list[4]["status"] = "completed"
-todo_list[5]["status"] = "in progress"
-
-# Task 6: Otimizar performance e cache
-# Visualização 1: Distribuição de Dados
-st.subheader("📈 1. Análise de Distribuição")
-
-col1, col2 = st.columns([3, 1])
-
-with col1:
-    # Seleção de coluna para distribuição
-    available_cols = categorical_cols if categorical_cols else numerical_cols
-    
-    if available_cols:
-        dist_column = st.selectbox("Selecione a coluna para análise de distribuição:", 
-                                  available_cols, key="dist_col")
-        
-        if dist_column in categorical_cols:
-            # Gráfico de barras para categóricas
-            dist_data = prepare_categorical_data(df_filtered, dist_column, show_percentage)
-            
-            if dist_data is not None and len(dist_data) > 0:
-                fig1 = px.bar(
-                    dist_data,
-                    x=dist_column,
-                    y='value',
-                    text='label',
-                    title=f"Distribuição de {dist_column} {'(Percentual)' if show_percentage else '(Valores Absolutos)'}",
-                    color=dist_column,
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                
-                fig1.update_layout(
-                    template=theme if theme != "none" else None,
-                    xaxis_title=dist_column,
-                    yaxis_title="Percentual (%)" if show_percentage else "Contagem",
-                    showlegend=False,
-                    height=500
-                )
-                
-                fig1.update_traces(textposition='outside')
-                st.plotly_chart(fig1, use_container_width=True)
-            else:
-                st.warning(f"Não há dados suficientes para mostrar a distribuição de '{dist_column}'")
-        
-        elif dist_column in numerical_cols:
-            # Histograma para numéricas
-            try:
-                fig_hist = px.histogram(
-                    df_filtered,
-                    x=dist_column,
-                    nbins=30,
-                    title=f"Distribuição de {dist_column}",
-                    color_discrete_sequence=['#636EFA'],
-                    opacity=0.8
-                )
-                
-                # Adicionar linha de média
-                mean_val = df_filtered[dist_column].mean()
-                fig_hist.add_vline(x=mean_val, line_dash="dash", line_color="red", 
-                                 annotation_text=f"Média: {mean_val:.2f}")
-                
-                fig_hist.update_layout(
-                    template=theme if theme != "none" else None,
-                    height=500,
-                    xaxis_title=dist_column,
-                    yaxis_title="Frequência",
-                    bargap=0.1
-                )
-                
-                st.plotly_chart(fig_hist, use_container_width=True)
-            except Exception as e:
-                st.error(f"Erro ao criar histograma: {e}")
-
-with col2:
-    st.write("### 📊 Estatísticas")
-    
-    if 'dist_column' in locals() and dist_column in df_filtered.columns:
-        try:
-            col_data = df_filtered[dist_column].dropna()
-            
-            if len(col_data) > 0:
-                stats = {
-                    'Métrica': ['Total', 'Média', 'Mediana', 'Moda', 'Desvio Padrão', 
-                               'Mínimo', 'Máximo', 'Valores Únicos', 'Valores Nulos'],
-                    'Valor': [
-                        len(col_data),
-                        f"{col_data.mean():.2f}" if pd.api.types.is_numeric_dtype(col_data) else 'N/A',
-                        f"{col_data.median():.2f}" if pd.api.types.is_numeric_dtype(col_data) else 'N/A',
-                        str(col_data.mode().iloc[0]) if len(col_data.mode()) > 0 else 'N/A',
-                        f"{col_data.std():.2f}" if pd.api.types.is_numeric_dtype(col_data) else 'N/A',
-                        f"{col_data.min():.2f}" if pd.api.types.is_numeric_dtype(col_data) else str(col_data.min()),
-                        f"{col_data.max():.2f}" if pd.api.types.is_numeric_dtype(col_data) else str(col_data.max()),
-                        str(col_data.nunique()),
-                        str(df_filtered[dist_column].isnull().sum())
-                    ]
-                }
-                
-                stats_df = pd.DataFrame(stats)
-                st.dataframe(stats_df, use_container_width=True, hide_index=True, height=400)
-                
-                # Mostrar top valores para categóricas
-                if dist_column in categorical_cols:
-                    st.write("**Top 5 Valores:**")
-                    top_values = df_filtered[dist_column].value_counts().head(5)
-                    for val, count in top_values.items():
-                        st.write(f"- {val}: {count}")
-            else:
-                st.warning("Coluna sem dados válidos")
-        except Exception as e:
-            st.error(f"Erro ao calcular estatísticas: {e}")
-    
-    st.write("---")
-    st.write(f"**Configuração:**")
-    st.write(f"📈 Mostrando: **{'Percentuais' if show_percentage else 'Valores Absolutos'}**")
-    st.write(f"🎨 Tema: **{theme}**")
-    st.write(f"📊 Registros: **{len(df_filtered)}**")
-
-todo_list[5]["status"] = "completed"
-todo_list[6]["status"] = "in progress"
-
-# Task 7: Adicionar mais opções de visualização
-st.subheader("📊 2. Análise de Comparação")
-
-col1, col2 = st.columns(2)
-
-with col1:
-    # Seleção de eixo X
-    x_options = categorical_cols + numerical_cols
-    x_column = st.selectbox("Selecione a coluna para o Eixo X:", 
-                           x_options, 
-                           key="x_column")
-
-with col2:
-    # Seleção de eixo Y
-    y_options = [col for col in (categorical_cols + numerical_cols) if col != x_column]
-    y_column = st.selectbox("Selecione a coluna para o Eixo Y:", 
-                           y_options, 
-                           key="y_column")
-
-# Criar visualização de comparação
-if x_column and y_column and x_column in df_filtered.columns and y_column in df_filtered.columns:
-    try:
-        # Determinar tipo de gráfico baseado nos tipos de dados
-        x_is_categorical = x_column in categorical_cols
-        y_is_categorical = y_column in categorical_cols
-        
-        if x_is_categorical and not y_is_categorical:
-            # Gráfico de barras: categórico vs numérico
-            if show_percentage:
-                # Agrupa e calcula percentuais
-                grouped = df_filtered.groupby(x_column)[y_column].sum().reset_index()
-                total = grouped[y_column].sum()
-                if total > 0:
-                    grouped['percentage'] = (grouped[y_column] / total * 100).round(2)
-                    y_data = 'percentage'
-                    y_title = 'Percentual (%)'
-                else:
-                    y_data = y_column
-                    y_title = y_column
-            else:
-                grouped = df_filtered.groupby(x_column)[y_column].sum().reset_index()
-                y_data = y_column
-                y_title = y_column
-            
-            fig2 = px.bar(
-                grouped,
-                x=x_column,
-                y=y_data,
-                title=f"{y_column} por {x_column} {'(Percentual)' if show_percentage and y_data == 'percentage' else ''}",
-                color=x_column,
-                text=y_data
-            )
-            
-            if show_percentage and y_data == 'percentage':
-                fig2.update_traces(texttemplate='%{text:.1f}%')
-            
-        elif not x_is_categorical and not y_is_categorical:
-            # Gráfico de dispersão: numérico vs numérico
-            fig2 = px.scatter(
-                df_filtered,
-                x=x_column,
-                y=y_column,
-                title=f"Relação entre {x_column} e {y_column}",
-                trendline="ols" if len(df_filtered) > 2 else None,
-                color_discrete_sequence=['#EF553B']
-            )
-            y_title = y_column
-            
-        elif x_is_categorical and y_is_categorical:
-            # Gráfico de barras agrupadas: categórico vs categórico
-            cross_tab = pd.crosstab(df_filtered[x_column], df_filtered[y_column])
-            
-            if show_percentage:
-                # Calcula percentuais por linha
-                cross_tab_perc = (cross_tab.div(cross_tab.sum(axis=1), axis=0) * 100).round(2)
-                data_melted = cross_tab_perc.reset_index().melt(id_vars=x_column, var_name=y_column, value_name='percentage')
-                y_data = 'percentage'
-                y_title = 'Percentual (%)'
-                text_data = 'percentage'
-            else:
-                data_melted = cross_tab.reset_index().melt(id_vars=x_column, var_name=y_column, value_name='count')
-                y_data = 'count'
-                y_title = 'Contagem'
-                text_data = 'count'
-            
-            fig2 = px.bar(
-                data_melted,
-                x=x_column,
-                y=y_data,
-                color=y_column,
-                barmode='group',
-                title=f"{y_column} por {x_column} {'(Percentual)' if show_percentage else ''}",
-                text=text_data
-            )
-            
-            if show_percentage:
-                fig2.update_traces(texttemplate='%{text:.1f}%')
-            
-        else:
-            # Numérico vs Categórico (inverte os eixos)
-            if show_percentage:
-                grouped = df_filtered.groupby(y_column)[x_column].sum().reset_index()
-                total = grouped[x_column].sum()
-                if total > 0:
-                    grouped['percentage'] = (grouped[x_column] / total * 100).round(2)
-                    y_data = 'percentage'
-                    y_title = 'Percentual (%)'
-                else:
-                    y_data = x_column
-                    y_title = x_column
-            else:
-                grouped = df_filtered.groupby(y_column)[x_column].sum().reset_index()
-                y_data = x_column
-                y_title = x_column
-            
-            fig2 = px.bar(
-                grouped,
-                x=y_column,
-                y=y_data,
-                title=f"{x_column} por {y_column} {'(Percentual)' if show_percentage and y_data == 'percentage' else ''}",
-                color=y_column,
-                text=y_data
-            )
-            
-            if show_percentage and y_data == 'percentage':
-                fig2.update_traces(texttemplate='%{text:.1f}%')
-        
-        # Configurações comuns
-        fig2.update_layout(
-            template=theme if theme != "none" else None,
-            xaxis_title=x_column if x_is_categorical or not y_is_categorical else y_column,
-            yaxis_title=y_title,
-            height=500,
-            showlegend=True if (x_is_categorical and y_is_categorical) or (not x_is_categorical and y_is_categorical) else False
-        )
-        
-        if not (x_is_categorical and y_is_categorical):
-            fig2.update_traces(textposition='outside')
-        
-        st.plotly_chart(fig2, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"Erro ao criar gráfico de comparação: {e}")
-else:
-    st.warning("Selecione colunas válidas para a comparação.")
-
-# Visualização 3: Análise Temporal (se houver datas)
-st.subheader("📅 3. Análise Temporal")
-
-if datetime_cols:
-    time_column = st.selectbox("Selecione a coluna de data/hora:", 
-                              datetime_cols, 
-                              key="time_column")
-    
-    # Selecionar métrica para análise temporal
-    metric_options = numerical_cols if numerical_cols else categorical_cols
-    if metric_options:
-        metric_column = st.selectbox("Selecione a métrica para análise:", 
-                                    metric_options, 
-                                    key="metric_column")
-        
-        try:
-            # Converter para datetime
-            df_filtered[time_column] = pd.to_datetime(df_filtered[time_column], errors='coerce')
-            
-            # Remover valores nulos
-            temp_df = df_filtered.dropna(subset=[time_column, metric_column])
-            
-            if len(temp_df) > 0:
-                # Agrupar por período (mensal)
-                temp_df['periodo'] = temp_df[time_column].dt.to_period('M')
-                
-                if metric_column in numerical_cols:
-                    # Para métricas numéricas: soma
-                    time_series = temp_df.groupby('periodo')[metric_column].sum().reset_index()
-                    aggregation = "Soma"
-                else:
-                    # Para métricas categóricas: contagem
-                    time_series = temp_df.groupby('periodo').size().reset_index(name='count')
-                    metric_column = 'count'
-                    aggregation = "Contagem"
-                
-                time_series['periodo'] = time_series['periodo'].dt.to_timestamp()
-                
-                # Criar gráfico de linha
-                fig3 = px.line(
-                    time_series,
-                    x='periodo',
-                    y=metric_column,
-                    title=f"{aggregation} de {metric_column if metric_column != 'count' else 'registros'} ao longo do tempo",
-                    markers=True,
-                    line_shape='spline'
-                )
-                
-                # Adicionar área sombreada
-                fig3.add_trace(
-                    go.Scatter(
-                        x=time_series['periodo'],
-                        y=time_series[metric_column],
-                        fill='tozeroy',
-                        fillcolor='rgba(100, 150, 250, 0.2)',
-                        line=dict(color='rgba(255,255,255,0)'),
-                        showlegend=False
-                    )
-                )
-                
-                fig3.update_layout(
-                    template=theme if theme != "none" else None,
-                    xaxis_title="Período",
-                    yaxis_title=f"{aggregation} de {metric_column if metric_column != 'count' else 'registros'}",
-                    height=500,
-                    hovermode='x unified'
-                )
-                
-                st.plotly_chart(fig3, use_container_width=True)
-                
-                # Estatísticas temporais
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Período Inicial", time_series['periodo'].min().strftime('%Y-%m'))
-                with col2:
-                    st.metric("Período Final", time_series['periodo'].max().strftime('%Y-%m'))
-                with col3:
-                    growth = ((time_series[metric_column].iloc[-1] - time_series[metric_column].iloc[0]) / 
-                             time_series[metric_column].iloc[0] * 100) if time_series[metric_column].iloc[0] != 0 else 0
-                    st.metric("Crescimento Total", f"{growth:.1f}%")
-            else:
-                st.warning("Não há dados suficientes para análise temporal.")
-                
-        except Exception as e:
-            st.error(f"Erro na análise temporal: {e}")
-else:
-    st.info("ℹ️ Não foram detectadas colunas de data/hora para análise temporal.")
-
-# Visualização 4: Heatmap de Correlação (se houver dados numéricos)
-st.subheader("🔥 4. Análise de Correlação")
-
-if len(numerical_cols) >= 2:
-    # Selecionar colunas numéricas para correlação
-    selected_numerical = st.multiselect(
-        "Selecione as colunas numéricas para análise de correlação:",
-        numerical_cols,
-        default=numerical_cols[:min(5, len(numerical_cols))]
-    )
-    
-    if len(selected_numerical) >= 2:
-        try:
-            # Calcular matriz de correlação
-            corr_matrix = df_filtered[selected_numerical].corr().round(2)
-            
-            # Criar heatmap
-            fig4 = px.imshow(
-                corr_matrix,
-                text_auto=True,
-                aspect="auto",
-                color_continuous_scale='RdBu',
-                title="Matriz de Correlação",
-                labels=dict(color="Correlação")
-            )
-            
-            fig4.update_layout(
-                template=theme if theme != "none" else None,
-                height=500,
-                xaxis_title="Variáveis",
-                yaxis_title="Variáveis"
-            )
-            
-            st.plotly_chart(fig4, use_container_width=True)
-            
-            # Análise de correlações fortes
-            st.write("**Correlações Fortes (|r| > 0.7):**")
-            strong_correlations = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    corr_value = corr_matrix.iloc[i, j]
-                    if abs(corr_value) > 0.7:
-                        strong_correlations.append({
-                            'Variável 1': corr_matrix.columns[i],
-                            'Variável 2': corr_matrix.columns[j],
-                            'Correlação': corr_value
-                        })
-            
-            if strong_correlations:
-                strong_df = pd.DataFrame(strong_correlations)
-                st.dataframe(strong_df, use_container_width=True)
-            else:
-                st.info("Não foram encontradas correlações fortes (|r| > 0.7).")
-                
-        except Exception as e:
-            st.error(f"Erro na análise de correlação: {e}")
-    else:
-        st.warning("Selecione pelo menos 2 colunas numéricas para análise de correlação.")
-else:
-    st.info("ℹ️ É necessário ter pelo menos 2 colunas numéricas para análise de correlação.")
-
-todo_list[6]["status"] = "completed"
-todo_list[7]["status"] = "in progress"
-
-# Task 8: Testar funcionalidade completa
-st.subheader("✅ 8. Teste de Funcionalidade Completa")
-
-# Testar todas as funcionalidades
-test_results = []
-
-# Teste 1: Carregamento de dados
-test_results.append({
-    "Teste": "Carregamento de Dados",
-    "Status": "✅ Passou" if df is not None else "❌ Falhou",
-    "Detalhes": f"Dados carregados: {len(df)} registros, {len(df.columns)} colunas" if df is not None else "Falha no carregamento"
-})
-
-# Teste 2: Detecção de tipos de colunas
-test_results.append({
-    "Teste": "Detecção de Tipos de Colunas",
-    "Status": "✅ Passou" if categorical_cols or numerical_cols or datetime_cols else "❌ Falhou",
-    "Detalhes": f"Categóricas: {len(categorical_cols)}, Numéricas: {len(numerical_cols)}, Datas: {len(datetime_cols)}"
-})
-
-# Teste 3: Funções de preparação
-test_prep = False
-if categorical_cols:
-    test_data = prepare_categorical_data(df_filtered, categorical_cols[0], False)
-    test_prep = test_data is not None and len(test_data) > 0
-
-test_results.append({
-    "Teste": "Funções de Preparação",
-    "Status": "✅ Passou" if test_prep else "❌ Falhou",
-    "Detalhes": "Funções de preparação funcionando corretamente" if test_prep else "Falha nas funções de preparação"
-})
-
-# Teste 4: Filtros
-test_results.append({
-    "Teste": "Sistema de Filtros",
-    "Status": "✅ Passou",
-    "Detalhes": f"Filtros aplicados: {len(df_filtered)} registros (original: {len(df)})"
-})
-
-# Teste 5: Toggle Percentual/Valores
-test_results.append({
-    "Teste": "Toggle Percentual/Valores",
-    "Status": "✅ Passou",
-    "Detalhes": f"Modo atual: {'Percentuais' if show_percentage else 'Valores Absolutos'}"
-})
-
-# Teste 6: Visualizações
-test_viz = len(categorical_cols) > 0 or len(numerical_cols) > 0
-test_results.append({
-    "Teste": "Visualizações Gráficas",
-    "Status": "✅ Passou" if test_viz else "⚠️ Parcial",
-    "Detalhes": "Gráficos disponíveis para os tipos de dados detectados" if test_viz else "Dados insuficientes para visualizações"
-})
-
-# Exibir resultados dos testes
-test_df = pd.DataFrame(test_results)
-st.dataframe(test_df, use_container_width=True, hide_index=True)
-
-# Resumo final
-st.success("""
-🎉 **Dashboard PPCAAM - Funcionalidade Completa Verificada!**
-
-O dashboard inclui as seguintes funcionalidades:
-
-1. **📊 Carregamento de Dados**: Suporte a múltiplos encodings e upload de arquivos
-2. **🔍 Análise Exploratória**: Visualização detalhada do dataset
-3. **⚙️ Controles Interativos**: 
-   - Toggle entre percentuais e valores absolutos
-   - Filtros dinâmicos por categoria e valor numérico
-   - Seleção de temas visuais
-4. **📈 Visualizações**:
-   - Análise de distribuição (barras/histograma)
-   - Comparação entre variáveis
-   - Análise temporal (se houver datas)
-   - Análise de correlação (se houver dados numéricos)
-5. **✅ Sistema de Testes**: Verificação automática de funcionalidades
-
-**Próximos passos sugeridos:**
-- Adicionar exportação de gráficos
-- Implementar análise de outliers
-- Criar relatórios automáticos
-- Adicionar mais tipos de gráficos
-""")
-
-# Atualizar todo_list
-todo_list[7]["status"] = "completed"
-
-# Exibir resumo final do projeto
-st.sidebar.header("📋 Resumo do Projeto")
-for task in todo_list:
-    status_icon = "✅" if task["status"] == "completed" else "🔄" if task["status"] == "in progress" else "⏳"
-    st.sidebar.write(f"{status_icon} {task['task']}")
-
-st.sidebar.success(f"🎯 **Projeto Concluído: {len([t for t in todo_list if t['status'] == 'completed'])}/{len(todo_list)} tarefas**")
-
-# Task 8: Refazer a seção de informações finais da Task 8
-
-# Informações finais aprimoradas
-st.info("""
-💡 **Dicas de Uso Avançadas:**
-
-## 📊 **Como usar o toggle Percentual/Valores:**
-1. **Percentuais (%)**: Ideal para comparar proporções entre categorias
-2. **Valores Absolutos**: Melhor para analisar volumes e quantidades reais
-3. **Dica**: Use percentuais para identificar padrões de distribuição
-
-## 🔍 **Estratégias de Análise:**
-1. **Comece pela distribuição**: Use a primeira visualização para entender a estrutura dos dados
-2. **Explore relações**: Use a análise de comparação para identificar correlações
-3. **Verifique tendências**: Se houver datas, analise padrões temporais
-4. **Valide com correlação**: Use a matriz de correlação para confirmar relações fortes
-
-## ⚙️ **Otimização de Filtros:**
-1. **Filtre por categoria primeiro**: Reduza o dataset antes de aplicar filtros numéricos
-2. **Use múltiplos filtros**: Combine filtros categóricos e numéricos para análises específicas
-3. **Monitore a redução**: Acompanhe o percentual de redução na barra lateral
-
-## 🎨 **Personalização Visual:**
-1. **Experimente temas**: Diferentes temas podem destacar diferentes aspectos dos dados
-2. **Ajuste cores**: Os gráficos usam paletas otimizadas para cada tipo de visualização
-3. **Use tooltips**: Passe o mouse sobre os gráficos para ver detalhes específicos
-
-## 📈 **Interpretação de Resultados:**
-1. **Distribuição**: Identifique categorias dominantes ou outliers
-2. **Comparação**: Busque relações positivas/negativas entre variáveis
-3. **Temporal**: Identifique tendências de crescimento/declínio
-4. **Correlação**: Valide relações estatisticamente significativas
+pagina = st.sidebar.radio("Página:", list(PAGINAS), key="page")
+sidebar_controls(ctx)
+upload.render_sidebar()
 
-## 🔧 **Solução de Problemas:**
-1. **Arquivo não encontrado**: Use a opção de upload ou verifique o diretório
-2. **Coluna não disponível**: Verifique se a coluna existe no dataset
-3. **Gráfico vazio**: Ajuste os filtros ou selecione outras colunas
-4. **Erro de encoding**: O sistema tenta automaticamente UTF-8 e Latin-1
-
-## 🚀 **Próximos Passos Sugeridos:**
-1. **Exportação**: Adicione botões para exportar gráficos como PNG/PDF
-2. **Análise de Outliers**: Implemente detecção automática de valores atípicos
-3. **Relatórios**: Crie relatórios automáticos em PDF
-4. **Mais gráficos**: Adicione gráficos de pizza, treemap e boxplot
-5. **Análise por grupo**: Permita comparações entre múltiplos grupos simultaneamente
-6. **Previsões**: Adicione modelos simples de previsão para séries temporais
-7. **Dashboard móvel**: Otimize a interface para dispositivos móveis
-8. **Compartilhamento**: Adicione funcionalidade para compartilhar análises
-
-## 📚 **Recursos Adicionais:**
-- **Documentação Plotly**: Para personalizações avançadas de gráficos
-- **Streamlit Docs**: Para expandir funcionalidades do dashboard
-- **Pandas Docs**: Para manipulação avançada de dados
-- **Estatística Básica**: Para interpretação adequada dos resultados
-
-## 🎯 **Casos de Uso Comuns:**
-1. **Análise de desempenho**: Compare métricas ao longo do tempo
-2. **Segmentação**: Analise dados por diferentes categorias
-3. **Identificação de padrões**: Encontre correlações inesperadas
-4. **Monitoramento**: Acompanhe indicadores-chave regularmente
-5. **Tomada de decisão**: Baseie decisões em dados visualizados claramente
-
-**Lembre-se**: Este dashboard é uma ferramenta exploratória. Use-o para identificar insights e depois valide com análises estatísticas mais profundas quando necessário.
-""")
-
-# Adicionar seção de contato/suporte
-st.markdown("---")
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.markdown("**📊 Status do Sistema**")
-    st.success("✅ Todas as funcionalidades operacionais")
-    
-with col2:
-    st.markdown("**🔄 Atualizações**")
-    st.info("Versão 1.0 - Dashboard PPCAAM")
-    
-with col3:
-    st.markdown("**📞 Suporte**")
-    st.warning("Relate problemas no repositório do projeto")
-
-# Adicionar informações técnicas
-with st.expander("🔧 Informações Técnicas"):
-    st.write("**Versões das bibliotecas:**")
-    tech_info = {
-        "Streamlit": "1.28.0+",
-        "Pandas": "2.0.0+",
-        "Plotly": "5.17.0+",
-        "Python": "3.8+"
-    }
-    
-    for lib, version in tech_info.items():
-        st.write(f"- {lib}: {version}")
-    
-    st.write("**Recursos do sistema:**")
-    st.write(f"- Memória RAM recomendada: 4GB+")
-    st.write(f"- Processamento: Otimizado com cache")
-    st.write(f"- Compatibilidade: Navegadores modernos")
-    
-    st.write("**Limitações conhecidas:**")
-    st.write("- Arquivos muito grandes (>100MB) podem ter performance reduzida")
-    st.write("- Alguns caracteres especiais podem requerer encoding manual")
-    st.write("- Visualizações complexas com muitos dados podem carregar mais lentamente")
-
-# Finalizar com mensagem de conclusão
-st.success("""
-🎉 **Dashboard PPCAAM - Implementação Concluída com Sucesso!**
-
-O sistema está pronto para uso com todas as funcionalidades implementadas e testadas. 
-O toggle de percentuais/valores está totalmente funcional em todas as visualizações.
-
-**Para começar a usar:**
-1. Explore os dados na seção de informações do dataset
-2. Configure os filtros na barra lateral conforme necessário
-3. Use o toggle para alternar entre percentuais e valores absolutos
-4. Experimente diferentes combinações de visualizações
-
-**Lembre-se de salvar suas análises favoritas!** 
-O sistema mantém o cache para performance otimizada em sessões futuras.
-""")
-
-todo_list[7]["status"] = "completed"
-
-# Resumo final do projeto
-st.sidebar.header("📋 Resumo Final do Projeto")
-st.sidebar.markdown("### ✅ Todas as tarefas concluídas:")
-
-for task in todo_list:
-    status_icon = "✅" if task["status"] == "completed" else "🔄" if task["status"] == "in progress" else "⏳"
-    st.sidebar.markdown(f"{status_icon} **{task['task']}**")
-
-st.sidebar.success(f"""
-🎯 **Projeto 100% Concluído!**
-
-**Estatísticas finais:**
-- Tarefas completadas: {len([t for t in todo_list if t['status'] == 'completed'])}/{len(todo_list)}
-- Visualizações implementadas: 4 principais
-- Funcionalidades: Toggle percentual/valores em todos os gráficos
-- Tratamento de erros: Implementado em todas as etapas
-- Performance: Otimizada com cache
-
-**Pronto para uso em produção!**
-""")
+for secao in PAGINAS[pagina]:
+    with diagnostics.section(secao):
+        importlib.import_module(f"sections.{secao}").render(ctx)
+diagnostics.finish_run()
 
 # Adicionar botão para reiniciar/recarregar
 if st.sidebar.button("🔄 Recarregar Dashboard"):
@@ -954,3 +47,5 @@ st.sidebar.info("""
 - Cache otimiza carregamentos subsequentes
 - Uploads de arquivos são temporários
 """)
+
+diagnostics.render_panel(ctx)
@@ -0,0 +1,188 @@
+import argparse
+import hashlib
+import html
+import inspect
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import analytics
+import charts
+from analytics import comparison_data, correlation_data, prepare_categorical_data
+from charts import build_distribution_figure, build_comparison_figure, build_correlation_figure
+from schema import MESES, TRANSFORMADO, read_csv
+
+
+MANIFESTO = "manifest.json"
+# Versão do layout dos relatórios: incrementar ao mudar o HTML ou a configuração dos
+# gráficos de um jeito que o código-fonte abaixo não capture (ex.: versão do plotly)
+VERSAO_RELATORIO = "2"
+
+
+def rendering_version():
+    '''
+    Hash de VERSAO_RELATORIO e do código que desenha os relatórios (este módulo, charts e
+    analytics): entra na impressão de cada grupo, então mudar um gráfico regenera todos.
+    '''
+    codigo = hashlib.sha1(VERSAO_RELATORIO.encode('utf-8'))
+    for modulo in (analytics, charts, sys.modules[__name__]):
+        codigo.update(inspect.getsource(modulo).encode('utf-8'))
+    return codigo.hexdigest()
+
+def fingerprint_groups(df, keys, versao=""):
+    '''
+    Calcula uma impressão digital (hash) do conteúdo de cada grupo do dataframe.
+    Retorna um dicionário {chave do grupo: hash hexadecimal}; grupos com o mesmo
+    conteúdo (e a mesma "versao" de quem os usa) produzem sempre o mesmo hash,
+    independente da posição das linhas no arquivo.
+    '''
+    impressoes = {}
+    for chave, grupo in df.groupby(keys, sort=True, observed=True):
+        valores = pd.util.hash_pandas_object(grupo.reset_index(drop=True), index=False).values
+        impressoes[chave] = hashlib.sha1(versao.encode('utf-8') + valores.tobytes()).hexdigest()
+    return impressoes
+
+def report_filename(unidade, ano_referencia):
+    '''Nome do arquivo HTML do relatório de uma unidade/ano'''
+    unidade_segura = re.sub(r'[^0-9A-Za-z_-]+', '_', str(unidade))
+    return f"relatorio_{unidade_segura}_{ano_referencia}.html"
+
+def render_report(unidade, ano_referencia, grupo, theme="plotly_white"):
+    '''
+    Gera o HTML autocontido (plotly.js embutido) do relatório de uma unidade/ano,
+    reutilizando os mesmos gráficos do dashboard:
+    1. Distribuição das métricas por seção.
+    2. Total por seção (comparação categórico vs numérico).
+    3. Correlação entre os meses.
+    '''
+    partes = []
+
+    dist_data = prepare_categorical_data(grupo, 'secao').table
+    if dist_data is not None and len(dist_data) > 0:
+        partes.append(build_distribution_figure(dist_data, 'secao', theme=theme))
+
+    if 'total' in grupo.columns and grupo['total'].notna().any():
+        partes.append(build_comparison_figure(comparison_data(grupo, 'secao', 'total', ['secao']), theme=theme))
+
+    meses_validos = [mes for mes in MESES if mes in grupo.columns and grupo[mes].notna().any()]
+    fortes = []
+    if len(meses_validos) >= 2:
+        corr_matrix, fortes = correlation_data(grupo, meses_validos)
+        partes.append(build_correlation_figure(corr_matrix, theme=theme))
+
+    # Só o primeiro gráfico embute o plotly.js; os demais reutilizam a mesma cópia
+    graficos = [
+        fig.to_html(full_html=False, include_plotlyjs=(i == 0))
+        for i, fig in enumerate(partes)
+    ]
+
+    titulo = html.escape(f"Relatório PPCAAM - {unidade} - {ano_referencia}")
+    tabela_fortes = pd.DataFrame(fortes).to_html(index=False) if fortes else "<p>Não foram encontradas correlações fortes (|r| &gt; 0.7).</p>"
+    return f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head><meta charset="utf-8"><title>{titulo}</title></head>
+<body>
+<h1>{titulo}</h1>
+<p>Total de registros: {len(grupo)}</p>
+{''.join(graficos)}
+<h2>Correlações Fortes</h2>
+{tabela_fortes}
+</body>
+</html>
+"""
+
+def _write_report(caminho, unidade, ano_referencia, grupo):
+    '''Executado no pool de processos: renderiza e grava o relatório de forma atômica'''
+    conteudo = render_report(unidade, ano_referencia, grupo)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+    return caminho
+
+def _load_manifest(pasta):
+    caminho = os.path.join(pasta, MANIFESTO)
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _save_manifest(pasta, manifesto):
+    caminho = os.path.join(pasta, MANIFESTO)
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(temporario, caminho)
+
+def generate_reports(csv_path="dados_transformados_PPCAAM.csv", output_dir="relatorios",
+                     max_workers=None, force=False):
+    '''
+    Gera um relatório HTML por unidade e ano_referencia em um pool de processos.
+    1. Lê o arquivo transformado.
+    2. Calcula o hash do conteúdo de cada par (unidade, ano_referencia), junto com a
+       versão do código dos relatórios (rendering_version).
+    3. Compara com o manifesto da pasta de saída e regenera apenas os grupos alterados;
+       os grupos que deixaram de existir saem do manifesto e têm o HTML apagado.
+    4. Atualiza o manifesto a cada relatório concluído, de modo que uma execução
+       interrompida não perde o que já foi gravado.
+    Retorna a lista de arquivos regenerados.
+    '''
+    dados = read_csv(csv_path, TRANSFORMADO)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifesto = _load_manifest(output_dir)
+    impressoes = fingerprint_groups(dados, ['unidade', 'ano_referencia'], rendering_version())
+
+    # Remove do manifesto (e da pasta) os grupos que deixaram de existir
+    atuais = {f"{unidade}|{ano}" for unidade, ano in impressoes}
+    for chave in list(manifesto):
+        if chave not in atuais:
+            orfao = os.path.join(output_dir, manifesto.pop(chave).get('arquivo', ''))
+            if os.path.isfile(orfao):
+                os.remove(orfao)
+
+    pendentes = {
+        (unidade, ano): impressao
+        for (unidade, ano), impressao in impressoes.items()
+        if force or manifesto.get(f"{unidade}|{ano}", {}).get('hash') != impressao
+    }
+    print(f"Relatórios a gerar: {len(pendentes)} de {len(impressoes)}")
+
+    gerados = []
+    if pendentes:
+        grupos = dados.groupby(['unidade', 'ano_referencia'], sort=False, observed=True)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futuros = {}
+            for (unidade, ano), impressao in pendentes.items():
+                caminho = os.path.join(output_dir, report_filename(unidade, ano))
+                futuro = executor.submit(_write_report, caminho, unidade, ano, grupos.get_group((unidade, ano)))
+                futuros[futuro] = (unidade, ano, impressao, caminho)
+
+            for futuro in as_completed(futuros):
+                unidade, ano, impressao, caminho = futuros[futuro]
+                try:
+                    futuro.result()
+                except Exception as e:
+                    print(f"Erro ao gerar relatório de {unidade}/{ano}: {e}")
+                    continue
+                manifesto[f"{unidade}|{ano}"] = {'hash': impressao, 'arquivo': os.path.basename(caminho)}
+                _save_manifest(output_dir, manifesto)
+                gerados.append(caminho)
+
+    _save_manifest(output_dir, manifesto)
+    print(f"Relatórios gerados com sucesso em '{output_dir}': {len(gerados)}")
+    return gerados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera relatórios HTML por unidade e ano de referência.")
+    parser.add_argument("--entrada", default="dados_transformados_PPCAAM.csv")
+    parser.add_argument("--saida", default="relatorios")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--forcar", action="store_true", help="Regenera todos os relatórios")
+    args = parser.parse_args()
+    generate_reports(args.entrada, args.saida, args.processos, args.forcar)
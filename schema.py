@@ -0,0 +1,165 @@
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import pandas as pd
+
+
+# Colunas mensais do arquivo transformado, na ordem do calendário
+MESES = ['janeiro', 'fevereiro', 'marco', 'abril', 'maio', 'junho',
+         'julho', 'agosto', 'setembro', 'outubro', 'novembro', 'dezembro']
+
+# Nomes que o pandas atribui às colunas da planilha original (a linha 1 só tem o título do ministério)
+COLUNA_ROTULO = 'Unnamed: 0'
+COLUNA_ANO_ANTERIOR = 'Ministério dos Direitos Humanos e da Cidadania'
+COLUNAS_VALORES = [f'Unnamed: {i}' for i in range(2, 15)]  # janeiro…dezembro + total
+
+# Dicionário de nomes canônicos (e IDs estáveis) de seções e métricas
+ARQUIVO_DICIONARIO = "dicionario.json"
+
+
+@dataclass(frozen=True)
+class Coluna:
+    '''Definição de uma coluna: nome, papel no pipeline e dtype compacto'''
+    nome: str
+    papel: str  # 'rotulo', 'chave', 'valor' ou 'texto'
+    dtype: str
+    canonica: bool = False  # categorias fixas na ordem dos IDs do dicionário
+
+
+# Planilhas consolidadas (step_1): só o bloco de dados da ficha, mas as colunas de valores
+# ainda podem conter textos (cabeçalhos CONTROLE, observações), por isso permanecem como texto.
+CONSOLIDADO = [
+    Coluna(COLUNA_ROTULO, 'rotulo', 'object'),
+    Coluna(COLUNA_ANO_ANTERIOR, 'texto', 'object'),
+    *[Coluna(nome, 'texto', 'object') for nome in COLUNAS_VALORES],
+    Coluna('estado', 'chave', 'category'),
+    Coluna('ano_referencia', 'chave', 'Int16'),
+    Coluna('planilha', 'chave', 'category'),
+]
+
+# Dados limpos (step_2 / step_2_5): só restam seções e métricas, os valores são inteiros.
+LIMPO = [
+    Coluna(COLUNA_ROTULO, 'rotulo', 'object'),
+    Coluna(COLUNA_ANO_ANTERIOR, 'valor', 'Int32'),
+    *[Coluna(nome, 'valor', 'Int32') for nome in COLUNAS_VALORES],
+    Coluna('estado', 'chave', 'category'),
+    Coluna('ano_referencia', 'chave', 'Int16'),
+    Coluna('planilha', 'chave', 'category'),
+]
+
+# Arquivo transformado (step_3), lido também pelo dashboard
+TRANSFORMADO = [
+    Coluna('ano_referencia', 'chave', 'Int16'),
+    Coluna('unidade', 'chave', 'category'),
+    Coluna('secao', 'chave', 'category', canonica=True),
+    Coluna('metrica', 'chave', 'category', canonica=True),
+    Coluna('ano_anterior', 'valor', 'Int32'),
+    *[Coluna(mes, 'valor', 'Int32') for mes in MESES],
+    Coluna('total', 'valor', 'Int32'),
+    Coluna('planilha', 'chave', 'category'),
+]
+
+# Tabela de variações (deltas.py): uma linha por série e período (12 meses + 'ano')
+VARIACOES = [
+    Coluna('ano_referencia', 'chave', 'Int16'),
+    Coluna('unidade', 'chave', 'category'),
+    Coluna('secao', 'chave', 'category', canonica=True),
+    Coluna('metrica', 'chave', 'category', canonica=True),
+    Coluna('periodo', 'chave', 'category'),
+    Coluna('valor', 'valor', 'Int32'),
+    Coluna('variacao_mensal', 'valor', 'Int32'),
+    Coluna('variacao_anual', 'valor', 'Int32'),
+    Coluna('acumulado', 'valor', 'Int32'),
+    Coluna('variacao_acumulada', 'valor', 'Int32'),
+    Coluna('variacao_mensal_pct', 'valor', 'float64'),
+    Coluna('variacao_anual_pct', 'valor', 'float64'),
+    Coluna('variacao_acumulada_pct', 'valor', 'float64'),
+]
+
+
+def _to_integer(serie, dtype):
+    '''Converte para inteiro anulável; retorna a série e o número de valores descartados'''
+    numeros = pd.to_numeric(serie, errors='coerce')
+    # Valores não numéricos ou com parte decimal não cabem no dtype inteiro
+    invalidos = numeros.notna() & (numeros % 1 != 0)
+    numeros = numeros.mask(invalidos)
+    falhas = int((serie.notna() & numeros.isna()).sum())
+    return numeros.astype(dtype), falhas
+
+@lru_cache(maxsize=4)
+def _dictionary_names(caminho, versao):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        entradas = json.load(f)
+    return {campo: tuple(e['nome'] for e in sorted(lista, key=lambda e: e['id']))
+            for campo, lista in entradas.items()}
+
+def dictionary_names(caminho=ARQUIVO_DICIONARIO):
+    '''
+    Nomes canônicos por campo, na ordem dos IDs do dicionário (vazio se o arquivo não existir).
+    Memorizado pela versão (mtime/tamanho) do arquivo.
+    '''
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return {}
+    return _dictionary_names(caminho, (info.st_mtime_ns, info.st_size))
+
+def canonical_categorical(serie, nomes):
+    '''
+    Categórica com os nomes do dicionário primeiro, na ordem dos IDs, seguidos dos demais
+    valores em ordem alfabética: o código de cada nome canônico não depende dos dados, então
+    sobrevive a concatenações e à ida e volta pelo CSV.
+    '''
+    presentes = serie.astype('category').cat.categories.astype(str)
+    categorias = pd.Index(nomes, dtype=object).append(pd.Index(sorted(set(presentes) - set(nomes)), dtype=object))
+    if isinstance(serie.dtype, pd.CategoricalDtype) and serie.cat.categories.equals(categorias):
+        return serie
+    return pd.Series(pd.Categorical(serie, categories=categorias), index=serie.index, name=serie.name)
+
+def apply_schema(df, schema, contexto=None):
+    '''
+    Aplica os dtypes do esquema às colunas presentes no dataframe.
+    Colunas canônicas (secao, metrica) recebem as categorias fixas do dicionario.json.
+    Valores que não podem ser convertidos viram nulos e são contados por coluna em
+    df.attrs['falhas_coercao']; com "contexto", o total é impresso.
+    '''
+    df = df.copy()
+    falhas = {}
+    dicionario = dictionary_names() if any(c.canonica for c in schema) else {}
+    for coluna in schema:
+        if coluna.nome not in df.columns:
+            continue
+        serie = df[coluna.nome]
+        if coluna.canonica:
+            df[coluna.nome] = canonical_categorical(serie, dicionario.get(coluna.nome, ()))
+            continue
+        if str(serie.dtype) == coluna.dtype:
+            continue
+        if coluna.dtype.startswith(('Int', 'UInt')):
+            df[coluna.nome], n = _to_integer(serie, coluna.dtype)
+            if n:
+                falhas[coluna.nome] = n
+        elif coluna.dtype == 'category':
+            df[coluna.nome] = serie.astype('category')
+        else:
+            df[coluna.nome] = serie.astype(coluna.dtype)
+
+    df.attrs['falhas_coercao'] = falhas
+    if contexto and falhas:
+        print(f"Aviso ({contexto}): {sum(falhas.values())} valores não numéricos descartados: {falhas}")
+    return df
+
+def read_dtypes(schema):
+    '''
+    dtypes para o pd.read_csv: texto e categorias são lidos diretamente no tipo final;
+    valores numéricos são lidos como texto e convertidos depois por apply_schema,
+    para que valores inválidos sejam contados em vez de estragarem a coluna inteira.
+    '''
+    return {coluna.nome: ('category' if coluna.dtype == 'category' else str) for coluna in schema}
+
+def read_csv(caminho, schema, encoding='utf-8-sig'):
+    '''Lê um CSV do pipeline aplicando o esquema'''
+    dados = pd.read_csv(caminho, encoding=encoding, dtype=read_dtypes(schema))
+    return apply_schema(dados, schema, contexto=str(caminho))
@@ -0,0 +1,2 @@
+# Seções da página principal do dashboard, na ordem de exibição (módulos deste pacote)
+SECOES = ["overview", "distribution", "comparison", "time_series", "correlation", "data_explorer", "movers"]
@@ -0,0 +1,50 @@
+import streamlit as st
+
+from aggregates import group_sums
+from analytics import cached, comparison_data
+from charts import build_comparison_figure
+from sections.data import unfiltered_aggregates
+from sections import diagnostics
+
+
+def render(ctx):
+    """Visualização 2: Comparação entre duas colunas"""
+    df_filtered = ctx.df_filtered
+    categorical_cols, numerical_cols = ctx.categorical_cols, ctx.numerical_cols
+
+    st.subheader("📊 2. Análise de Comparação")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Seleção de eixo X
+        x_options = categorical_cols + numerical_cols
+        x_column = st.selectbox("Selecione a coluna para o Eixo X:",
+                               x_options,
+                               key="x_column")
+
+    with col2:
+        # Seleção de eixo Y
+        y_options = [col for col in (categorical_cols + numerical_cols) if col != x_column]
+        y_column = st.selectbox("Selecione a coluna para o Eixo Y:",
+                               y_options,
+                               key="y_column")
+
+    # Criar visualização de comparação
+    if x_column and y_column and x_column in df_filtered.columns and y_column in df_filtered.columns:
+        try:
+            # Categórico × numérico sem filtros: as somas vêm das tabelas agregadas
+            sums = None
+            if (x_column in categorical_cols) != (y_column in categorical_cols):
+                tables = unfiltered_aggregates(ctx)
+                by, column = (x_column, y_column) if x_column in categorical_cols else (y_column, x_column)
+                sums = group_sums(tables, by, column) if tables else None
+            data = cached(ctx.cache_version, comparison_data, df_filtered, x_column, y_column,
+                          categorical_cols, ctx.show_percentage, sums)
+            fig2 = build_comparison_figure(data, ctx.theme)
+            diagnostics.plotly_chart(fig2, use_container_width=True)
+
+        except Exception as e:
+            st.error(f"Erro ao criar gráfico de comparação: {e}")
+    else:
+        st.warning("Selecione colunas válidas para a comparação.")
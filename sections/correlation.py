@@ -0,0 +1,44 @@
+import pandas as pd
+import streamlit as st
+
+from analytics import cached, correlation_data
+from charts import build_correlation_figure
+from sections import diagnostics
+
+
+def render(ctx):
+    """Visualização 4: Heatmap de Correlação (se houver dados numéricos)"""
+    numerical_cols = ctx.numerical_cols
+
+    st.subheader("🔥 4. Análise de Correlação")
+
+    if len(numerical_cols) >= 2:
+        # Selecionar colunas numéricas para correlação
+        selected_numerical = st.multiselect(
+            "Selecione as colunas numéricas para análise de correlação:",
+            numerical_cols,
+            default=numerical_cols[:min(5, len(numerical_cols))]
+        )
+
+        if len(selected_numerical) >= 2:
+            try:
+                corr_matrix, strong = cached(ctx.cache_version, correlation_data, ctx.df_filtered, selected_numerical)
+                fig4 = build_correlation_figure(corr_matrix, ctx.theme)
+
+                diagnostics.plotly_chart(fig4, use_container_width=True)
+
+                # Análise de correlações fortes
+                st.write("**Correlações Fortes (|r| > 0.7):**")
+
+                if strong:
+                    strong_df = pd.DataFrame(strong)
+                    st.dataframe(strong_df, use_container_width=True)
+                else:
+                    st.info("Não foram encontradas correlações fortes (|r| > 0.7).")
+
+            except Exception as e:
+                st.error(f"Erro na análise de correlação: {e}")
+        else:
+            st.warning("Selecione pelo menos 2 colunas numéricas para análise de correlação.")
+    else:
+        st.info("ℹ️ É necessário ter pelo menos 2 colunas numéricas para análise de correlação.")
@@ -0,0 +1,223 @@
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+import streamlit as st
+
+from aggregates import aggregate, load_aggregates
+from analytics import cached, detect_column_types
+from schema import TRANSFORMADO, apply_schema, read_dtypes
+from sections import diagnostics, upload
+
+
+@dataclass
+class DashboardContext:
+    '''Estado de uma execução do dashboard, compartilhado pelas seções'''
+    csv_file: object
+    version: object
+    df: pd.DataFrame
+    df_filtered: pd.DataFrame
+    categorical_cols: list
+    numerical_cols: list
+    datetime_cols: list
+    show_percentage: bool = False
+    theme: str = "plotly"
+    filter_key: tuple = ()
+
+    @property
+    def cache_version(self):
+        '''Versão de df_filtered para o cache do analytics: arquivo + filtros aplicados'''
+        return (self.version, self.filter_key)
+
+
+def data_version(file_path):
+    """Versão dos dados: muda quando o arquivo é trocado (ex.: pelo watch.py)"""
+    if hasattr(file_path, 'read'):
+        return getattr(file_path, 'file_id', None) or getattr(file_path, 'name', None)
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+@diagnostics.tracked_cache(max_entries=4)
+def load_data(file_path, version=None):
+    """Carrega dados do CSV com múltiplas tentativas de encoding.
+    O parâmetro version só participa da chave do cache: uma nova versão do arquivo
+    invalida a entrada antiga sem precisar limpar o cache inteiro.
+    Os dtypes compactos do esquema (schema.TRANSFORMADO) são aplicados na leitura."""
+    try:
+        if hasattr(file_path, 'read'):  # Se for um arquivo carregado
+            df = pd.read_csv(file_path, encoding='utf-8', dtype=read_dtypes(TRANSFORMADO))
+        else:
+            df = pd.read_csv(file_path, encoding='utf-8', dtype=read_dtypes(TRANSFORMADO))
+        return apply_schema(df, TRANSFORMADO)
+    except UnicodeDecodeError:
+        try:
+            if hasattr(file_path, 'read'):
+                file_path.seek(0)  # Reset file pointer
+                df = pd.read_csv(file_path, encoding='latin-1', dtype=read_dtypes(TRANSFORMADO))
+            else:
+                df = pd.read_csv(file_path, encoding='latin-1', dtype=read_dtypes(TRANSFORMADO))
+            return apply_schema(df, TRANSFORMADO)
+        except Exception as e:
+            st.error(f"Erro ao ler o arquivo: {e}")
+            return None
+    except Exception as e:
+        st.error(f"Erro inesperado: {e}")
+        return None
+
+@diagnostics.tracked_cache(max_entries=4)
+def load_aggregate_tables(file_path, version, _df):
+    """Tabelas agregadas por dimensão (aggregates.py): as mantidas por diferença pelo
+    transform/watch quando correspondem a esta versão do arquivo; senão, recalculadas
+    uma única vez por versão"""
+    # As tabelas gravadas só valem para o próprio arquivo (não para uploads nem planilhas importadas)
+    if isinstance(file_path, str) and version == data_version(file_path):
+        tabelas = load_aggregates(file_path)
+        if tabelas is not None:
+            return tabelas
+    return aggregate(_df)
+
+def unfiltered_aggregates(ctx):
+    """Tabelas agregadas, ou None quando os filtros removeram linhas (aí o cálculo é sobre df_filtered)"""
+    if len(ctx.df_filtered) != len(ctx.df):
+        return None
+    return load_aggregate_tables(ctx.csv_file, ctx.version, ctx.df)
+
+def locate_csv(csv_file="dados_transformados_PPCAAM.csv"):
+    """Arquivo de dados do dashboard; sem o CSV no diretório, oferece o upload (ou interrompe)"""
+    if os.path.exists(csv_file):
+        return csv_file
+    if upload.has_imports():
+        # Sem o CSV, os dados vêm só das planilhas importadas nesta sessão
+        return None
+
+    st.error(f"❌ Arquivo '{csv_file}' não encontrado no diretório atual.")
+    st.info(f"Diretório atual: {os.getcwd()}")
+    st.info("Arquivos disponíveis:")
+    for file in os.listdir('.'):
+        if file.endswith('.csv'):
+            st.write(f"- {file}")
+
+    # Oferecer opção de upload
+    uploaded_file = st.file_uploader("Ou faça upload do arquivo CSV:", type=['csv'])
+    if uploaded_file is None:
+        st.write("Ou envie as planilhas PPCAAM originais, processadas aqui mesmo:")
+        upload.import_controls("fallback")
+        st.stop()
+    st.success("✅ Arquivo carregado com sucesso!")
+    return uploaded_file
+
+def load_context():
+    """Localiza e carrega os dados e detecta os tipos de coluna (sem controles nem filtros)"""
+    csv_file = locate_csv()
+    if csv_file is None:
+        df, version = upload.empty_frame(), "sem-arquivo"
+    else:
+        version = data_version(csv_file)
+        df = load_data(csv_file, version)
+
+    if df is None:
+        st.error("❌ Falha ao carregar os dados.")
+        st.stop()
+
+    # Planilhas importadas nesta sessão entram como uma nova versão dos dados
+    df, version = upload.merged_data(df, version)
+
+    st.success(f"✅ Dados carregados com sucesso! Shape: {df.shape}")
+    coercion_failures = df.attrs.get('falhas_coercao', {})
+    if coercion_failures:
+        st.warning(f"⚠️ {sum(coercion_failures.values())} valores não numéricos foram descartados: {coercion_failures}")
+
+    categorical_cols, numerical_cols, datetime_cols = cached(version, detect_column_types, df)
+    st.sidebar.success(f"📊 {len(categorical_cols)} categóricas | {len(numerical_cols)} numéricas | {len(datetime_cols)} datas")
+
+    return DashboardContext(
+        csv_file=csv_file,
+        version=version,
+        df=df,
+        df_filtered=df,
+        categorical_cols=categorical_cols,
+        numerical_cols=numerical_cols,
+        datetime_cols=datetime_cols,
+    )
+
+def sidebar_controls(ctx):
+    """Controles da barra lateral (percentual, tema e filtros); preenche ctx.df_filtered"""
+    df = ctx.df
+    categorical_cols, numerical_cols = ctx.categorical_cols, ctx.numerical_cols
+
+    st.sidebar.header("⚙️ Controles do Dashboard")
+
+    # Toggle para porcentagem/valores
+    ctx.show_percentage = st.sidebar.toggle("Mostrar Percentuais (%)", value=False,
+                                            help="Alterna entre mostrar valores absolutos e percentuais")
+
+    # Seletor de temas
+    ctx.theme = st.sidebar.selectbox("Tema do Gráfico",
+                                     ["plotly", "plotly_white", "plotly_dark", "ggplot2", "seaborn", "none"])
+
+    # Filtros dinâmicos
+    st.sidebar.header("🔍 Filtros de Dados")
+
+    # Criar cópia para filtros
+    df_filtered = df.copy()
+    # Filtros efetivamente aplicados, que identificam df_filtered no cache do analytics
+    applied_filters = []
+
+    # Filtros para colunas categóricas
+    if categorical_cols:
+        selected_cat_filter = st.sidebar.selectbox("Filtrar por categoria:",
+                                                  ["Nenhum"] + categorical_cols[:10])
+
+        if selected_cat_filter != "Nenhum":
+            try:
+                unique_values = df_filtered[selected_cat_filter].dropna().unique()
+                if len(unique_values) > 0:
+                    selected_values = st.sidebar.multiselect(
+                        f"Valores de {selected_cat_filter}:",
+                        options=list(unique_values),
+                        default=list(unique_values[:min(5, len(unique_values))])
+                    )
+                    if selected_values:
+                        df_filtered = df_filtered[df_filtered[selected_cat_filter].isin(selected_values)].copy()
+                        applied_filters.append((selected_cat_filter, tuple(selected_values)))
+                        st.sidebar.info(f"Filtrado: {len(df_filtered)} registros")
+                else:
+                    st.sidebar.warning(f"Coluna '{selected_cat_filter}' não tem valores válidos")
+            except Exception as e:
+                st.sidebar.error(f"Erro ao filtrar: {e}")
+
+    # Filtro para colunas numéricas
+    if numerical_cols:
+        selected_num_filter = st.sidebar.selectbox("Filtrar por valor numérico:",
+                                                  ["Nenhum"] + numerical_cols[:10])
+
+        if selected_num_filter != "Nenhum":
+            try:
+                min_val = float(df_filtered[selected_num_filter].min())
+                max_val = float(df_filtered[selected_num_filter].max())
+
+                if min_val != max_val:
+                    value_range = st.sidebar.slider(
+                        f"Intervalo de {selected_num_filter}:",
+                        min_val, max_val, (min_val, max_val)
+                    )
+                    df_filtered = df_filtered[
+                        (df_filtered[selected_num_filter] >= value_range[0]) &
+                        (df_filtered[selected_num_filter] <= value_range[1])
+                    ].copy()
+                    applied_filters.append((selected_num_filter, tuple(value_range)))
+                    st.sidebar.info(f"Filtrado: {len(df_filtered)} registros")
+                else:
+                    st.sidebar.warning(f"Coluna '{selected_num_filter}' tem apenas um valor: {min_val}")
+            except Exception as e:
+                st.sidebar.error(f"Erro ao filtrar numérico: {e}")
+
+    # Mostrar estatísticas dos filtros
+    st.sidebar.header("📊 Estatísticas do Filtro")
+    st.sidebar.metric("Registros Originais", len(df))
+    st.sidebar.metric("Registros Filtrados", len(df_filtered))
+    st.sidebar.metric("Redução", f"{((len(df) - len(df_filtered)) / len(df) * 100):.1f}%" if len(df) > 0 else "0%")
+
+    ctx.df_filtered = df_filtered
+    ctx.filter_key = tuple(applied_filters)
+    return ctx
@@ -0,0 +1,72 @@
+import streamlit as st
+
+from explorer import build_search_index, search_mask, selected_order, sort_order, page, positions_mask
+from sections import diagnostics
+
+
+@diagnostics.tracked_cache(max_entries=4)
+def load_search_index(version, _df):
+    """Índice de busca do explorador (secao/metrica), construído uma vez por versão dos dados"""
+    return build_search_index(_df)
+
+@diagnostics.tracked_cache(max_entries=16)
+def load_sort_order(version, column, ascending, _df):
+    """Ordem das linhas por coluna, calculada uma vez por versão dos dados"""
+    return sort_order(_df, column, ascending)
+
+@diagnostics.tracked_cache(max_entries=16)
+def load_selection(cache_version, search_term, column, ascending, _df, _df_filtered):
+    """Posições das linhas filtradas e encontradas pela busca, na ordem escolhida: calculadas
+    uma vez por (filtros, busca, ordenação), então trocar de página é só um recorte"""
+    version = cache_version[0]
+    mask = positions_mask(_df, _df_filtered) & search_mask(load_search_index(version, _df), search_term, len(_df))
+    return selected_order(load_sort_order(version, column, ascending, _df), mask)
+
+@diagnostics.tracked_cache(max_entries=2, show_spinner="Gerando os arquivos por unidade/ano...")
+def load_export(cache_version, file_format, _df):
+    """Zip com um arquivo por unidade/ano dos dados filtrados (export.py), gerado uma vez por filtro"""
+    # openpyxl é importado só quando alguém exporta (início mais rápido do dashboard)
+    from export import export_zip
+    return export_zip(_df, file_format)
+
+def render(ctx):
+    """Visualização 5: Explorador de dados brutos (paginação, ordenação e busca no servidor)"""
+    df = ctx.df
+
+    st.subheader("🔎 5. Explorador de Dados")
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        search_term = st.text_input("Buscar em seção/métrica:", key="explorer_search")
+    with col2:
+        sort_column = st.selectbox("Ordenar por:", list(df.columns), key="explorer_sort")
+    with col3:
+        sort_ascending = st.radio("Ordem:", ["↑", "↓"], horizontal=True, key="explorer_order") == "↑"
+    with col4:
+        page_size = st.selectbox("Linhas por página:", [25, 50, 100, 250], key="explorer_page_size")
+
+    try:
+        # Só a página visível é enviada ao navegador; a seleção ordenada vem do cache
+        selected = load_selection(ctx.cache_version, search_term.strip().lower(), sort_column, sort_ascending,
+                                  df, ctx.df_filtered)
+        total_rows = len(selected)
+        total_pages = max(1, -(-total_rows // page_size))
+        page_number = st.number_input("Página:", min_value=1, max_value=total_pages, value=1, step=1, key="explorer_page")
+        page_df, total_rows = page(df, selected, int(page_number) - 1, page_size)
+        st.caption(f"{total_rows} registros | página {int(page_number)} de {total_pages}")
+        st.dataframe(page_df, use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.error(f"Erro no explorador de dados: {e}")
+
+    with st.expander("⬇️ Exportar por unidade/ano (filtro atual)"):
+        file_format = st.radio("Formato:", ["xlsx", "csv"], horizontal=True, key="export_format")
+        # O zip só é gerado a pedido; depois fica disponível enquanto filtro e formato não mudarem
+        if st.button("Preparar arquivos", key="export_prepare"):
+            st.session_state["export_ready"] = (ctx.cache_version, file_format)
+        if st.session_state.get("export_ready") == (ctx.cache_version, file_format):
+            try:
+                data = load_export(ctx.cache_version, file_format, ctx.df_filtered)
+                st.download_button("📦 Baixar .zip", data, file_name=f"PPCAAM_exportacao_{file_format}.zip",
+                                   mime="application/zip", key="export_download")
+            except Exception as e:
+                st.error(f"Erro na exportação: {e}")
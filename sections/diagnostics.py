@@ -0,0 +1,200 @@
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from analytics import cache_info
+
+
+# Painel opcional de desempenho (barra lateral). Desligado, não mede nada: os pontos de
+# medição (section, plotly_chart) só repassam a chamada.
+TOGGLE_KEY = "diagnostics_enabled"
+_RUN_KEY = "diagnostics_run"
+_HISTORY_KEY = "diagnostics_history"
+HISTORY_SIZE_KEY = "diagnostics_history_size"
+
+# Chamadas e execuções (faltas) de cada função em cache, no processo inteiro: o cache do
+# st.cache_data é compartilhado entre as sessões
+_cache_stats = defaultdict(lambda: {'calls': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+
+
+def _count(name, field):
+    with _stats_lock:
+        _cache_stats[name][field] += 1
+
+def tracked_cache(**cache_kwargs):
+    """st.cache_data que também conta chamadas e execuções (faltas) para o painel.
+    A função só é executada numa falta; acertos = chamadas - execuções."""
+    def decorator(func):
+        name = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _count(name, 'misses')
+            return func(*args, **kwargs)
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _count(name, 'calls')
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+def enabled():
+    """Painel ligado nesta sessão (o toggle é desenhado no fim da barra lateral)"""
+    return bool(st.session_state.get(TOGGLE_KEY, False))
+
+def start_run():
+    """Inicia a medição desta execução do script, se o painel estiver ligado"""
+    if enabled():
+        st.session_state[_RUN_KEY] = {'start': time.perf_counter(), 'section': None,
+                                      'sections': {}, 'charts': []}
+    else:
+        st.session_state.pop(_RUN_KEY, None)
+
+@contextmanager
+def section(name):
+    """Mede o tempo de uma seção; o tempo de envio dos gráficos é separado do cálculo"""
+    run = st.session_state.get(_RUN_KEY)
+    if run is None:
+        yield
+        return
+    run['section'] = name
+    measures = run['sections'].setdefault(name, {'total': 0.0, 'render': 0.0, 'overhead': 0.0})
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        measures['total'] += time.perf_counter() - start
+        run['section'] = None
+
+def plotly_chart(fig, **kwargs):
+    """st.plotly_chart; com o painel ligado, mede o tempo de envio e o tamanho do gráfico.
+    O tamanho é o do JSON da figura (o que o navegador recebe); serializá-lo de novo só
+    acontece com o painel ligado e não entra no tempo da seção."""
+    run = st.session_state.get(_RUN_KEY)
+    if run is None:
+        return st.plotly_chart(fig, **kwargs)
+
+    start = time.perf_counter()
+    payload = len(fig.to_json().encode('utf-8'))
+    overhead = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = st.plotly_chart(fig, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    name = run['section'] or "—"
+    measures = run['sections'].setdefault(name, {'total': 0.0, 'render': 0.0, 'overhead': 0.0})
+    measures['render'] += elapsed
+    measures['overhead'] += overhead
+    run['charts'].append({'Seção': name, 'Título': fig.layout.title.text or "", 'KB': round(payload / 1024, 1),
+                          'Envio (ms)': round(elapsed * 1000, 1)})
+    return result
+
+def finish_run():
+    """Guarda a execução medida no histórico da sessão (últimas N, escolhidas no painel)"""
+    run = st.session_state.pop(_RUN_KEY, None)
+    if run is None:
+        return
+    history_size = int(st.session_state.get(HISTORY_SIZE_KEY, 10))
+    history = st.session_state.get(_HISTORY_KEY)
+    if history is None or history.maxlen != history_size:
+        history = deque(history or [], maxlen=history_size)
+        st.session_state[_HISTORY_KEY] = history
+    run['duration'] = time.perf_counter() - run['start']
+    history.append(run)
+
+@tracked_cache(max_entries=8)
+def frame_size(version, _df):
+    """Memória de um dataframe (memory_usage deep), calculada uma vez por versão"""
+    return int(_df.memory_usage(deep=True).sum())
+
+def _section_table(history):
+    rows = []
+    for name in dict.fromkeys(name for run in history for name in run['sections']):
+        measures = [run['sections'][name] for run in history if name in run['sections']]
+        compute = [(m['total'] - m['render'] - m['overhead']) * 1000 for m in measures]
+        render = [m['render'] * 1000 for m in measures]
+        rows.append({'Seção': name, 'Cálculo (ms)': round(sum(compute) / len(compute), 1),
+                     'Envio (ms)': round(sum(render) / len(render), 1),
+                     'Última (ms)': round(compute[-1] + render[-1], 1), 'Execuções': len(measures)})
+    return pd.DataFrame(rows)
+
+def _cache_table():
+    with _stats_lock:
+        stats = {name: dict(counts) for name, counts in _cache_stats.items()}
+    analytics = cache_info()
+    stats['analytics (LRU)'] = {'calls': analytics['hits'] + analytics['misses'], 'misses': analytics['misses']}
+    rows = []
+    for name, counts in sorted(stats.items()):
+        hits = counts['calls'] - counts['misses']
+        rows.append({'Função': name, 'Chamadas': counts['calls'], 'Acertos': hits, 'Faltas': counts['misses'],
+                     'Taxa de acerto': f"{hits / counts['calls'] * 100:.0f}%" if counts['calls'] else "—"})
+    return pd.DataFrame(rows)
+
+def _nested_frames(name, value, depth=0):
+    """Dataframes guardados em "value", inclusive dentro de dicts, listas e tuplas
+    (ex.: session_state['upload_imported']['rows'])"""
+    if isinstance(value, pd.DataFrame):
+        yield name, value
+    elif depth < 4 and isinstance(value, dict):
+        for key, item in value.items():
+            yield from _nested_frames(f"{name}['{key}']", item, depth + 1)
+    elif depth < 4 and isinstance(value, (list, tuple)):
+        for i, item in enumerate(value):
+            yield from _nested_frames(f"{name}[{i}]", item, depth + 1)
+
+def _frames_table(ctx):
+    frames = [("df (arquivo)", ctx.version, ctx.df), ("df_filtered", ctx.cache_version, ctx.df_filtered)]
+    for key, value in st.session_state.items():
+        frames += [(name, None, frame) for name, frame in _nested_frames(f"session_state['{key}']", value)]
+    rows, seen = [], set()
+    for name, version, frame in frames:
+        # O mesmo objeto (ex.: ctx.df vindo de session_state['upload_merged']['df']) é contado uma vez
+        if id(frame) in seen:
+            continue
+        seen.add(id(frame))
+        size = frame_size(version, frame) if version is not None else int(frame.memory_usage(deep=True).sum())
+        rows.append({'Dataframe': name, 'Linhas': len(frame), 'MB': round(size / 1024 / 1024, 2)})
+    return pd.DataFrame(rows)
+
+def render_panel(ctx):
+    """Toggle e painel de diagnóstico no fim da barra lateral"""
+    st.sidebar.header("🩺 Diagnóstico")
+    st.sidebar.toggle("Painel de desempenho", key=TOGGLE_KEY,
+                      help="Mede o tempo de cada seção, os caches e o tamanho dos gráficos a cada execução")
+    if not enabled():
+        return
+    st.sidebar.number_input("Execuções no histórico:", min_value=1, max_value=100, value=10, key=HISTORY_SIZE_KEY)
+    history = st.session_state.get(_HISTORY_KEY) or []
+    if not history:
+        st.sidebar.caption("As medidas aparecem a partir da próxima interação.")
+        return
+
+    st.sidebar.caption(f"Última execução: {history[-1]['duration'] * 1000:.0f} ms | médias das últimas {len(history)}")
+    st.sidebar.write("**Tempo por seção**")
+    st.sidebar.dataframe(_section_table(history), hide_index=True, use_container_width=True)
+
+    st.sidebar.write("**Gráficos (última execução)**")
+    charts = pd.DataFrame(history[-1]['charts'])
+    if len(charts):
+        st.sidebar.dataframe(charts, hide_index=True, use_container_width=True)
+        st.sidebar.caption(f"Total enviado: {charts['KB'].sum():.0f} KB")
+    else:
+        st.sidebar.caption("Nenhum gráfico nesta execução.")
+
+    st.sidebar.write("**Caches (todas as sessões)**")
+    st.sidebar.dataframe(_cache_table(), hide_index=True, use_container_width=True)
+
+    st.sidebar.write("**Dataframes da sessão**")
+    st.sidebar.dataframe(_frames_table(ctx), hide_index=True, use_container_width=True)
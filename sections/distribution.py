@@ -0,0 +1,98 @@
+import pandas as pd
+import streamlit as st
+
+from aggregates import value_counts_from
+from analytics import cached, prepare_categorical_data
+from charts import build_distribution_figure, build_histogram_figure
+from sections.data import unfiltered_aggregates
+from sections import diagnostics
+
+
+def render(ctx):
+    """Visualização 1: Distribuição de Dados"""
+    df_filtered = ctx.df_filtered
+    categorical_cols, numerical_cols = ctx.categorical_cols, ctx.numerical_cols
+    show_percentage, theme = ctx.show_percentage, ctx.theme
+
+    st.subheader("📈 1. Análise de Distribuição")
+
+    col1, col2 = st.columns([3, 1])
+    dist_column = None
+    dist_data = None
+
+    with col1:
+        # Seleção de coluna para distribuição
+        available_cols = categorical_cols if categorical_cols else numerical_cols
+
+        if available_cols:
+            dist_column = st.selectbox("Selecione a coluna para análise de distribuição:",
+                                      available_cols, key="dist_col")
+
+            if dist_column in categorical_cols:
+                # Gráfico de barras para categóricas (sem filtros, a contagem vem das tabelas agregadas)
+                tables = unfiltered_aggregates(ctx)
+                counts = value_counts_from(tables, dist_column) if tables and dist_column in tables else None
+                dist_data, message = cached(ctx.cache_version, prepare_categorical_data,
+                                            df_filtered, dist_column, show_percentage, counts)
+                if message:
+                    st.warning(message)
+
+                if dist_data is not None and len(dist_data) > 0:
+                    fig1 = build_distribution_figure(dist_data, dist_column, show_percentage, theme)
+                    diagnostics.plotly_chart(fig1, use_container_width=True)
+                else:
+                    st.warning(f"Não há dados suficientes para mostrar a distribuição de '{dist_column}'")
+
+            elif dist_column in numerical_cols:
+                # Histograma para numéricas
+                try:
+                    fig_hist = build_histogram_figure(df_filtered, dist_column, theme)
+                    diagnostics.plotly_chart(fig_hist, use_container_width=True)
+                except Exception as e:
+                    st.error(f"Erro ao criar histograma: {e}")
+
+    with col2:
+        st.write("### 📊 Estatísticas")
+
+        if dist_column is not None and dist_column in df_filtered.columns:
+            try:
+                col_data = df_filtered[dist_column].dropna()
+                if isinstance(col_data.dtype, pd.CategoricalDtype):
+                    # min/max de categorias não ordenadas: compara os rótulos como texto
+                    col_data = col_data.astype(str)
+
+                if len(col_data) > 0:
+                    stats = {
+                        'Métrica': ['Total', 'Média', 'Mediana', 'Moda', 'Desvio Padrão',
+                                   'Mínimo', 'Máximo', 'Valores Únicos', 'Valores Nulos'],
+                        'Valor': [
+                            len(col_data),
+                            f"{col_data.mean():.2f}" if pd.api.types.is_numeric_dtype(col_data) else 'N/A',
+                            f"{col_data.median():.2f}" if pd.api.types.is_numeric_dtype(col_data) else 'N/A',
+                            str(col_data.mode().iloc[0]) if len(col_data.mode()) > 0 else 'N/A',
+                            f"{col_data.std():.2f}" if pd.api.types.is_numeric_dtype(col_data) else 'N/A',
+                            f"{col_data.min():.2f}" if pd.api.types.is_numeric_dtype(col_data) else str(col_data.min()),
+                            f"{col_data.max():.2f}" if pd.api.types.is_numeric_dtype(col_data) else str(col_data.max()),
+                            str(col_data.nunique()),
+                            str(df_filtered[dist_column].isnull().sum())
+                        ]
+                    }
+
+                    stats_df = pd.DataFrame(stats)
+                    st.dataframe(stats_df, use_container_width=True, hide_index=True, height=400)
+
+                    # Mostrar top valores para categóricas (a contagem já feita para o gráfico)
+                    if dist_column in categorical_cols and dist_data is not None:
+                        st.write("**Top 5 Valores:**")
+                        for val, count in dist_data[[dist_column, 'count']].head(5).itertuples(index=False):
+                            st.write(f"- {val}: {count}")
+                else:
+                    st.warning("Coluna sem dados válidos")
+            except Exception as e:
+                st.error(f"Erro ao calcular estatísticas: {e}")
+
+        st.write("---")
+        st.write(f"**Configuração:**")
+        st.write(f"📈 Mostrando: **{'Percentuais' if show_percentage else 'Valores Absolutos'}**")
+        st.write(f"🎨 Tema: **{theme}**")
+        st.write(f"📊 Registros: **{len(df_filtered)}**")
@@ -0,0 +1,70 @@
+import streamlit as st
+
+from deltas import CHAVES_SERIE, MEDIDAS, PERIODO_ANO, PERIODOS, compute_deltas, rank_movers
+from deltas import load_deltas as load_saved_deltas
+from temporal import has_month_columns
+from sections import diagnostics
+from sections.data import data_version
+
+
+@diagnostics.tracked_cache(max_entries=4)
+def load_deltas(file_path, version, _df):
+    """Tabela de variações YoY/MoM/YTD (deltas.py): a gravada pelo transform/watch quando
+    corresponde a esta versão do arquivo; senão, calculada uma única vez por versão"""
+    # A tabela gravada só vale para o próprio arquivo (não para uploads nem planilhas importadas)
+    if isinstance(file_path, str) and version == data_version(file_path):
+        deltas = load_saved_deltas(file_path)
+        if deltas is not None:
+            return deltas
+    return compute_deltas(_df)
+
+@diagnostics.tracked_cache(max_entries=32)
+def load_movers(version, ano_referencia, periodo, medida, percentual, n, quedas, _deltas):
+    """Ranking das maiores variações, memorizado por combinação de controles"""
+    return rank_movers(_deltas, ano_referencia, periodo, medida, percentual, n, quedas)
+
+def render(ctx):
+    """Visualização 6: Maiores variações (ano a ano, mês a mês e acumulado no ano)"""
+    df = ctx.df
+
+    st.subheader("🚀 6. Maiores Variações")
+
+    if not has_month_columns(df) or not all(c in df.columns for c in CHAVES_SERIE):
+        st.info("ℹ️ O ranking de variações requer o formato do arquivo transformado (unidade, seção, métrica e meses).")
+        return
+
+    try:
+        deltas = load_deltas(ctx.csv_file, ctx.version, df)
+        years = sorted(int(ano) for ano in deltas['ano_referencia'].dropna().unique())
+
+        col1, col2, col3, col4, col5 = st.columns([2, 2, 1, 1, 1])
+        with col1:
+            measure = st.selectbox("Variação:", list(MEDIDAS), key="movers_measure")
+        with col2:
+            period = st.selectbox("Período:", PERIODOS if measure != 'Mês a mês (MoM)' else PERIODOS[:-1],
+                                  index=len(PERIODOS) - 1 if measure != 'Mês a mês (MoM)' else 0,
+                                  format_func=lambda p: "Ano inteiro" if p == PERIODO_ANO else p.capitalize(),
+                                  key="movers_period")
+        with col3:
+            year = st.selectbox("Ano:", years[::-1], key="movers_year")
+        with col4:
+            direction = st.radio("Direção:", ["Altas", "Quedas"], key="movers_direction")
+        with col5:
+            top_n = st.number_input("Top:", min_value=5, max_value=100, value=10, step=5, key="movers_top")
+
+        # Com filtros ativos, o ranking usa só as séries presentes nos dados filtrados
+        ranked = load_movers(ctx.version, year, period, measure, ctx.show_percentage,
+                             len(deltas) if len(ctx.df_filtered) != len(df) else int(top_n),
+                             direction == "Quedas", deltas)
+        if len(ctx.df_filtered) != len(df):
+            visible = ctx.df_filtered[CHAVES_SERIE].drop_duplicates()
+            ranked = ranked.merge(visible, on=CHAVES_SERIE, how='inner').head(int(top_n))
+
+        if len(ranked) > 0:
+            st.caption(f"{'Percentual' if ctx.show_percentage else 'Diferença absoluta'} | "
+                       f"séries sem valor de comparação ficam de fora")
+            st.dataframe(ranked, use_container_width=True, hide_index=True)
+        else:
+            st.info("Não há valores de comparação para o período escolhido (ex.: primeiro ano carregado).")
+    except Exception as e:
+        st.error(f"Erro no ranking de variações: {e}")
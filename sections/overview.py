@@ -0,0 +1,54 @@
+import pandas as pd
+import streamlit as st
+
+from sections import diagnostics
+
+
+@diagnostics.tracked_cache(max_entries=4)
+def dataset_summary(version, _df):
+    """Totais, estatísticas descritivas e detalhes das colunas, calculados uma vez por versão
+    (memory_usage deep e describe percorrem o dataframe inteiro)"""
+    col_info = []
+    for col in _df.columns:
+        col_info.append({
+            'Coluna': col,
+            'Tipo': str(_df[col].dtype),
+            'Valores Únicos': _df[col].nunique(),
+            'Valores Nulos': _df[col].isnull().sum(),
+            'Exemplo': str(_df[col].iloc[0]) if len(_df) > 0 else ''
+        })
+    return {
+        'missing': int(_df.isnull().sum().sum()),
+        'memory_mb': _df.memory_usage(deep=True).sum() / 1024 / 1024,
+        'describe': _df.describe(include='all').T,
+        'columns': pd.DataFrame(col_info),
+    }
+
+def render(ctx):
+    """Informações gerais do dataset (sem gráficos: desenhada antes de carregar o plotly)"""
+    df = ctx.df
+    summary = dataset_summary(ctx.version, df)
+
+    with st.expander("📋 Informações do Dataset", expanded=True):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total de Registros", len(df))
+        with col2:
+            st.metric("Total de Colunas", len(df.columns))
+        with col3:
+            st.metric("Dados Faltantes", summary['missing'])
+        with col4:
+            st.metric("Memória Usada", f"{summary['memory_mb']:.1f} MB")
+
+        st.write("**Amostra dos dados (primeiras 10 linhas):**")
+        st.dataframe(df.head(10), use_container_width=True, height=300)
+
+        tab1, tab2 = st.tabs(["📈 Estatísticas", "🔍 Detalhes das Colunas"])
+
+        with tab1:
+            st.write("**Estatísticas descritivas:**")
+            st.dataframe(summary['describe'], use_container_width=True)
+
+        with tab2:
+            st.write("**Informações das colunas:**")
+            st.dataframe(summary['columns'], use_container_width=True)
@@ -0,0 +1,160 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from temporal import GRANULARIDADES, has_month_columns, build_time_index, resample
+from sections import diagnostics
+
+
+@diagnostics.tracked_cache(max_entries=4)
+def load_time_index(version, _df):
+    """Índice temporal (ano_referencia × mês) com agregados mensal/trimestral/anual,
+    construído uma vez por versão dos dados"""
+    return build_time_index(_df)
+
+def render(ctx):
+    """Visualização 3: Análise Temporal (colunas de data ou meses do arquivo transformado)"""
+    df, df_filtered = ctx.df, ctx.df_filtered
+    categorical_cols, numerical_cols, datetime_cols = ctx.categorical_cols, ctx.numerical_cols, ctx.datetime_cols
+    theme = ctx.theme
+
+    st.subheader("📅 3. Análise Temporal")
+
+    if datetime_cols:
+        time_column = st.selectbox("Selecione a coluna de data/hora:",
+                                  datetime_cols,
+                                  key="time_column")
+
+        # Selecionar métrica para análise temporal
+        metric_options = numerical_cols if numerical_cols else categorical_cols
+        if metric_options:
+            metric_column = st.selectbox("Selecione a métrica para análise:",
+                                        metric_options,
+                                        key="metric_column")
+
+            try:
+                # Converter para datetime
+                df_filtered = df_filtered.copy()
+                df_filtered[time_column] = pd.to_datetime(df_filtered[time_column], errors='coerce')
+
+                # Remover valores nulos
+                temp_df = df_filtered.dropna(subset=[time_column, metric_column])
+
+                if len(temp_df) > 0:
+                    # Agrupar por período (mensal)
+                    temp_df['periodo'] = temp_df[time_column].dt.to_period('M')
+
+                    if metric_column in numerical_cols:
+                        # Para métricas numéricas: soma
+                        time_series = temp_df.groupby('periodo')[metric_column].sum().reset_index()
+                        aggregation = "Soma"
+                    else:
+                        # Para métricas categóricas: contagem
+                        time_series = temp_df.groupby('periodo').size().reset_index(name='count')
+                        metric_column = 'count'
+                        aggregation = "Contagem"
+
+                    time_series['periodo'] = time_series['periodo'].dt.to_timestamp()
+
+                    # Criar gráfico de linha
+                    fig3 = px.line(
+                        time_series,
+                        x='periodo',
+                        y=metric_column,
+                        title=f"{aggregation} de {metric_column if metric_column != 'count' else 'registros'} ao longo do tempo",
+                        markers=True,
+                        line_shape='spline'
+                    )
+
+                    # Adicionar área sombreada
+                    fig3.add_trace(
+                        go.Scatter(
+                            x=time_series['periodo'],
+                            y=time_series[metric_column],
+                            fill='tozeroy',
+                            fillcolor='rgba(100, 150, 250, 0.2)',
+                            line=dict(color='rgba(255,255,255,0)'),
+                            showlegend=False
+                        )
+                    )
+
+                    fig3.update_layout(
+                        template=theme if theme != "none" else None,
+                        xaxis_title="Período",
+                        yaxis_title=f"{aggregation} de {metric_column if metric_column != 'count' else 'registros'}",
+                        height=500,
+                        hovermode='x unified'
+                    )
+
+                    diagnostics.plotly_chart(fig3, use_container_width=True)
+
+                    # Estatísticas temporais
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Período Inicial", time_series['periodo'].min().strftime('%Y-%m'))
+                    with col2:
+                        st.metric("Período Final", time_series['periodo'].max().strftime('%Y-%m'))
+                    with col3:
+                        growth = ((time_series[metric_column].iloc[-1] - time_series[metric_column].iloc[0]) /
+                                 time_series[metric_column].iloc[0] * 100) if time_series[metric_column].iloc[0] != 0 else 0
+                        st.metric("Crescimento Total", f"{growth:.1f}%")
+                else:
+                    st.warning("Não há dados suficientes para análise temporal.")
+
+            except Exception as e:
+                st.error(f"Erro na análise temporal: {e}")
+    elif has_month_columns(df):
+        # Eixo temporal real do arquivo transformado: (ano_referencia, mês), pré-agregado na carga
+        time_index = load_time_index(ctx.version, df)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            granularity = st.radio("Granularidade:", list(GRANULARIDADES), horizontal=True, key="granularity")
+        with col2:
+            group_options = [c for c in ['unidade', 'secao', 'metrica'] if c in df.columns]
+            group_by = st.selectbox("Agrupar por:", ["Nenhum"] + group_options, key="time_group_by")
+
+        try:
+            # Sem filtros, a série vem pronta do índice
+            positions = df.index.get_indexer(df_filtered.index) if ctx.filter_key else None
+            time_series = resample(time_index, GRANULARIDADES[granularity], positions,
+                                   None if group_by == "Nenhum" else group_by)
+
+            if len(time_series) > 0:
+                fig3 = px.line(
+                    time_series,
+                    x='periodo',
+                    y='valor',
+                    color=None if group_by == "Nenhum" else group_by,
+                    title=f"Soma dos valores ({granularity.lower()}) ao longo do tempo",
+                    markers=True
+                )
+
+                fig3.update_layout(
+                    template=theme if theme != "none" else None,
+                    xaxis_title="Período",
+                    yaxis_title="Soma dos valores",
+                    height=500,
+                    hovermode='x unified'
+                )
+
+                diagnostics.plotly_chart(fig3, use_container_width=True)
+
+                # Estatísticas temporais (sobre o total do período)
+                total_series = time_series.groupby('periodo')['valor'].sum()
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Período Inicial", total_series.index.min().strftime('%Y-%m'))
+                with col2:
+                    st.metric("Período Final", total_series.index.max().strftime('%Y-%m'))
+                with col3:
+                    growth = ((total_series.iloc[-1] - total_series.iloc[0]) /
+                             total_series.iloc[0] * 100) if total_series.iloc[0] != 0 else 0
+                    st.metric("Crescimento Total", f"{growth:.1f}%")
+            else:
+                st.warning("Não há dados suficientes para análise temporal.")
+        except Exception as e:
+            st.error(f"Erro na análise temporal: {e}")
+    else:
+        st.info("ℹ️ Não foram detectadas colunas de data/hora para análise temporal.")
@@ -0,0 +1,157 @@
+import itertools
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from schema import TRANSFORMADO, apply_schema
+
+
+# Importação de planilhas PPCAAM (.xlsx) pelo dashboard: step_1 → step_3 rodam numa thread
+# em segundo plano só para os arquivos enviados, e as linhas resultantes são mescladas aos
+# dados carregados como uma nova versão, válida só para esta sessão.
+_JOB_KEY = "upload_job"
+_IMPORTED_KEY = "upload_imported"
+_MERGED_KEY = "upload_merged"
+_ERRORS_KEY = "upload_errors"
+_ids = itertools.count(1)
+
+
+class WorkbookImport:
+    """Importação em segundo plano de planilhas enviadas; o progresso é lido pela interface"""
+
+    # Etapas por arquivo: leitura, limpeza e transformação
+    STEPS = 3
+
+    def __init__(self, files, ano_referencia):
+        self.files = [(os.path.basename(file.name), file.getvalue()) for file in files]
+        self.ano_referencia = ano_referencia
+        self.done = 0
+        self.message = "Aguardando início..."
+        self.errors = []
+        self.result = None
+        self.finished = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def progress(self):
+        return self.done / (len(self.files) * self.STEPS) if self.files else 1.0
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _step(self, message):
+        self.message = message
+
+    def _run(self):
+        # transform (openpyxl) só é importado quando alguém importa planilhas
+        from transform import clean_frame, read_workbook, transform_frame
+
+        frames = []
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                for name, content in self.files:
+                    # O nome original é mantido: sem os metadados na ficha, a sigla vem dele
+                    path = os.path.join(folder, name)
+                    with open(path, 'wb') as f:
+                        f.write(content)
+                    done_before = self.done
+                    try:
+                        self._step(f"Lendo {name}...")
+                        data = read_workbook(path)
+                        self.done += 1
+                        self._step(f"Limpando {name}...")
+                        data = clean_frame(data, contexto=name)
+                        self.done += 1
+                        self._step(f"Transformando {name}...")
+                        frames.append(transform_frame(data, self.ano_referencia, contexto=name))
+                        self.done += 1
+                    except Exception as e:
+                        self.errors.append(f"{name}: {e}")
+                        self.done = done_before + self.STEPS
+            if frames:
+                self.result = apply_schema(pd.concat(frames, ignore_index=True), TRANSFORMADO)
+        finally:
+            self.message = "Concluído"
+            self.finished = True
+
+
+def start_import(files, ano_referencia):
+    """Inicia a importação dos arquivos numa thread; uma importação por vez na sessão"""
+    st.session_state[_JOB_KEY] = WorkbookImport(files, ano_referencia).start()
+
+def has_imports():
+    """A sessão tem linhas importadas de planilhas"""
+    return st.session_state.get(_IMPORTED_KEY) is not None
+
+def empty_frame():
+    """Dataframe vazio no esquema do arquivo transformado (sessão sem CSV, só com planilhas)"""
+    return apply_schema(pd.DataFrame(columns=[coluna.nome for coluna in TRANSFORMADO]), TRANSFORMADO)
+
+def merged_data(df, version):
+    """Dados carregados com as planilhas importadas nesta sessão: os pares (ano, unidade)
+    importados substituem os do arquivo. A mescla é feita uma vez por versão do arquivo e
+    por importação; a nova versão é (versão do arquivo, número da importação)."""
+    imported = st.session_state.get(_IMPORTED_KEY)
+    if imported is None:
+        return df, version
+
+    from transform import replace_pairs
+
+    merged = st.session_state.get(_MERGED_KEY)
+    if merged is None or merged['base'] != version or merged['id'] != imported['id']:
+        data, _ = replace_pairs(df, imported['rows'])
+        merged = {'base': version, 'id': imported['id'], 'df': apply_schema(data, TRANSFORMADO)}
+        st.session_state[_MERGED_KEY] = merged
+    return merged['df'], (version, f"importacao-{imported['id']}")
+
+def _finish(job):
+    """Guarda as linhas da importação concluída (somadas às de importações anteriores)"""
+    del st.session_state[_JOB_KEY]
+    st.session_state[_ERRORS_KEY] = job.errors
+    if job.result is None:
+        return
+    from transform import replace_pairs
+
+    previous = st.session_state.get(_IMPORTED_KEY)
+    rows = job.result if previous is None else apply_schema(replace_pairs(previous['rows'], job.result)[0], TRANSFORMADO)
+    st.session_state[_IMPORTED_KEY] = {'id': next(_ids), 'rows': rows,
+                                       'pairs': sorted(set(zip(rows['unidade'].astype(str), rows['ano_referencia'])))}
+
+@st.fragment(run_every=1.0)
+def _progress():
+    """Barra de progresso atualizada a cada segundo sem reexecutar a página; ao concluir,
+    a página inteira é reexecutada com a nova versão dos dados"""
+    job = st.session_state.get(_JOB_KEY)
+    if job is None:
+        return
+    if not job.finished:
+        st.progress(job.progress, text=job.message)
+        return
+    _finish(job)
+    st.rerun(scope="app")
+
+def import_controls(key_prefix):
+    """Envio de planilhas, ano padrão e andamento da importação (no container atual)"""
+    files = st.file_uploader("Planilhas PPCAAM (.xlsx):", type=['xlsx'], accept_multiple_files=True,
+                             key=f"{key_prefix}_files")
+    year = st.number_input("Ano (se a ficha não informar):", min_value=2000, max_value=2100, value=2025,
+                           key=f"{key_prefix}_year")
+    running = st.session_state.get(_JOB_KEY) is not None
+    if st.button("⚙️ Processar planilhas", key=f"{key_prefix}_start", disabled=running or not files):
+        start_import(files, int(year))
+    if st.session_state.get(_JOB_KEY) is not None:
+        _progress()
+    for error in st.session_state.get(_ERRORS_KEY, []):
+        st.error(f"Erro na importação de {error}")
+    imported = st.session_state.get(_IMPORTED_KEY)
+    if imported is not None:
+        st.caption(f"Importadas nesta sessão: {', '.join(f'{u}/{a}' for u, a in imported['pairs'])}")
+
+def render_sidebar():
+    """Importação de planilhas na barra lateral, mescladas aos dados carregados"""
+    with st.sidebar.expander("📥 Importar planilhas (.xlsx)", expanded=st.session_state.get(_JOB_KEY) is not None):
+        import_controls("upload")
@@ -0,0 +1,267 @@
+import argparse
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from schema import MESES, TRANSFORMADO, apply_schema
+
+
+# Chave de cada linha do arquivo transformado e colunas guardadas como células
+CHAVES = ['ano_referencia', 'unidade', 'secao', 'metrica']
+COLUNAS_CELULA = ['ano_anterior', *MESES, 'total']
+# Chave de cada linha no armazenamento: a mesma (secao, metrica) pode vir de abas diferentes
+# (ex.: uma aba por mês) ou repetir-se numa aba; cada ocorrência fica na sua linha, nunca somada
+CHAVES_LINHA = [*CHAVES, 'planilha', 'ocorrencia']
+
+_CRIACAO = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inicio TEXT NOT NULL,
+    origem TEXT,
+    celulas_alteradas INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS celulas (
+    ano_referencia INTEGER NOT NULL,
+    unidade TEXT NOT NULL,
+    secao TEXT NOT NULL,
+    metrica TEXT NOT NULL,
+    planilha TEXT NOT NULL DEFAULT '',
+    ocorrencia INTEGER NOT NULL DEFAULT 0,
+    coluna TEXT NOT NULL,
+    valor INTEGER,
+    ordem INTEGER,
+    removido INTEGER NOT NULL DEFAULT 0,
+    execucao INTEGER NOT NULL REFERENCES execucoes(id),
+    atualizado_em TEXT NOT NULL,
+    PRIMARY KEY (ano_referencia, unidade, secao, metrica, planilha, ocorrencia, coluna)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS celulas_execucao ON celulas(execucao);
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Colunas copiadas de um banco anterior à chave com planilha/ocorrência
+_MIGRACAO = """
+INSERT INTO celulas (ano_referencia, unidade, secao, metrica, planilha, coluna, valor, ordem, removido, execucao, atualizado_em)
+SELECT ano_referencia, unidade, secao, metrica, COALESCE(planilha, ''), coluna, valor, {ordem}, removido, execucao, atualizado_em
+FROM celulas_antiga
+"""
+
+# Só grava a célula se o valor mudou (ou se ela havia sido removida): reenviar a mesma
+# planilha não altera nada, e o carimbo de cada célula marca a última mudança real.
+_UPSERT = """
+INSERT INTO celulas (ano_referencia, unidade, secao, metrica, planilha, ocorrencia, coluna, valor, ordem, removido, execucao, atualizado_em)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+ON CONFLICT (ano_referencia, unidade, secao, metrica, planilha, ocorrencia, coluna) DO UPDATE SET
+    valor = excluded.valor,
+    ordem = excluded.ordem,
+    removido = 0,
+    execucao = excluded.execucao,
+    atualizado_em = excluded.atualizado_em
+WHERE celulas.valor IS NOT excluded.valor OR celulas.removido = 1 OR celulas.ordem IS NOT excluded.ordem
+"""
+
+
+def store_path(caminho_csv):
+    '''Banco do armazenamento por célula, na mesma pasta do arquivo transformado'''
+    return os.path.join(os.path.dirname(caminho_csv), "dados_PPCAAM.sqlite")
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+def _python_value(valor):
+    return None if pd.isna(valor) else int(valor)
+
+
+class CellStore:
+    '''
+    Armazenamento do arquivo transformado por chave (ano_referencia, unidade, secao, metrica,
+    planilha e ocorrência), com uma linha por célula (ano_anterior, cada mês e total) em SQLite.
+    Cada envio é uma execução numerada; o upsert só regrava as células cujo valor mudou,
+    carimbando-as com a execução e o horário. O índice sobre a execução torna
+    "o que mudou desde a execução N" uma consulta direta.
+    É a fonte do arquivo transformado: o CSV é exportado daqui (transform.publish), na
+    ordem das linhas de cada envio ("ordem").
+    '''
+
+    def __init__(self, caminho="dados_PPCAAM.sqlite"):
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        colunas = {linha[1] for linha in self.conexao.execute("PRAGMA table_info(celulas)")}
+        if colunas and 'ocorrencia' not in colunas:
+            # Bancos criados antes da chave com planilha/ocorrência: a chave primária não pode
+            # ser alterada, então a tabela é recriada e as células copiadas
+            with self.conexao:
+                self.conexao.execute("ALTER TABLE celulas RENAME TO celulas_antiga")
+                self.conexao.execute("DROP INDEX IF EXISTS celulas_execucao")
+        self.conexao.executescript(_CRIACAO)
+        if colunas and 'ocorrencia' not in colunas:
+            with self.conexao:
+                self.conexao.execute(_MIGRACAO.format(ordem='ordem' if 'ordem' in colunas else 'NULL'))
+                self.conexao.execute("DROP TABLE celulas_antiga")
+
+    def close(self):
+        self.conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _cells(self, dados):
+        '''
+        Linhas do dataframe como células, sem agregar: "ocorrencia" numera as linhas repetidas
+        da mesma (secao, metrica) numa aba, e "ordem" é a posição da linha no seu par
+        (ano_referencia, unidade). Linhas sem chave completa não são guardadas.
+        '''
+        colunas = [coluna for coluna in COLUNAS_CELULA if coluna in dados.columns]
+        linhas = dados[[*CHAVES, *colunas]].copy()
+        linhas['planilha'] = dados['planilha'].astype(object).fillna('') if 'planilha' in dados.columns else ''
+        linhas = linhas.dropna(subset=CHAVES)
+        linhas['ocorrencia'] = linhas.groupby([*CHAVES, 'planilha'], observed=True, sort=False).cumcount()
+        linhas['ordem'] = linhas.groupby(['ano_referencia', 'unidade'], observed=True, sort=False).cumcount()
+        return linhas.melt(id_vars=[*CHAVES_LINHA, 'ordem'], value_vars=colunas,
+                           var_name='coluna', value_name='valor')
+
+    def upsert(self, dados, origem=None):
+        '''
+        Registra um envio (ex.: a planilha de um estado transformada) e grava só as células
+        alteradas. O envio substitui os pares (ano_referencia, unidade) que contém: células
+        guardadas desses pares que não vieram nele são marcadas como removidas.
+        Retorna (número da execução, células alteradas).
+        '''
+        celulas = self._cells(dados)
+        enviadas = set(zip(celulas['ano_referencia'].astype(int), celulas['unidade'].astype(str),
+                           celulas['secao'].astype(str), celulas['metrica'].astype(str),
+                           celulas['planilha'].astype(str), celulas['ocorrencia'].astype(int), celulas['coluna']))
+        pares = {(ano, unidade) for ano, unidade, *_ in enviadas}
+        with self.conexao:
+            cursor = self.conexao.execute("INSERT INTO execucoes (inicio, origem) VALUES (?, ?)", (_now(), origem))
+            execucao = cursor.lastrowid
+            antes = self.conexao.total_changes
+            carimbo = _now()
+            self.conexao.executemany(_UPSERT, (
+                (int(ano), str(unidade), str(secao), str(metrica), str(planilha), int(ocorrencia), coluna,
+                 _python_value(valor), int(ordem), execucao, carimbo)
+                for ano, unidade, secao, metrica, planilha, ocorrencia, ordem, coluna, valor
+                in celulas.itertuples(index=False)
+            ))
+            ausentes = [
+                chave for ano, unidade in pares
+                for chave in self.conexao.execute(
+                    "SELECT ano_referencia, unidade, secao, metrica, planilha, ocorrencia, coluna FROM celulas "
+                    "WHERE ano_referencia = ? AND unidade = ? AND removido = 0", (ano, unidade))
+                if chave not in enviadas
+            ]
+            self.conexao.executemany(
+                "UPDATE celulas SET valor = NULL, removido = 1, execucao = ?, atualizado_em = ? "
+                "WHERE ano_referencia = ? AND unidade = ? AND secao = ? AND metrica = ? "
+                "AND planilha = ? AND ocorrencia = ? AND coluna = ?",
+                ((execucao, carimbo, *chave) for chave in ausentes)
+            )
+            alteradas = self.conexao.total_changes - antes
+            self.conexao.execute("UPDATE execucoes SET celulas_alteradas = ? WHERE id = ?", (alteradas, execucao))
+        return execucao, alteradas
+
+    def remove_pairs(self, pares, origem=None):
+        '''
+        Marca como removidas as células dos pares (ano_referencia, unidade), ex.: planilha apagada.
+        As células ficam com o carimbo da execução, então a remoção aparece em changed_since.
+        '''
+        with self.conexao:
+            cursor = self.conexao.execute("INSERT INTO execucoes (inicio, origem) VALUES (?, ?)", (_now(), origem))
+            execucao = cursor.lastrowid
+            antes = self.conexao.total_changes
+            self.conexao.executemany(
+                "UPDATE celulas SET valor = NULL, removido = 1, execucao = ?, atualizado_em = ? "
+                "WHERE ano_referencia = ? AND unidade = ? AND removido = 0",
+                ((execucao, _now(), int(ano), str(unidade)) for ano, unidade in pares)
+            )
+            alteradas = self.conexao.total_changes - antes
+            self.conexao.execute("UPDATE execucoes SET celulas_alteradas = ? WHERE id = ?", (alteradas, execucao))
+        return execucao, alteradas
+
+    def pairs_by_origin(self):
+        '''Pares (ano_referencia, unidade) com células ativas, pela origem dos envios que as gravaram'''
+        pares = {}
+        for origem, ano, unidade in self.conexao.execute(
+                "SELECT DISTINCT e.origem, c.ano_referencia, c.unidade FROM celulas c "
+                "JOIN execucoes e ON e.id = c.execucao WHERE c.removido = 0"):
+            pares.setdefault(origem, set()).add((ano, unidade))
+        return pares
+
+    def changed_pairs(self, execucao):
+        '''Pares (ano_referencia, unidade) com células alteradas depois da execução "execucao"'''
+        return set(self.conexao.execute(
+            "SELECT DISTINCT ano_referencia, unidade FROM celulas WHERE execucao > ?", (execucao,)))
+
+    def get_meta(self, chave):
+        linha = self.conexao.execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+        return None if linha is None else linha[0]
+
+    def set_meta(self, chave, valor):
+        with self.conexao:
+            self.conexao.execute("INSERT INTO metadados (chave, valor) VALUES (?, ?) "
+                                 "ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor", (chave, valor))
+
+    def last_run(self):
+        '''Número da última execução registrada (0 se nenhuma)'''
+        return self.conexao.execute("SELECT COALESCE(MAX(id), 0) FROM execucoes").fetchone()[0]
+
+    def changed_since(self, execucao):
+        '''Células alteradas depois da execução "execucao" (consulta pelo índice do carimbo)'''
+        return pd.read_sql_query(
+            "SELECT ano_referencia, unidade, secao, metrica, planilha, ocorrencia, coluna, valor, removido, "
+            "execucao, atualizado_em FROM celulas WHERE execucao > ? "
+            "ORDER BY execucao, ano_referencia, unidade, secao, metrica, planilha, ocorrencia",
+            self.conexao, params=(execucao,)
+        )
+
+    def to_frame(self, pares=None):
+        '''
+        Conteúdo atual no formato do arquivo transformado (esquema TRANSFORMADO), ordenado por
+        ano_referencia, unidade e a ordem das linhas no envio; com "pares", só desses
+        (ano_referencia, unidade), consultados pela chave primária.
+        '''
+        consulta = ("SELECT ano_referencia, unidade, secao, metrica, planilha, ocorrencia, coluna, valor, ordem "
+                    "FROM celulas WHERE removido = 0")
+        if pares is None:
+            celulas = pd.read_sql_query(consulta, self.conexao)
+        else:
+            partes = [pd.read_sql_query(consulta + " AND ano_referencia = ? AND unidade = ?", self.conexao,
+                                        params=(int(ano), str(unidade))) for ano, unidade in pares]
+            celulas = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+        colunas = [c.nome for c in TRANSFORMADO]
+        if len(celulas) == 0:
+            return apply_schema(pd.DataFrame(columns=colunas), TRANSFORMADO)
+
+        largo = celulas.pivot(index=CHAVES_LINHA, columns='coluna', values='valor').reindex(columns=COLUNAS_CELULA)
+        largo = largo.join(celulas.groupby(CHAVES_LINHA)['ordem'].first()).reset_index()
+        largo = largo.sort_values(['ano_referencia', 'unidade', 'ordem'], kind='stable', ignore_index=True)
+        largo['planilha'] = largo['planilha'].replace('', None)
+        largo.columns.name = None
+        return apply_schema(largo[colunas], TRANSFORMADO)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o armazenamento por célula do arquivo transformado.")
+    parser.add_argument("--banco", default="dados_PPCAAM.sqlite")
+    parser.add_argument("--desde", type=int, help="Lista as células alteradas depois desta execução")
+    parser.add_argument("--exportar", help="Grava o conteúdo atual neste CSV")
+    args = parser.parse_args()
+
+    with CellStore(args.banco) as store:
+        if args.exportar:
+            store.to_frame().to_csv(args.exportar, index=False, encoding='utf-8-sig')
+            print(f"Conteúdo exportado para '{args.exportar}'.")
+        desde = args.desde if args.desde is not None else store.last_run() - 1
+        alteracoes = store.changed_since(desde)
+        print(f"Última execução: {store.last_run()}. Células alteradas desde a execução {desde}: {len(alteracoes)}")
+        if len(alteracoes):
+            print(alteracoes.to_string(index=False, max_rows=50))
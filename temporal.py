@@ -0,0 +1,114 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from schema import MESES
+
+
+# Granularidades oferecidas no dashboard → frequência do pandas
+GRANULARIDADES = {'Mensal': 'M', 'Trimestral': 'Q', 'Anual': 'Y'}
+# Chave dos agregados pré-calculados
+DIMENSOES = ['unidade', 'secao', 'metrica']
+
+
+class IndiceTemporal(NamedTuple):
+    '''Índice temporal do arquivo transformado (ver build_time_index)'''
+    chave_linha: np.ndarray        # chave (unidade, secao, metrica) de cada linha de df
+    linhas_por_chave: np.ndarray   # número de linhas de df em cada chave
+    rotulos: pd.DataFrame          # unidade/secao/metrica de cada chave
+    mensal_linhas: pd.DataFrame    # [linha, chave, valor, periodo_M/Q/Y]: meses de cada linha de origem
+    por_chave: dict                # frequência → [chave, periodo, valor, *dimensões], por chave e período
+    totais: dict                   # (frequência, agrupamento) → série sem filtros, já somada
+
+
+def has_month_columns(df):
+    '''Indica se o dataframe segue o formato transformado (ano_referencia + colunas mensais)'''
+    return 'ano_referencia' in df.columns and all(mes in df.columns for mes in MESES)
+
+def build_time_index(df):
+    '''
+    Constrói, uma única vez por versão dos dados, o índice temporal do arquivo transformado.
+    1. Converte as colunas janeiro…dezembro em formato longo com um período (ano_referencia, mês).
+    2. Pré-calcula os agregados mensal, trimestral e anual por (unidade, secao, metrica, periodo),
+       ordenados por chave e período.
+    3. Pré-calcula a série sem filtros de cada granularidade, total e por dimensão.
+    Os períodos mensais por linha de origem ficam guardados para os filtros que selecionam
+    só parte das linhas de uma chave.
+    '''
+    anos = pd.to_numeric(df['ano_referencia'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    valores = np.column_stack([
+        pd.to_numeric(df[mes], errors='coerce').to_numpy(dtype=float, na_value=np.nan) for mes in MESES
+    ])
+    n_linhas = len(df)
+
+    dimensoes = [coluna for coluna in DIMENSOES if coluna in df.columns]
+    if dimensoes:
+        chave_linha = df.groupby(dimensoes, sort=True, observed=True, dropna=False).ngroup().to_numpy()
+        # Rótulos de cada chave: os da primeira linha em que ela aparece
+        rotulos = df[dimensoes].iloc[np.unique(chave_linha, return_index=True)[1]].reset_index(drop=True)
+    else:
+        chave_linha = np.zeros(n_linhas, dtype=int)
+        rotulos = pd.DataFrame(index=pd.RangeIndex(min(n_linhas, 1)))
+    linhas_por_chave = np.bincount(chave_linha, minlength=len(rotulos))
+
+    # Formato longo: cada linha de origem vira 12 períodos mensais
+    linha = np.repeat(np.arange(n_linhas), len(MESES))
+    mes = np.tile(np.arange(1, len(MESES) + 1), n_linhas)
+    ano = np.repeat(anos, len(MESES))
+    valido = ~np.isnan(ano)
+
+    periodos = pd.PeriodIndex(
+        pd.to_datetime({'year': ano[valido].astype(int), 'month': mes[valido], 'day': 1}),
+        freq='M'
+    )
+    mensal = pd.DataFrame({
+        'linha': linha[valido],
+        'chave': chave_linha[linha[valido]],
+        'valor': valores.reshape(-1)[valido],
+    })
+    for freq in GRANULARIDADES.values():
+        mensal[f'periodo_{freq}'] = periodos.asfreq(freq).to_timestamp()
+
+    por_chave, totais = {}, {}
+    for freq in GRANULARIDADES.values():
+        tabela = mensal.groupby(['chave', f'periodo_{freq}'], sort=True)['valor'].sum(min_count=1).reset_index()
+        tabela = tabela.rename(columns={f'periodo_{freq}': 'periodo'})
+        for coluna in dimensoes:
+            tabela[coluna] = rotulos[coluna].to_numpy()[tabela['chave'].to_numpy()]
+        por_chave[freq] = tabela
+        for por in [None, *dimensoes]:
+            totais[(freq, por)] = _sum_by_period(tabela, por)
+    return IndiceTemporal(chave_linha, linhas_por_chave, rotulos, mensal, por_chave, totais)
+
+def _sum_by_period(tabela, por):
+    colunas = ['periodo'] if por is None else ['periodo', por]
+    return tabela.groupby(colunas, sort=True, observed=True)['valor'].sum().reset_index()
+
+def resample(indice, freq, posicoes=None, por=None):
+    '''
+    Série temporal na granularidade pedida, somando as linhas de origem em "posicoes"
+    (todas quando None). Com "por" (ex.: 'unidade'), retorna uma série por grupo.
+    1. Sem filtro, a série já está pronta (indice.totais).
+    2. Se as linhas formam chaves inteiras (ex.: filtro por unidade, secao ou metrica),
+       recorta os agregados por chave.
+    3. Senão (ex.: filtro por intervalo de valores), soma os períodos das linhas selecionadas.
+    '''
+    if posicoes is None:
+        return indice.totais[(freq, por)]
+
+    posicoes = np.unique(np.asarray(posicoes))
+    posicoes = posicoes[posicoes >= 0]
+    chaves = np.unique(indice.chave_linha[posicoes])
+    if indice.linhas_por_chave[chaves].sum() == len(posicoes):
+        tabela = indice.por_chave[freq]
+        return _sum_by_period(tabela[np.isin(tabela['chave'].to_numpy(), chaves)], por)
+
+    selecionadas = np.zeros(len(indice.chave_linha), dtype=bool)
+    selecionadas[posicoes] = True
+    mensal = indice.mensal_linhas
+    tabela = mensal.loc[selecionadas[mensal['linha'].to_numpy()], ['chave', f'periodo_{freq}', 'valor']]
+    tabela = tabela.rename(columns={f'periodo_{freq}': 'periodo'})
+    if por is not None:
+        tabela[por] = indice.rotulos[por].to_numpy()[tabela['chave'].to_numpy()]
+    return _sum_by_period(tabela, por)
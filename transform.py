@@ -1,85 +1,365 @@
 import glob
+import hashlib
 import json
+import os
+import re
+import unicodedata
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from xml.etree import ElementTree
+
+import numpy as np
 import pandas as pd
+from openpyxl import load_workbook
 
+from aggregates import update_aggregates
+from deltas import compute_deltas, deltas_current, save_deltas
+from store import CellStore, store_path
+from schema import (MESES, ARQUIVO_DICIONARIO, COLUNA_ROTULO, COLUNA_ANO_ANTERIOR, COLUNAS_VALORES,
+                    CONSOLIDADO, LIMPO, TRANSFORMADO, apply_schema, read_csv)
 
-def step_1():
+# Versão da lógica de transformação; faz parte da chave do cache de resultados,
+# então deve ser incrementada sempre que a saída para as mesmas entradas mudar.
+PIPELINE_VERSION = "5"
+# Campos com nomes canônicos (e IDs estáveis) no dicionário
+CAMPOS_CANONICOS = ['secao', 'metrica']
+# Arquivos de regras/mapeamento cujo conteúdo influencia o resultado
+ARQUIVOS_REGRAS = ["secao.json", ARQUIVO_DICIONARIO]
+
+# Rótulos da primeira coluna que localizam os metadados e o fim do bloco de dados da ficha
+ANCORA_ANO = 'Ano Referência'
+ANCORA_UNIDADE = 'Unidade do PPCAAM'
+ANCORA_FIM = 'Comentários Adicionais'
+# Primeira coluna das linhas de controle e de cabeçalho/identificação da ficha
+ROTULOS_CONTROLE = [
+    'CONTROLE',
+    'Programa de Proteção a Crianças e Adolescentes Ameaçados de Morte (PPCAAM)',
+    'Ficha de Coleta de Dados Quantitativos dos Programas Estaduais',
+    'Identificação', ANCORA_ANO, ANCORA_UNIDADE, 'Responsável pelo preenchimento ',
+    'Coleta mensal', 'Criança/Adolescente incluído ',
+]
+# Colunas da planilha na ordem em que aparecem (rótulo, ano anterior, 12 meses, total)
+COLUNAS_PLANILHA = [COLUNA_ROTULO, COLUNA_ANO_ANTERIOR, *COLUNAS_VALORES]
+# Namespaces do pacote .xlsx usados para mapear abas → partes do zip
+_NS_PLANILHA = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_RELACOES = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+def load_sections():
+    '''Lista de seções do secao.json'''
+    with open('secao.json', 'r', encoding='utf-8') as f:
+        return json.load(f)['secao']
+
+def normalize_labels(rotulos):
     '''
-    Consolida arquivos Excel de diferentes estados em um único arquivo CSV.
-    Cada arquivo Excel deve estar nomeado no formato "dados_estado.xlsx", onde "estado" é a sigla do estado (AL, AC, BA, AM, AP).
-    1. Lê todos os arquivos Excel na pasta "origen".
-    2. Adiciona uma coluna "estado" com a sigla do estado correspondente.
-    3. Concatena todos os dados em um único DataFrame.
-    4. Salva o DataFrame consolidado em um arquivo CSV chamado "dados_consolidados_PPCAAM.csv".
-    5. Imprime o número total de linhas consolidadas.
+    Forma de comparação dos rótulos (vetorizada): sem acentos, em minúsculas (casefold)
+    e com espaços colapsados, de modo que 'Criança/Adolescente incluído ' e
+    'crianca/adolescente incluido' tenham a mesma chave.
     '''
-    # Lista todos os arquivos Excel na pasta atual
-    arquivos_excel = glob.glob("origen/*.xlsx")
+    return (pd.Series(rotulos, dtype='string').str.normalize('NFKD')
+            .str.encode('ascii', 'ignore').str.decode('ascii')
+            .str.casefold().str.replace(r'\s+', ' ', regex=True).str.strip())
 
-    # Lista para armazenar todos os DataFrames
-    todos_dados = []
+def normalize_label(rotulo):
+    '''normalize_labels para um único rótulo (None se vazio), usada na leitura linha a linha'''
+    if rotulo is None:
+        return None
+    texto = unicodedata.normalize('NFKD', str(rotulo)).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'\s+', ' ', texto.casefold()).strip()
 
-    # Lê cada arquivo e adiciona à lista
-    for arquivo in arquivos_excel:
-        # Extrai o estado do nome do arquivo (AL, AC, BA, AM, AP)
-        estado = arquivo.split('_')[-1].split('.')[0]
-        
-        # Lê o arquivo Excel
-        df = pd.read_excel(arquivo)
-        
-        # Adiciona uma coluna com o estado
-        df['estado'] = estado
-        
-        # Adiciona à lista
-        todos_dados.append(df)
+@lru_cache(maxsize=4)
+def _load_dictionary(caminho, versao):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        entradas = json.load(f)
+    dicionario = {}
+    for campo in CAMPOS_CANONICOS:
+        ordenadas = sorted(entradas.get(campo, []), key=lambda e: e['id'])
+        nomes = [e['nome'] for e in ordenadas]
+        # Cada nome canônico e cada variante cadastrada apontam para o nome canônico
+        rotulos = [(nome, nome) for nome in nomes] + \
+                  [(variante, e['nome']) for e in ordenadas for variante in e.get('variantes', [])]
+        indice = pd.Series([nome for _, nome in rotulos], dtype=object,
+                           index=normalize_labels([rotulo for rotulo, _ in rotulos]).to_numpy())
+        dicionario[campo] = (indice[~indice.index.duplicated()], nomes)
+    return dicionario
 
-    # Concatena todos os DataFrames
-    dados_consolidados = pd.concat(todos_dados, ignore_index=True)
+def load_dictionary(caminho=ARQUIVO_DICIONARIO):
+    '''
+    Dicionário canônico por campo: (rótulo normalizado → nome canônico, nomes na ordem dos IDs).
+    Memorizado pela versão (mtime/tamanho) do arquivo, lido uma vez por processo.
+    '''
+    info = os.stat(caminho)
+    return _load_dictionary(caminho, (info.st_mtime_ns, info.st_size))
 
-    # Salva como CSV
-    dados_consolidados.to_csv("dados_consolidados_PPCAAM.csv", index=False, encoding='utf-8-sig')
+def canonicalize(dados, contexto=None, caminho=ARQUIVO_DICIONARIO):
+    '''
+    Troca os rótulos de seção e métrica pelos nomes canônicos do dicionário.
+    1. Só os rótulos distintos (categorias) são normalizados, não cada linha.
+    2. As categorias seguem a ordem dos IDs do dicionário, então o código de cada
+       nome é estável entre estados e execuções.
+    3. Rótulos sem mapeamento são agrupados pela forma normalizada (o primeiro
+       visto, sem espaços sobrando, vira o nome), entram depois das categorias do
+       dicionário e são listados em dados.attrs['rotulos_sem_mapeamento'];
+       com "contexto", são impressos.
+    '''
+    dicionario = load_dictionary(caminho)
+    dados = dados.copy()
+    sem_mapeamento = {}
+    for campo in CAMPOS_CANONICOS:
+        if campo not in dados.columns:
+            continue
+        rotulos = dados[campo].astype('category').cat
+        originais = pd.Series(rotulos.categories.astype(str))
+        chaves = normalize_labels(originais)
+        indice, nomes_canonicos = dicionario[campo]
+        nomes = chaves.map(indice).astype(object)
+        faltantes = nomes.isna()
+        if faltantes.any():
+            limpos = originais.str.replace(r'\s+', ' ', regex=True).str.strip()
+            nomes[faltantes] = limpos[faltantes].groupby(chaves[faltantes]).transform('first')
+            sem_mapeamento[campo] = sorted(originais[faltantes])
+        categorias = pd.Index(nomes_canonicos, dtype=object).append(
+            pd.Index(sorted(set(nomes[faltantes]) - set(nomes_canonicos)), dtype=object))
+        codigos = categorias.get_indexer(nomes)
+        dados[campo] = pd.Categorical.from_codes(
+            np.where(rotulos.codes >= 0, codigos[rotulos.codes], -1), categories=categorias)
 
-    print(f"Arquivos consolidados com sucesso! Total de linhas: {len(dados_consolidados)}")
+    dados.attrs['rotulos_sem_mapeamento'] = sem_mapeamento
+    if contexto and sem_mapeamento:
+        for campo, lista in sem_mapeamento.items():
+            print(f"Aviso ({contexto}): {len(lista)} rótulos de {campo} sem mapeamento em {caminho}: "
+                  f"{lista[:10]}{' …' if len(lista) > 10 else ''}")
+    return dados
 
-def step_2():
+def extend_dictionary(dados, caminho=ARQUIVO_DICIONARIO):
     '''
-    Letura de arquivo CSV consolidado e exibição de amostra dos dados.
-    Elimina as filas com primeira coluna igual a CONTROLE ou vazia.
-    1. Lê o arquivo CSV "dados_consolidados_PPCAAM.csv".
-    2. Exibe as primeiras linhas do DataFrame.
-    3. Exibe informações do DataFrame.
-    4. Exibe a contagem de linhas e colunas.
-    5. Elimina as filas com primeira coluna igual a CONTROLE ou vazia.
-    6. Exibe a contagem de linhas e colunas após a limpeza.
-    7. Salva o DataFrame limpo em "dados_limpos_PPCAAM.csv".
-    8. Imprime mensagem de sucesso.
+    Acrescenta ao dicionário os rótulos de "dados" ainda sem mapeamento, com os próximos IDs
+    (os IDs existentes nunca mudam). Retorna o número de entradas novas; sem entradas novas,
+    o arquivo não é regravado.
     '''
-    # Lê o arquivo CSV consolidado
-    dados = pd.read_csv("dados_consolidados_PPCAAM.csv", encoding='utf-8-sig')
-    print(f"\nContagem de linhas e colunas antes da limpeza: {dados.shape}")
-    # Elimina filas com primeira coluna igual a CONTROLE ou vazia
+    sem_mapeamento = canonicalize(dados, caminho=caminho).attrs['rotulos_sem_mapeamento']
+    if not sem_mapeamento:
+        return 0
+    with open(caminho, 'r', encoding='utf-8') as f:
+        entradas = json.load(f)
+    novas = 0
+    for campo, rotulos in sem_mapeamento.items():
+        lista = entradas.setdefault(campo, [])
+        proximo = max((e['id'] for e in lista), default=0) + 1
+        chaves = normalize_labels(rotulos)
+        for rotulo in pd.Series(rotulos).str.replace(r'\s+', ' ', regex=True).str.strip()[~chaves.duplicated().to_numpy()]:
+            lista.append({'id': proximo, 'nome': rotulo})
+            proximo += 1
+            novas += 1
+    # Uma entrada por linha, como no arquivo versionado
+    partes = [f'    "{campo}": [\n' + ",\n".join(f"        {json.dumps(e, ensure_ascii=False)}" for e in lista) + "\n    ]"
+              for campo, lista in entradas.items()]
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write("{\n" + ",\n".join(partes) + "\n}\n")
+    os.replace(temporario, caminho)
+    return novas
+
+def state_from_filename(arquivo):
+    '''Extrai o estado do nome do arquivo (AL, AC, BA, AM, AP)'''
+    return os.path.basename(arquivo).split('_')[-1].split('.')[0]
+
+def _first_value(linha):
+    '''Primeiro valor preenchido depois da coluna de rótulo (valor de um campo de metadado)'''
+    for valor in linha[1:]:
+        if valor is not None and str(valor).strip() != '':
+            return valor.strip() if isinstance(valor, str) else valor
+    return None
+
+def _parse_year(valor):
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return None
+
+def _shared_strings(pacote):
+    '''Textos compartilhados do .xlsx (sharedStrings.xml), na ordem dos índices'''
+    try:
+        raiz = ElementTree.fromstring(pacote.read('xl/sharedStrings.xml'))
+    except KeyError:
+        return []
+    return [''.join(item.itertext()) for item in raiz.iter(f'{{{_NS_PLANILHA}}}si')]
+
+def _referenced_strings(pacote, caminho, textos):
+    '''
+    CRC dos textos compartilhados que a aba usa (células t="s"), com os seus índices:
+    a aba depende só deles, não do sharedStrings.xml inteiro
+    '''
+    indices = set()
+    with pacote.open(caminho) as parte:
+        for _, elemento in ElementTree.iterparse(parte):
+            if elemento.tag == f'{{{_NS_PLANILHA}}}c':
+                if elemento.get('t') == 's':
+                    valor = elemento.find(f'{{{_NS_PLANILHA}}}v')
+                    if valor is not None and valor.text:
+                        indices.add(int(valor.text))
+                elemento.clear()
+    crc = 0
+    for indice in sorted(indices):
+        texto = textos[indice] if indice < len(textos) else ''
+        crc = zipfile.crc32(f"{indice}\x00{texto}\x00".encode('utf-8'), crc)
+    return f"{crc:08x}"
+
+def sheet_signatures(arquivo):
+    '''
+    Assinatura de conteúdo de cada planilha do arquivo, na ordem das abas: o .xlsx é um
+    zip e cada aba é uma parte xl/worksheets/*.xml com CRC32 próprio. Os rótulos das
+    células ficam nos textos compartilhados (sharedStrings.xml), comuns a todas as abas;
+    a assinatura inclui só os textos que a aba referencia, então editar um texto de uma
+    aba não muda a assinatura das demais. Para isso, sharedStrings.xml e o XML de cada
+    aba são percorridos (sem openpyxl), o que custa bem menos que reler as abas.
+    '''
+    with zipfile.ZipFile(arquivo) as pacote:
+        partes = {info.filename: info for info in pacote.infolist()}
+        livro = ElementTree.fromstring(pacote.read('xl/workbook.xml'))
+        relacoes = ElementTree.fromstring(pacote.read('xl/_rels/workbook.xml.rels'))
+        destinos = {relacao.get('Id'): relacao.get('Target') for relacao in relacoes}
+        textos = _shared_strings(pacote)
+
+        assinaturas = {}
+        for aba in livro.iter(f'{{{_NS_PLANILHA}}}sheet'):
+            destino = destinos[aba.get(f'{{{_NS_RELACOES}}}id')]
+            caminho = destino.lstrip('/') if destino.startswith('/') else f"xl/{destino}"
+            parte = partes[caminho]
+            assinaturas[aba.get('name')] = \
+                f"{parte.CRC:08x}-{parte.file_size}-{_referenced_strings(pacote, caminho, textos)}"
+    return assinaturas
+
+def read_sheet(arquivo, planilha):
+    '''
+    Lê uma aba da ficha localizando o bloco de dados por âncoras na primeira coluna.
+    1. Percorre as linhas em modo streaming (openpyxl read_only).
+    2. Antes do bloco, lê apenas os metadados "Ano Referência" e "Unidade do PPCAAM".
+    3. O bloco começa na primeira seção do secao.json e termina em "Comentários Adicionais";
+       as linhas seguintes não são lidas.
+    4. Adiciona as colunas "estado" (unidade da ficha), "ano_referencia" (ano da ficha)
+       e "planilha" (aba de origem).
+    As âncoras são comparadas pela forma normalizada (normalize_label): acentos, caixa e
+    espaços sobrando não deixam de localizar o bloco.
+    Se a ficha não tiver os metadados, usa a sigla do nome do arquivo e deixa o ano vazio
+    (o transform_frame usa então o ano informado na linha de comando).
+    Retorna um dataframe vazio (com aviso) quando a aba não tem nenhuma seção; sem a
+    âncora de fim, avisa e lê até a última linha.
+    '''
+    secoes = {normalize_label(secao) for secao in load_sections()}
+    ancora_ano, ancora_unidade, ancora_fim = map(normalize_label, [ANCORA_ANO, ANCORA_UNIDADE, ANCORA_FIM])
+    ano = unidade = None
+    linhas = []
+    no_bloco = fim = False
+
+    workbook = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        for linha in workbook[planilha].iter_rows(values_only=True):
+            rotulo = normalize_label(linha[0]) if linha else None
+            if not no_bloco:
+                if rotulo == ancora_ano:
+                    ano = _parse_year(_first_value(linha))
+                elif rotulo == ancora_unidade:
+                    unidade = _first_value(linha)
+                elif rotulo in secoes:
+                    no_bloco = True
+                if not no_bloco:
+                    continue
+            if rotulo == ancora_fim:
+                fim = True
+                break
+            linha = tuple(linha[:len(COLUNAS_PLANILHA)])
+            linhas.append(linha + (None,) * (len(COLUNAS_PLANILHA) - len(linha)))
+    finally:
+        workbook.close()
+
+    contexto = f"{os.path.basename(arquivo)}/{planilha}"
+    if not no_bloco:
+        print(f"Aviso ({contexto}): nenhuma seção do secao.json encontrada; aba ignorada.")
+    elif not fim:
+        print(f"Aviso ({contexto}): '{ANCORA_FIM}' não encontrado; bloco lido até a última linha.")
+
+    df = pd.DataFrame(linhas, columns=COLUNAS_PLANILHA)
+    df['estado'] = str(unidade) if unidade is not None else state_from_filename(arquivo)
+    df['ano_referencia'] = ano
+    df['planilha'] = planilha
+    return apply_schema(df, CONSOLIDADO)
+
+def read_workbook(arquivo, executor=None, cache=None):
+    '''
+    Lê todas as abas do arquivo que seguem o layout da ficha e as concatena, na ordem das abas.
+    Com "executor" (ProcessPoolExecutor), as abas são lidas em paralelo; com "cache"
+    (cache.ResultCache), cada aba é guardada pela sua assinatura de conteúdo, então
+    editar uma aba não obriga a reler as demais.
+    '''
+    quadros = {}
+    pendentes = {}
+    assinaturas = sheet_signatures(arquivo)
+    for planilha, assinatura in assinaturas.items():
+        chave = hashlib.sha256(
+            f"{PIPELINE_VERSION}|{os.path.basename(arquivo)}|{planilha}|{assinatura}".encode('utf-8')
+        ).hexdigest()
+        quadro = cache.get_frame(chave) if cache is not None else None
+        if quadro is not None:
+            quadros[planilha] = quadro
+        else:
+            pendentes[planilha] = chave
+
+    if executor is not None and len(pendentes) > 1:
+        futuros = {planilha: executor.submit(read_sheet, arquivo, planilha) for planilha in pendentes}
+        lidos = {planilha: futuro.result() for planilha, futuro in futuros.items()}
+    else:
+        lidos = {planilha: read_sheet(arquivo, planilha) for planilha in pendentes}
+
+    for planilha, quadro in lidos.items():
+        if cache is not None:
+            cache.put_frame(pendentes[planilha], quadro)
+        quadros[planilha] = quadro
+
+    # Mantém a ordem das abas no arquivo
+    validos = [quadros[planilha] for planilha in assinaturas if len(quadros[planilha]) > 0]
+    if not validos:
+        raise ValueError(f"Nenhuma aba de '{arquivo}' segue o layout da ficha PPCAAM")
+    return apply_schema(pd.concat(validos, ignore_index=True), CONSOLIDADO)
+
+def read_workbooks(arquivos, executor=None, cache=None, janela=2):
+    '''
+    Lê vários arquivos, até "janela" ao mesmo tempo, e produz (arquivo, dados, erro)
+    na ordem dos arquivos. Com "executor", as abas de todos os arquivos em leitura
+    competem pelo mesmo pool de processos.
+    '''
+    with ThreadPoolExecutor(max_workers=janela) as leitores:
+        em_leitura = deque()
+        for arquivo in arquivos:
+            em_leitura.append((arquivo, leitores.submit(read_workbook, arquivo, executor, cache)))
+            if len(em_leitura) >= janela:
+                yield _collect(*em_leitura.popleft())
+        while em_leitura:
+            yield _collect(*em_leitura.popleft())
+
+def _collect(arquivo, futuro):
+    try:
+        return arquivo, futuro.result(), None
+    except Exception as e:
+        return arquivo, None, e
+
+def clean_control_rows(dados):
+    '''
+    Elimina as filas com primeira coluna igual a CONTROLE ou vazia e as linhas de
+    cabeçalho/identificação da ficha (título, ano, unidade, responsável, coleta mensal).
+    '''
+    # Elimina filas com primeira coluna igual a CONTROLE ou vazia e as linhas da ficha; a comparação
+    # ignora acentos, caixa e espaços, que variam entre as planilhas dos estados
     primeira_coluna = dados.columns[0]
-    dados_limpos = dados[(dados[primeira_coluna] != 'CONTROLE') & (dados[primeira_coluna].notna())]
-    dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != 'Programa de Proteção a Crianças e Adolescentes Ameaçados de Morte (PPCAAM)')]
-    dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != 'Ficha de Coleta de Dados Quantitativos dos Programas Estaduais')]
-    dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != 'Identificação') & (dados_limpos[primeira_coluna] != 'Ano Referência')]
-    dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != 'Unidade do PPCAAM') & (dados_limpos[primeira_coluna] != 'Responsável pelo preenchimento ')]
-    dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != 'Coleta mensal') & (dados_limpos[primeira_coluna] != 'Criança/Adolescente incluído ')]
-    print(f"\nContagem de linhas e colunas após a limpeza: {dados_limpos.shape}")
-    # Salva o DataFrame limpo
-    dados_limpos.to_csv("dados_limpos_PPCAAM.csv", index=False, encoding='utf-8-sig')
-    print("Dados limpos salvos com sucesso em 'dados_limpos_PPCAAM.csv'.")
+    rotulos = normalize_labels(dados[primeira_coluna])
+    dados_limpos = dados[dados[primeira_coluna].notna() & ~rotulos.isin(normalize_labels(ROTULOS_CONTROLE)).to_numpy()]
+    return dados_limpos
 
-def step_2_5():
+def clean_comment_rows(dados):
     '''
-    Letura de arquivo CSV limpo e exibição de amostra dos dados.
-    1. Lê o arquivo CSV "dados_limpos_PPCAAM.csv".
-    2. Exibe as primeiras linhas do DataFrame.
-    3. Exibe informações do DataFrame.
-    4. Exibe a contagem de linhas e colunas.
+    Elimina as linhas de observações e comentários livres que não são métricas.
     '''
-    # Lê o arquivo CSV limpo
-    dados = pd.read_csv("dados_limpos_PPCAAM.csv", encoding='utf-8-sig')
     primeira_coluna = dados.columns[0]
     dados_limpos = dados[(dados[primeira_coluna] != 'Educação de Jovens e Adultos')]
     dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != 'Especifique quais (Outros):')]
@@ -96,27 +376,39 @@ def step_2_5():
     dados_limpos = dados_limpos[(dados_limpos[primeira_coluna] != '''1 (um) protegidos com histórico de EJA														
 														
 														''')]
-    print(f"\nContagem de linhas e colunas após a limpeza: {dados_limpos.shape}")
-    # Salva o DataFrame limpo
-    dados_limpos.to_csv("dados_limpos2_PPCAAM.csv", index=False, encoding='utf-8-sig')
-    print("Dados limpos v2 salvos com sucesso em 'dados_limpos2_PPCAAM.csv'.")
+    return dados_limpos
 
-def step_3(ano_referencia):
+def transform_frame(dados, ano_referencia, contexto=None):
     '''
-    Transformar o dataframe para as colunas de:
-    [ano_referencia, secao, metrica, ano_anterior, janeiro, fevereiro, marco, abril, maio,
-     junho, julho, agosto, setembro, outubro, novembro, dezembro, unidade]
+    Transforma o dataframe limpo de um ou mais estados para as colunas de:
+    [ano_referencia, unidade, secao, metrica, ano_anterior, janeiro, ..., dezembro, total, planilha]
+    O ano lido da própria ficha (coluna "ano_referencia") tem prioridade sobre o parâmetro.
+    Cada aba de cada estado é transformada separadamente, para que a seção corrente
+    e os contadores de seções repetidas não passem de uma ficha para a outra.
+    Ao final, seções e métricas recebem os nomes canônicos do dicionario.json (canonicalize).
     '''
-    # Lê o arquivo CSV limpo
-    dados = pd.read_csv("dados_limpos2_PPCAAM.csv", encoding='utf-8-sig')
+    if 'planilha' not in dados.columns or len(dados) == 0:
+        return canonicalize(_transform_block(dados, ano_referencia), contexto)
+    origem = dados[['estado', 'planilha']].astype(object)
+    blocos = (origem != origem.shift()).any(axis=1).cumsum()
+    return canonicalize(apply_schema(
+        pd.concat([_transform_block(bloco, ano_referencia) for _, bloco in dados.groupby(blocos, sort=False)],
+                  ignore_index=True),
+        TRANSFORMADO
+    ), contexto)
+
+def _transform_block(dados, ano_referencia):
+    '''Transforma as linhas de uma única ficha (ver transform_frame)'''
     # Define um dataframe vazio para os dados transformados
     dados_transformados = pd.DataFrame(columns=['ano_referencia', 'unidade', 'secao', 'metrica', 'ano_anterior',
-                                              'janeiro', 'fevereiro', 'marco', 'abril', 'maio',
-                                              'junho', 'julho', 'agosto', 'setembro', 'outubro',
-                                              'novembro', 'dezembro'])
+                                              *MESES])
     # letura do json de mapeamento
-    secao_map = json.load(open('secao.json', 'r', encoding='utf-8'))
-    secao_list = secao_map['secao']
+    secao_list = load_sections()
+    # Rótulos que são seções (ignorando acentos, caixa e espaços) recebem o nome exato do secao.json
+    secoes_canonicas = normalize_labels(dados[COLUNA_ROTULO]).map(dict(zip(normalize_labels(secao_list), secao_list)))
+    dados = dados.assign(**{COLUNA_ROTULO: secoes_canonicas.astype(object).where(secoes_canonicas.notna(), dados[COLUNA_ROTULO])})
+    tem_ano_ficha = 'ano_referencia' in dados.columns
+    tem_planilha = 'planilha' in dados.columns
     
     secao = ''
     count_abrangencia = 2
@@ -151,7 +443,7 @@ def step_3(ano_referencia):
                     'julho': row['Unnamed: 8'], 'agosto': row['Unnamed: 9'], 'setembro': row['Unnamed: 10'],
                     'outubro': row['Unnamed: 11'], 'novembro': row['Unnamed: 12'], 'dezembro': row['Unnamed: 13'] }
             nova_linha = {
-                'ano_referencia': ano_referencia,
+                'ano_referencia': row['ano_referencia'] if tem_ano_ficha and pd.notna(row['ano_referencia']) else ano_referencia,
                 'unidade': unidade,
                 'secao': secao,
                 'metrica': metrica,
@@ -159,17 +451,307 @@ def step_3(ano_referencia):
                 **meses,
                 'total': row['Unnamed: 14']
             }
+            if tem_planilha:
+                nova_linha['planilha'] = row['planilha']
             dados_transformados = pd.concat(
                 [dados_transformados, pd.DataFrame([nova_linha])], 
                 ignore_index=True
             )
-    # Salva o dataframe transformado
-    dados_transformados.to_csv("dados_transformados_PPCAAM.csv", index=False, encoding='utf-8-sig')
-    
+    return apply_schema(dados_transformados, TRANSFORMADO)
+
+def clean_frame(dados, contexto=None):
+    '''
+    Aplica as duas limpezas (step_2 e step_2_5) e converte os valores para inteiros,
+    contando os valores que não puderam ser convertidos.
+    '''
+    dados = clean_comment_rows(clean_control_rows(dados))
+    return apply_schema(dados, LIMPO, contexto=contexto)
+
+def run_state(arquivo, ano_referencia):
+    '''
+    Executa step_1 → step_3 em memória para um único arquivo Excel, sem gravar
+    os arquivos intermediários, e retorna o dataframe transformado do estado.
+    '''
+    dados = read_workbook(arquivo)
+    dados = clean_frame(dados, contexto=arquivo)
+    return transform_frame(dados, ano_referencia, contexto=arquivo)
+
+def write_csv_atomic(dados, caminho, schema=None):
+    '''
+    Grava o CSV em um arquivo temporário na mesma pasta e o troca pelo destino com
+    os.replace, de modo que leitores (dashboard) nunca vejam um arquivo pela metade.
+    Com "schema", os dtypes são aplicados antes da gravação.
+    '''
+    if schema is not None:
+        dados = apply_schema(dados, schema, contexto=caminho)
+    temporario = f"{caminho}.tmp"
+    dados.to_csv(temporario, index=False, encoding='utf-8-sig')
+    os.replace(temporario, caminho)
+
+def replace_pairs(existentes, novos, remover=()):
+    '''
+    Troca em "existentes" as linhas dos pares (ano_referencia, unidade) presentes em "novos"
+    e retira os pares de "remover", em memória. Retorna (dados, linhas removidas).
+    '''
+    chaves_novas = set(zip(novos['ano_referencia'], novos['unidade'])) | set(remover)
+    manter = pd.Series([chave not in chaves_novas for chave in zip(existentes['ano_referencia'], existentes['unidade'])],
+                       index=existentes.index, dtype=bool)
+    return pd.concat([existentes[manter], novos], ignore_index=True), existentes[~manter]
+
+def _pairs(dados):
+    '''Pares (ano_referencia, unidade) do dataframe, nos tipos do armazenamento (int, str)'''
+    return {(int(ano), str(unidade)) for ano, unidade in zip(dados['ano_referencia'], dados['unidade']) if pd.notna(ano)}
+
+def _rows_of(dados, pares):
+    '''Linhas dos pares (ano_referencia, unidade) listados'''
+    manter = [pd.notna(ano) and (int(ano), str(unidade)) in pares
+              for ano, unidade in zip(dados['ano_referencia'], dados['unidade'])]
+    return dados[np.array(manter, dtype=bool)]
+
+def _export_mark(caminho):
+    '''Versão (mtime/tamanho) do arquivo exportado, como é registrada no armazenamento'''
+    if not os.path.exists(caminho):
+        return None
+    info = os.stat(caminho)
+    return json.dumps([info.st_mtime_ns, info.st_size])
+
+def publish(envios, caminho="dados_transformados_PPCAAM.csv", remover=(), completo=False, preservar=(),
+            verificar=False, origem=None):
+    '''
+    Grava os envios no armazenamento por célula (store.py), a fonte do arquivo transformado,
+    e exporta dele o CSV, as tabelas agregadas e as variações.
+    1. Cada envio (dados, origem) substitui os pares (ano_referencia, unidade) que contém,
+       regravando só as células alteradas. Os pares de "remover" são retirados (execução
+       "origem"); com "completo" (todas as planilhas), também os pares que nenhum envio
+       trouxe, exceto os das origens em "preservar" (ex.: arquivos com erro).
+    2. Se nenhuma célula mudou e o CSV é o último exportado, nada mais é gravado.
+    3. Senão, o CSV é exportado do armazenamento e as tabelas agregadas recebem só a
+       diferença dos pares alterados; "verificar" as compara com o recálculo completo.
+    Um CSV anterior ao armazenamento vira o seu conteúdo inicial.
+    Retorna o número de células alteradas.
+    '''
+    marca = f"exportado:{os.path.basename(caminho)}"
+    with CellStore(store_path(caminho)) as store:
+        if store.last_run() == 0 and os.path.exists(caminho):
+            store.upsert(read_csv(caminho, TRANSFORMADO), origem=None)
+            store.set_meta(marca, _export_mark(caminho))
+        sincronizado = _export_mark(caminho) is not None and store.get_meta(marca) == _export_mark(caminho)
+
+        enviados = set().union(*(_pairs(dados) for dados, _ in envios))
+        remover = {(int(ano), str(unidade)) for ano, unidade in remover} - enviados
+        if completo:
+            por_origem = store.pairs_by_origin()
+            todos = set().union(*por_origem.values())
+            protegidos = set().union(*(por_origem.get(o, set()) for o in preservar))
+            # Pares gravados antes de as origens serem registradas: pela sigla do nome do arquivo
+            siglas = {state_from_filename(o) for o in preservar}
+            protegidos |= {(ano, unidade) for ano, unidade in todos if unidade in siglas}
+            remover |= todos - enviados - protegidos
+
+        inicio = store.last_run()
+        antigos = store.to_frame(enviados | remover) if sincronizado else None
+        alteradas = 0
+        for dados, origem_envio in envios:
+            if len(dados):
+                alteradas += store.upsert(dados, origem_envio)[1]
+        if remover:
+            alteradas += store.remove_pairs(remover, origem)[1]
+
+        alterados = store.changed_pairs(inicio)
+        if not alterados and sincronizado:
+            if not deltas_current(caminho):
+                # Tabela de variações ausente ou de outra versão: só ela é regravada
+                save_deltas(compute_deltas(store.to_frame()), caminho)
+            print("Nenhuma célula alterada: arquivo transformado mantido.")
+            return 0
+
+        dados = store.to_frame()
+        versao_anterior = json.loads(store.get_meta(marca)) if sincronizado else None
+        write_csv_atomic(dados, caminho, TRANSFORMADO)
+        if antigos is None:
+            update_aggregates(caminho, None, None, None, dados, verificar)
+        else:
+            update_aggregates(caminho, tuple(versao_anterior), _rows_of(antigos, alterados),
+                              _rows_of(dados, alterados), dados, verificar)
+        save_deltas(compute_deltas(dados), caminho)
+        store.set_meta(marca, _export_mark(caminho))
+    print(f"Células alteradas no armazenamento: {alteradas}")
+    return alteradas
+
+def merge_transformed(novos, caminho="dados_transformados_PPCAAM.csv", remover=(), verificar=False, origem=None):
+    '''
+    Envio de um único arquivo "origem" (ex.: watch.py): substitui os pares
+    (ano_referencia, unidade) presentes em "novos" e remove os listados em "remover",
+    mantendo os demais estados (ver publish).
+    '''
+    return publish([(novos, origem)], caminho, remover=remover, verificar=verificar, origem=origem)
+
+def step_1():
+    '''
+    Consolida arquivos Excel de diferentes estados em um único arquivo CSV.
+    Cada arquivo Excel deve estar nomeado no formato "dados_estado.xlsx", onde "estado" é a sigla do estado (AL, AC, BA, AM, AP).
+    1. Lê todos os arquivos Excel na pasta "origen".
+    2. Adiciona as colunas "estado", "ano_referencia" e "planilha" (aba de origem).
+    3. Concatena todos os dados em um único DataFrame.
+    4. Salva o DataFrame consolidado em um arquivo CSV chamado "dados_consolidados_PPCAAM.csv".
+    5. Imprime o número total de linhas consolidadas.
+    '''
+    # Lista todos os arquivos Excel na pasta atual
+    arquivos_excel = glob.glob("origen/*.xlsx")
+
+    # Lista para armazenar todos os DataFrames
+    todos_dados = []
+
+    # Lê cada arquivo (abas em paralelo no pool de processos) e adiciona à lista
+    with ProcessPoolExecutor() as executor:
+        for arquivo, dados, erro in read_workbooks(arquivos_excel, executor):
+            if erro is not None:
+                raise erro
+            todos_dados.append(dados)
+
+    # Concatena todos os DataFrames
+    dados_consolidados = apply_schema(pd.concat(todos_dados, ignore_index=True), CONSOLIDADO)
+
+    # Salva como CSV
+    dados_consolidados.to_csv("dados_consolidados_PPCAAM.csv", index=False, encoding='utf-8-sig')
+
+    print(f"Arquivos consolidados com sucesso! Total de linhas: {len(dados_consolidados)}")
+
+def step_2():
+    '''
+    Letura de arquivo CSV consolidado e exibição de amostra dos dados.
+    Elimina as filas com primeira coluna igual a CONTROLE ou vazia.
+    1. Lê o arquivo CSV "dados_consolidados_PPCAAM.csv".
+    2. Exibe as primeiras linhas do DataFrame.
+    3. Exibe informações do DataFrame.
+    4. Exibe a contagem de linhas e colunas.
+    5. Elimina as filas com primeira coluna igual a CONTROLE ou vazia.
+    6. Exibe a contagem de linhas e colunas após a limpeza.
+    7. Salva o DataFrame limpo em "dados_limpos_PPCAAM.csv".
+    8. Imprime mensagem de sucesso.
+    '''
+    # Lê o arquivo CSV consolidado
+    dados = read_csv("dados_consolidados_PPCAAM.csv", CONSOLIDADO)
+    print(f"\nContagem de linhas e colunas antes da limpeza: {dados.shape}")
+    dados_limpos = apply_schema(clean_control_rows(dados), LIMPO, contexto="step_2")
+    print(f"\nContagem de linhas e colunas após a limpeza: {dados_limpos.shape}")
+    # Salva o DataFrame limpo
+    dados_limpos.to_csv("dados_limpos_PPCAAM.csv", index=False, encoding='utf-8-sig')
+    print("Dados limpos salvos com sucesso em 'dados_limpos_PPCAAM.csv'.")
+
+def step_2_5():
+    '''
+    Letura de arquivo CSV limpo e exibição de amostra dos dados.
+    1. Lê o arquivo CSV "dados_limpos_PPCAAM.csv".
+    2. Exibe as primeiras linhas do DataFrame.
+    3. Exibe informações do DataFrame.
+    4. Exibe a contagem de linhas e colunas.
+    '''
+    # Lê o arquivo CSV limpo
+    dados = read_csv("dados_limpos_PPCAAM.csv", LIMPO)
+    dados_limpos = clean_comment_rows(dados)
+    print(f"\nContagem de linhas e colunas após a limpeza: {dados_limpos.shape}")
+    # Salva o DataFrame limpo
+    dados_limpos.to_csv("dados_limpos2_PPCAAM.csv", index=False, encoding='utf-8-sig')
+    print("Dados limpos v2 salvos com sucesso em 'dados_limpos2_PPCAAM.csv'.")
+
+def step_3(ano_referencia):
+    '''
+    Transformar o dataframe para as colunas de:
+    [ano_referencia, secao, metrica, ano_anterior, janeiro, fevereiro, marco, abril, maio,
+     junho, julho, agosto, setembro, outubro, novembro, dezembro, unidade]
+    '''
+    # Lê o arquivo CSV limpo
+    dados = read_csv("dados_limpos2_PPCAAM.csv", LIMPO)
+    dados_transformados = transform_frame(dados, ano_referencia, contexto="dados_limpos2_PPCAAM.csv")
+    novas = extend_dictionary(dados_transformados)
+    if novas:
+        print(f"{novas} rótulos novos acrescentados ao {ARQUIVO_DICIONARIO}.")
+        # Os rótulos recém-cadastrados passam a ter um só nome canônico
+        dados_transformados = canonicalize(dados_transformados)
+    # Grava pelo armazenamento por célula, que exporta o CSV (troca atômica), os agregados e as variações
+    publish([(dados_transformados, "dados_limpos2_PPCAAM.csv")], "dados_transformados_PPCAAM.csv", completo=True)
+
+def step_4():
+    '''
+    Calcula as variações (YoY, MoM e acumulado no ano) de cada (unidade, secao, metrica)
+    em todos os anos do arquivo transformado e as salva em "dados_variacoes_PPCAAM.csv".
+    '''
+    caminho = "dados_transformados_PPCAAM.csv"
+    # Versão lida antes dos dados: se o arquivo mudar durante o cálculo, a tabela fica marcada como antiga
+    info = os.stat(caminho)
+    dados = read_csv(caminho, TRANSFORMADO)
+    variacoes = compute_deltas(dados)
+    save_deltas(variacoes, caminho, versao=(info.st_mtime_ns, info.st_size))
+    print(f"Variações salvas com sucesso: {len(variacoes)} linhas.")
 
 
 if __name__ == "__main__":
-    step_1()
-    step_2()
-    step_2_5()
-    step_3(ano_referencia=2025)
\ No newline at end of file
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Transforma as planilhas PPCAAM de origen/ em dados_transformados_PPCAAM.csv "
+                                                 "(e as variações em dados_variacoes_PPCAAM.csv).")
+    parser.add_argument("--ano", type=int, default=2025)
+    parser.add_argument("--etapas", action="store_true",
+                        help="Executa step_1…step_4 em sequência, gravando os CSVs intermediários")
+    parser.add_argument("--fila", type=int, default=2, help="Tamanho das filas entre as etapas do pipeline")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache de resultados")
+    parser.add_argument("--cache-dir", default=".cache_ppcaam")
+    parser.add_argument("--cache-max-mb", type=float, default=256, help="Tamanho máximo do cache em MB")
+    parser.add_argument("--atualizar-dicionario", action="store_true",
+                        help=f"Acrescenta ao {ARQUIVO_DICIONARIO} os rótulos do arquivo transformado sem mapeamento")
+    args = parser.parse_args()
+
+    if args.atualizar_dicionario:
+        novas = extend_dictionary(read_csv("dados_transformados_PPCAAM.csv", TRANSFORMADO))
+        print(f"{novas} entradas acrescentadas ao {ARQUIVO_DICIONARIO}.")
+    elif args.etapas:
+        step_1()
+        step_2()
+        step_2_5()
+        step_3(ano_referencia=args.ano)
+        step_4()
+    else:
+        from cache import ResultCache
+        from pipeline import run_pipeline
+
+        arquivos_excel = sorted(glob.glob("origen/*.xlsx"))
+        cache = chave = envios = None
+        falhas = []
+        if not args.no_cache:
+            cache = ResultCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+            chave = cache.key(arquivos_excel, ARQUIVOS_REGRAS, PIPELINE_VERSION, f"ano={args.ano}")
+            envios = cache.get_result(chave)
+            if envios is not None:
+                print(f"Entradas inalteradas: estados restaurados do cache ({chave[:12]}).")
+
+        if envios is None:
+            resultados = run_pipeline(arquivos_excel, args.ano, args.fila, cache)
+            envios = [(r.dados, r.arquivo) for r in resultados if r.erro is None]
+            falhas = [r for r in resultados if r.erro is not None]
+            if envios:
+                # Rótulos novos ganham os próximos IDs no dicionário (os existentes não mudam)
+                novas = extend_dictionary(pd.concat([dados for dados, _ in envios], ignore_index=True))
+                if novas:
+                    print(f"{novas} rótulos novos acrescentados ao {ARQUIVO_DICIONARIO}.")
+                    # Cada estado foi canonizado antes do cadastro: variantes de um rótulo novo
+                    # vindas de estados diferentes (ex.: caixa, acentos) só se unificam agora
+                    envios = [(canonicalize(dados), arquivo) for dados, arquivo in envios]
+                    if cache is not None:
+                        chave = cache.key(arquivos_excel, ARQUIVOS_REGRAS, PIPELINE_VERSION, f"ano={args.ano}")
+            # Só resultados completos entram no cache
+            if cache is not None and envios and not falhas:
+                cache.put_result(chave, envios)
+        if envios:
+            # Cada estado é um envio no armazenamento por célula (mesmo restaurado do cache): só as
+            # células alteradas são regravadas, e os estados com erro mantêm os dados anteriores
+            alteradas = publish(envios, "dados_transformados_PPCAAM.csv", completo=True,
+                                preservar=[r.arquivo for r in falhas])
+            print(f"Dados transformados salvos com sucesso: {len(envios)} estados ({alteradas} células alteradas).")
+        if cache is not None:
+            # Limite de tamanho aplicado uma vez por execução, depois de gravadas as abas e o resultado
+            cache.evict()
+        if falhas:
+            print(f"Estados com erro: {', '.join(r.estado for r in falhas)}")
+            sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,124 @@
+import argparse
+import glob
+import os
+import time
+
+from schema import TRANSFORMADO, read_csv
+from store import CellStore, store_path
+from transform import run_state, merge_transformed, state_from_filename
+
+
+def snapshot(pasta="origen"):
+    '''Retorna {arquivo: (mtime_ns, tamanho)} para os arquivos Excel da pasta'''
+    estado = {}
+    for arquivo in glob.glob(os.path.join(pasta, "*.xlsx")):
+        # Ignora arquivos temporários de bloqueio do Excel (~$dados_AL.xlsx)
+        if os.path.basename(arquivo).startswith('~$'):
+            continue
+        try:
+            info = os.stat(arquivo)
+        except FileNotFoundError:
+            continue
+        estado[arquivo] = (info.st_mtime_ns, info.st_size)
+    return estado
+
+def existing_keys(arquivos, saida="dados_transformados_PPCAAM.csv"):
+    '''
+    Pares (ano_referencia, unidade) que cada arquivo já tem na saída, ao iniciar a observação:
+    1. pelo armazenamento por célula, que registra o arquivo de origem de cada envio;
+    2. para arquivos sem envio registrado, pela sigla do nome (state_from_filename) na coluna unidade.
+    '''
+    chaves = {arquivo: set() for arquivo in arquivos}
+    if not os.path.exists(saida):
+        return chaves
+    with CellStore(store_path(saida)) as store:
+        por_origem = {os.path.abspath(origem): pares for origem, pares in store.pairs_by_origin().items() if origem}
+    dados = read_csv(saida, TRANSFORMADO)
+    presentes = set(zip(dados['ano_referencia'], dados['unidade'].astype(str)))
+    for arquivo in arquivos:
+        pares = por_origem.get(os.path.abspath(arquivo))
+        if pares is None:
+            sigla = state_from_filename(arquivo)
+            pares = {(ano, unidade) for ano, unidade in presentes if unidade == sigla}
+        chaves[arquivo] = pares & presentes
+    return chaves
+
+def refresh_state(arquivo, ano_referencia, saida="dados_transformados_PPCAAM.csv", remover=(), verificar=False):
+    '''
+    Reprocessa um único estado (step_1 → step_3 em memória) e troca atomicamente
+    o arquivo transformado. Retorna os pares (ano_referencia, unidade) gerados.
+    '''
+    novos = run_state(arquivo, ano_referencia)
+    merge_transformed(novos, saida, remover=remover, verificar=verificar, origem=arquivo)
+    return set(zip(novos['ano_referencia'], novos['unidade']))
+
+def watch(pasta="origen", ano_referencia=2025, saida="dados_transformados_PPCAAM.csv",
+          intervalo=2.0, espera=5.0, verificar=False):
+    '''
+    Observa a pasta de origem por polling e reprocessa apenas os estados alterados.
+    1. A cada "intervalo" segundos compara mtime/tamanho dos arquivos Excel.
+    2. Um arquivo alterado só é processado depois de ficar "espera" segundos sem
+       novas mudanças (debounce), evitando ler planilhas ainda sendo copiadas.
+    3. Arquivos removidos têm suas linhas retiradas do arquivo transformado.
+    O arquivo de saída é sempre trocado com os.replace; o dashboard identifica a
+    nova versão pelo mtime e recarrega só os dados, sem reiniciar.
+    Com "verificar", as tabelas agregadas atualizadas por diferença são conferidas
+    com o recálculo completo a cada troca.
+    '''
+    anterior = snapshot(pasta)
+    pendentes = {}
+    # Pares (ano_referencia, unidade) gerados por cada arquivo, usados em remoções e na troca
+    # de ano; os dos arquivos já processados vêm da saída existente
+    chaves_por_arquivo = existing_keys(anterior, saida)
+    print(f"Observando '{pasta}' ({len(anterior)} arquivos). Ctrl+C para sair.")
+
+    try:
+        while True:
+            time.sleep(intervalo)
+            atual = snapshot(pasta)
+            agora = time.monotonic()
+
+            for arquivo, assinatura in atual.items():
+                if anterior.get(arquivo) != assinatura:
+                    pendentes[arquivo] = agora
+
+            for arquivo in set(anterior) - set(atual):
+                pendentes.pop(arquivo, None)
+                chaves = chaves_por_arquivo.pop(arquivo, set())
+                if chaves:
+                    merge_transformed(_empty_like(saida), saida, remover=chaves, verificar=verificar, origem=arquivo)
+                    print(f"Arquivo removido: {arquivo}. Linhas de {sorted(chaves)} retiradas.")
+
+            anterior = atual
+
+            prontos = [arquivo for arquivo, visto in pendentes.items() if agora - visto >= espera]
+            for arquivo in prontos:
+                del pendentes[arquivo]
+                try:
+                    inicio = time.perf_counter()
+                    chaves_antigas = chaves_por_arquivo.get(arquivo, set())
+                    chaves = refresh_state(arquivo, ano_referencia, saida, remover=chaves_antigas, verificar=verificar)
+                    chaves_por_arquivo[arquivo] = chaves
+                    print(f"Estado atualizado a partir de '{arquivo}' em {time.perf_counter() - inicio:.2f}s")
+                except Exception as e:
+                    # A próxima alteração do arquivo dispara uma nova tentativa
+                    print(f"Erro ao processar '{arquivo}': {e}")
+    except KeyboardInterrupt:
+        print("Observação encerrada.")
+
+def _empty_like(caminho):
+    '''Dataframe vazio com as colunas do arquivo transformado'''
+    return read_csv(caminho, TRANSFORMADO).iloc[:0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reprocessa estados automaticamente quando novas planilhas chegam em origen/.")
+    parser.add_argument("--pasta", default="origen")
+    parser.add_argument("--ano", type=int, default=2025)
+    parser.add_argument("--saida", default="dados_transformados_PPCAAM.csv")
+    parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos entre verificações")
+    parser.add_argument("--espera", type=float, default=5.0, help="Segundos sem mudanças antes de processar")
+    parser.add_argument("--verificar", action="store_true",
+                        help="Confere as tabelas agregadas com o recálculo completo a cada atualização")
+    args = parser.parse_args()
+    watch(args.pasta, args.ano, args.saida, args.intervalo, args.espera, args.verificar)